@@ -16,6 +16,7 @@ from datetime import datetime
 import pandas as pd
 import numpy as np
 
+from edit_distance import character_error_rate, character_error_rates, levenshtein
 from config import (
     GROUND_TRUTH_CSV,
     IMAGE_FILENAME_COLUMN,
@@ -162,36 +163,7 @@ def normalize_text(text: str) -> str:
 
 def levenshtein_distance(s1: str, s2: str) -> int:
     """Calculate Levenshtein (edit) distance between two strings."""
-    if len(s1) < len(s2):
-        return levenshtein_distance(s2, s1)
-
-    if len(s2) == 0:
-        return len(s1)
-
-    previous_row = range(len(s2) + 1)
-    for i, c1 in enumerate(s1):
-        current_row = [i + 1]
-        for j, c2 in enumerate(s2):
-            insertions = previous_row[j + 1] + 1
-            deletions = current_row[j] + 1
-            substitutions = previous_row[j] + (c1 != c2)
-            current_row.append(min(insertions, deletions, substitutions))
-        previous_row = current_row
-
-    return previous_row[-1]
-
-
-def character_error_rate(prediction: str, ground_truth: str) -> float:
-    """
-    Calculate Character Error Rate (CER).
-
-    CER = Levenshtein distance / length of ground truth
-    """
-    if not ground_truth:
-        return 0.0 if not prediction else 1.0
-
-    distance = levenshtein_distance(prediction, ground_truth)
-    return distance / len(ground_truth)
+    return levenshtein(s1, s2)
 
 
 def word_accuracy(prediction: str, ground_truth: str) -> float:
@@ -214,6 +186,7 @@ def compare_field(
     prediction: str,
     ground_truth: str,
     field_name: str,
+    cer: Optional[float] = None,
 ) -> FieldResult:
     """
     Compare a single field prediction against ground truth.
@@ -222,6 +195,8 @@ def compare_field(
         prediction: OCR prediction text
         ground_truth: Expected ground truth text
         field_name: Name of the field
+        cer: Character error rate if already computed (compare_image_results scores
+             all fields of an image in one character_error_rates() call)
 
     Returns:
         FieldResult with comparison metrics
@@ -236,7 +211,8 @@ def compare_field(
     normalized = normalize_text(pred_str) == normalize_text(gt_str)
 
     # Character error rate
-    cer = character_error_rate(pred_str, gt_str)
+    if cer is None:
+        cer = character_error_rate(pred_str, gt_str)
 
     # Word accuracy
     word_acc = word_accuracy(pred_str, gt_str)
@@ -274,6 +250,7 @@ def compare_image_results(
         expected_field_count=len(DETECTION_CLASSES),
     )
 
+    fields = []
     for class_name in DETECTION_CLASSES:
         csv_column = CLASS_TO_CSV_COLUMN.get(class_name, class_name)
 
@@ -284,9 +261,17 @@ def compare_image_results(
 
         # Get prediction value
         pred_value = predictions.get(class_name, "")
+        fields.append((class_name, pred_value, gt_value))
+
+    # Edit distances for all fields of the image in one batch
+    cers = character_error_rates(
+        [str(p) if pd.notna(p) else "" for _, p, _ in fields],
+        [str(g) if pd.notna(g) else "" for _, _, g in fields],
+    )
 
-        # Compare
-        field_result = compare_field(pred_value, gt_value, class_name)
+    # Compare
+    for (class_name, pred_value, gt_value), cer in zip(fields, cers):
+        field_result = compare_field(pred_value, gt_value, class_name, cer=cer)
         result.field_results[class_name] = field_result
 
     return result
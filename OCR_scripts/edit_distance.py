@@ -0,0 +1,238 @@
+"""
+Edit distance engine for OCR scoring.
+
+One Levenshtein implementation shared by benchmark.py (character_error_rate),
+the calculate_cer Pixeltable UDF and job scoring in the backend.
+
+- levenshtein(): Myers' bit-parallel algorithm (Hyyro's formulation). The
+  shorter string is encoded as bit vectors, one Python int per symbol, so each
+  character of the longer string costs a handful of integer operations instead
+  of an inner loop over the other string. Common prefixes/suffixes are
+  stripped first, which makes near-matches (the usual OCR case) almost free.
+- levenshtein_batch(): many pairs at once. Pairs are grouped by length and
+  each group runs the dynamic program row by row as NumPy operations across
+  the whole group. Small groups and long strings (where one Myers pass per
+  pair is faster than the O(n*m) table) go through levenshtein().
+
+Run this file to compare it against the previous pure-Python implementation:
+
+    python OCR_scripts/edit_distance.py
+"""
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+# Groups smaller than this are cheaper through levenshtein() than through NumPy
+BATCH_MIN_GROUP = 32
+# Above this length one Myers pass per pair beats the O(n*m) NumPy DP
+BATCH_MAX_LENGTH = 128
+
+
+def _strip_affixes(s1: str, s2: str) -> Tuple[str, str]:
+    """Drop the common prefix and suffix (they never contribute to the distance)."""
+    start = 0
+    limit = min(len(s1), len(s2))
+    while start < limit and s1[start] == s2[start]:
+        start += 1
+    end1, end2 = len(s1), len(s2)
+    while end1 > start and end2 > start and s1[end1 - 1] == s2[end2 - 1]:
+        end1 -= 1
+        end2 -= 1
+    return s1[start:end1], s2[start:end2]
+
+
+def levenshtein(s1: str, s2: str) -> int:
+    """Levenshtein (edit) distance between two strings."""
+    if s1 == s2:
+        return 0
+    s1, s2 = _strip_affixes(s1, s2)
+    # Bit vectors over the shorter string
+    if len(s1) < len(s2):
+        s1, s2 = s2, s1
+    m = len(s2)
+    if m == 0:
+        return len(s1)
+
+    peq: Dict[str, int] = {}
+    bit = 1
+    for c in s2:
+        peq[c] = peq.get(c, 0) | bit
+        bit <<= 1
+
+    mask = (1 << m) - 1
+    last = 1 << (m - 1)
+    pv = mask
+    mv = 0
+    score = m
+    for c in s1:
+        eq = peq.get(c, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | (~(xh | pv) & mask)
+        mh = pv & xh
+        if ph & last:
+            score += 1
+        elif mh & last:
+            score -= 1
+        ph = ((ph << 1) | 1) & mask
+        mh = (mh << 1) & mask
+        pv = mh | (~(xv | ph) & mask)
+        mv = ph & xv
+    return score
+
+
+def character_error_rate(prediction: str, ground_truth: str) -> float:
+    """
+    Calculate Character Error Rate (CER).
+
+    CER = Levenshtein distance / length of ground truth
+    """
+    if not ground_truth:
+        return 0.0 if not prediction else 1.0
+    return levenshtein(prediction, ground_truth) / len(ground_truth)
+
+
+def _codes(strings: Sequence[str], width: int, fill: int) -> np.ndarray:
+    """Unicode code points of each string, padded to width."""
+    out = np.full((len(strings), width), fill, dtype=np.int32)
+    for k, s in enumerate(strings):
+        if s:
+            out[k, :len(s)] = np.frombuffer(s.encode("utf-32-le"), dtype=np.int32)
+    return out
+
+
+def _levenshtein_group(pairs: List[Tuple[str, str]]) -> np.ndarray:
+    """Row-by-row DP over a group of pairs, vectorized across the group."""
+    rows = [a for a, _ in pairs]
+    cols = [b for _, b in pairs]
+    n = np.array([len(a) for a in rows])
+    m = np.array([len(b) for b in cols])
+    width = int(m.max())
+    # Different fill values so padding never matches
+    a_codes = _codes(rows, int(n.max()), -1)
+    b_codes = _codes(cols, width, -2)
+
+    offsets = np.arange(width + 1, dtype=np.int32)
+    prev = np.broadcast_to(offsets, (len(pairs), width + 1)).copy()
+    result = np.where(n == 0, m, 0)
+    for i in range(int(n.max())):
+        cost = (b_codes != a_codes[:, i:i + 1]).astype(np.int32)
+        cur = np.empty_like(prev)
+        cur[:, 0] = i + 1
+        cur[:, 1:] = np.minimum(prev[:, 1:] + 1, prev[:, :-1] + cost)
+        # Insertions chain left to right: cur[j] = min over k <= j of cur[k] + (j - k)
+        cur = np.minimum.accumulate(cur - offsets, axis=1) + offsets
+        done = np.nonzero(n == i + 1)[0]
+        if len(done):
+            result[done] = cur[done, m[done]]
+        prev = cur
+    return result
+
+
+def levenshtein_batch(pairs: Sequence[Tuple[str, str]]) -> List[int]:
+    """Levenshtein distances for many (s1, s2) pairs, in order."""
+    distances = [0] * len(pairs)
+    # Identical pairs and affixes are settled up front; the rest is grouped by length
+    groups: Dict[Tuple[int, int], List[int]] = {}
+    stripped: List[Tuple[str, str]] = []
+    for k, (s1, s2) in enumerate(pairs):
+        a, b = _strip_affixes(s1, s2) if s1 != s2 else ("", "")
+        stripped.append((a, b))
+        if a and b:
+            # Buckets of similar size keep the padding small
+            groups.setdefault((len(a).bit_length(), len(b).bit_length()), []).append(k)
+        else:
+            distances[k] = len(a) + len(b)
+
+    for members in groups.values():
+        longest = max(max(len(stripped[k][0]), len(stripped[k][1])) for k in members)
+        if len(members) < BATCH_MIN_GROUP or longest > BATCH_MAX_LENGTH:
+            for k in members:
+                distances[k] = levenshtein(*stripped[k])
+            continue
+        for k, d in zip(members, _levenshtein_group([stripped[k] for k in members])):
+            distances[k] = int(d)
+    return distances
+
+
+def character_error_rates(predictions: Sequence[str], ground_truths: Sequence[str]) -> List[float]:
+    """character_error_rate() for many prediction / ground truth pairs."""
+    distances = levenshtein_batch(list(zip(predictions, ground_truths)))
+    return [
+        (d / len(gt)) if gt else (0.0 if not pred else 1.0)
+        for d, pred, gt in zip(distances, predictions, ground_truths)
+    ]
+
+
+def _levenshtein_reference(s1: str, s2: str) -> int:
+    """The previous pure-Python O(n*m) implementation (kept for the microbenchmark)."""
+    if len(s1) < len(s2):
+        return _levenshtein_reference(s2, s1)
+    if len(s2) == 0:
+        return len(s1)
+
+    previous_row = range(len(s2) + 1)
+    for i, c1 in enumerate(s1):
+        current_row = [i + 1]
+        for j, c2 in enumerate(s2):
+            insertions = previous_row[j + 1] + 1
+            deletions = current_row[j] + 1
+            substitutions = previous_row[j] + (c1 != c2)
+            current_row.append(min(insertions, deletions, substitutions))
+        previous_row = current_row
+    return previous_row[-1]
+
+
+def _benchmark() -> None:
+    """Compare against the reference on synthetic OCR-like field pairs."""
+    import random
+    import string
+    import time
+
+    rng = random.Random(0)
+    alphabet = string.ascii_uppercase + string.digits + " ,.-/"
+
+    def noisy(text: str, rate: float) -> str:
+        out = []
+        for c in text:
+            r = rng.random()
+            if r < rate / 3:
+                continue  # deletion
+            if r < 2 * rate / 3:
+                out.append(rng.choice(alphabet))  # substitution
+            elif r < rate:
+                out.extend([c, rng.choice(alphabet)])  # insertion
+            else:
+                out.append(c)
+        return "".join(out)
+
+    # Short codes (lot/part numbers) up to long fields (instructions, addresses)
+    for length, count in [(12, 4000), (60, 1000), (250, 200), (1000, 20)]:
+        pairs = []
+        for _ in range(count):
+            gt = "".join(rng.choice(alphabet) for _ in range(length))
+            pairs.append((noisy(gt, rng.choice([0.0, 0.05, 0.2, 0.6])), gt))
+
+        start = time.perf_counter()
+        expected = [_levenshtein_reference(a, b) for a, b in pairs]
+        reference_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        single = [levenshtein(a, b) for a, b in pairs]
+        single_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        batch = levenshtein_batch(pairs)
+        batch_s = time.perf_counter() - start
+
+        assert single == expected and batch == expected, f"mismatch at length {length}"
+        print(
+            f"[EDIT DISTANCE] len={length:5d} pairs={count:5d} "
+            f"reference={reference_s * 1000:9.1f}ms "
+            f"myers={single_s * 1000:8.1f}ms ({reference_s / single_s:6.1f}x) "
+            f"batch={batch_s * 1000:8.1f}ms ({reference_s / batch_s:6.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    _benchmark()
@@ -0,0 +1,168 @@
+"""
+Pooled HTTP Sessions for Remote Inference
+
+Roboflow detection and SmolVLM2 requests go to the same few hosts on every
+image. One requests.Session per service keeps those TLS connections alive and
+reuses them across images and threads instead of handshaking per request.
+
+- HTTP_POOL_CONNECTIONS: hosts kept in each session's pool
+- HTTP_POOL_MAXSIZE: open connections per host, which also caps concurrent
+  requests per host (callers block for a free connection)
+- HTTP_STATS_EVERY: log request latency and connection reuse every N requests
+
+Per-service stats (request count, errors, latency percentiles, average upload
+size, connection reuse rate) are available from stats() and logged with a
+[HTTP] prefix.
+
+Roboflow takes the API key as a query parameter, so request URLs carry it.
+post() and raise_for_status() redact it from exception messages, which end up
+in logs and in a job's error_message.
+"""
+
+import collections
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.environ.get(name, "") or default))
+    except ValueError:
+        return default
+
+
+class _ServiceStats:
+    """Request counters and recent latencies for one service."""
+
+    def __init__(self, window: int = 1000):
+        self.requests = 0
+        self.errors = 0
+        self.bytes_sent = 0
+        self.latencies_ms: "collections.deque[float]" = collections.deque(maxlen=window)
+        self.lock = threading.Lock()
+
+    def record(self, latency_ms: float, ok: bool, nbytes: int = 0) -> int:
+        with self.lock:
+            self.requests += 1
+            self.bytes_sent += nbytes
+            if not ok:
+                self.errors += 1
+            self.latencies_ms.append(latency_ms)
+            return self.requests
+
+
+_SECRET_PARAM = re.compile(r"((?:api_key|apikey|key)=)[^&\s'\"]+", re.IGNORECASE)
+
+
+def redact(text: str) -> str:
+    """Mask API keys in URLs / messages."""
+    return _SECRET_PARAM.sub(r"\1***", text)
+
+
+_SESSIONS: Dict[str, requests.Session] = {}
+_STATS: Dict[str, _ServiceStats] = {}
+_LOCK = threading.Lock()
+
+
+def get_session(service: str) -> requests.Session:
+    """The keep-alive session for a service ('roboflow', 'smolvlm2', ...), created on first use."""
+    with _LOCK:
+        session = _SESSIONS.get(service)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=_env_int("HTTP_POOL_CONNECTIONS", 4),
+                pool_maxsize=_env_int("HTTP_POOL_MAXSIZE", 8),
+                pool_block=True,
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _SESSIONS[service] = session
+            _STATS[service] = _ServiceStats()
+        return session
+
+
+def post(service: str, url: str, **kwargs: Any) -> requests.Response:
+    """session.post() on the service's pooled session, recording latency."""
+    session = get_session(service)
+    stats = _STATS[service]
+    data = kwargs.get("data")
+    nbytes = len(data) if isinstance(data, (bytes, bytearray, str)) else 0
+    start = time.perf_counter()
+    ok = False
+    try:
+        response = session.post(url, **kwargs)
+        ok = response.status_code < 400
+        return response
+    except requests.RequestException as e:
+        # Same exception type (callers classify on it), without the key-bearing URL or its cause chain
+        raise type(e)(redact(str(e)), response=e.response) from None
+    finally:
+        count = stats.record((time.perf_counter() - start) * 1000, ok, nbytes)
+        every = _env_int("HTTP_STATS_EVERY", 200)
+        if count % every == 0:
+            log_stats(service)
+
+
+def raise_for_status(response: requests.Response) -> None:
+    """response.raise_for_status() with the API key redacted from the message."""
+    if response.status_code >= 400:
+        raise requests.HTTPError(
+            f"{response.status_code} {response.reason} for url: {redact(response.url)}", response=response
+        )
+
+
+def _connection_counts(session: requests.Session) -> Optional[Dict[str, int]]:
+    """New connections opened vs requests sent, summed over the session's urllib3 pools."""
+    opened = sent = 0
+    try:
+        for adapter in {id(a): a for a in session.adapters.values()}.values():
+            pools = adapter.poolmanager.pools
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                opened += int(getattr(pool, "num_connections", 0))
+                sent += int(getattr(pool, "num_requests", 0))
+    except Exception:
+        return None
+    return {"connections": opened, "requests": sent}
+
+
+def stats(service: str) -> Dict[str, Any]:
+    """Request count, errors, latency (ms) percentiles and connection reuse rate for a service."""
+    session = _SESSIONS.get(service)
+    service_stats = _STATS.get(service)
+    if session is None or service_stats is None:
+        return {"requests": 0}
+
+    with service_stats.lock:
+        latencies = sorted(service_stats.latencies_ms)
+        result: Dict[str, Any] = {"requests": service_stats.requests, "errors": service_stats.errors}
+        if service_stats.requests:
+            result["payload_kb_avg"] = round(service_stats.bytes_sent / service_stats.requests / 1024, 1)
+    if latencies:
+        result["latency_ms_p50"] = round(latencies[len(latencies) // 2], 1)
+        result["latency_ms_p95"] = round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 1)
+        result["latency_ms_max"] = round(latencies[-1], 1)
+
+    counts = _connection_counts(session)
+    if counts and counts["requests"]:
+        result["connections_opened"] = counts["connections"]
+        result["connection_reuse_rate"] = round(1.0 - counts["connections"] / counts["requests"], 3)
+    return result
+
+
+def log_stats(service: Optional[str] = None) -> None:
+    """Print stats for one service, or every service that has sent requests."""
+    services = [service] if service else list(_SESSIONS)
+    for name in services:
+        service_stats = stats(name)
+        if service_stats.get("requests"):
+            print(f"[HTTP] {name}: {service_stats}")
@@ -6,9 +6,17 @@ This module handles:
 - Running inference on images
 - Cropping detected regions for OCR processing
 """
+import os
+import base64
+import hashlib
+import json
+import re
+import tempfile
 import cv2
 import numpy as np
 import time
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
@@ -22,6 +30,8 @@ if not hasattr(Image, 'ANTIALIAS'):
 
 from roboflow import Roboflow
 
+import http_pool
+
 from config import (
     ROBOFLOW_API_KEY,
     ROBOFLOW_WORKSPACE,
@@ -61,6 +71,103 @@ def retry_on_api_error(max_retries: int = 3, delay: float = 1.0):
     return decorator
 
 
+class RateLimiter:
+    """
+    Thread-safe token bucket: acquire() blocks until a request may be sent.
+
+    rate_per_s <= 0 disables limiting.
+    """
+
+    def __init__(self, rate_per_s: float, burst: Optional[int] = None):
+        self.rate = float(rate_per_s)
+        self.capacity = float(burst if burst is not None else max(1, int(self.rate) or 1))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                wait = (1.0 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+# Shared by every detector (and thread) in this process, so concurrency never exceeds
+# the configured request rate or number of in-flight requests.
+ROBOFLOW_MAX_IN_FLIGHT = max(1, int(os.environ.get("ROBOFLOW_MAX_IN_FLIGHT", "4") or "4"))
+_RATE_LIMITER = RateLimiter(float(os.environ.get("ROBOFLOW_MAX_RPS", "0") or "0"))
+_IN_FLIGHT = threading.BoundedSemaphore(ROBOFLOW_MAX_IN_FLIGHT)
+_EXECUTOR: Optional[ThreadPoolExecutor] = None
+_EXECUTOR_LOCK = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is None:
+            _EXECUTOR = ThreadPoolExecutor(max_workers=ROBOFLOW_MAX_IN_FLIGHT, thread_name_prefix="roboflow")
+        return _EXECUTOR
+
+
+DEFAULT_MODEL_CACHE_DIR = "/tmp/box_label_ocr/roboflow_models"
+
+
+def _model_cache_path(api_key: str, workspace: str, project: str, version: int) -> Path:
+    root = Path(os.environ.get("ROBOFLOW_MODEL_CACHE_DIR", "") or DEFAULT_MODEL_CACHE_DIR)
+    # The key hash keeps handles resolved under different accounts apart without storing the key
+    key_hash = hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:12]
+    name = re.sub(r"[^A-Za-z0-9._-]+", "-", f"{workspace}_{project}_v{version}_{key_hash}")
+    return root / f"{name}.json"
+
+
+def _load_model_handle(path: Path) -> Optional[dict]:
+    """Cached model handle, or None if missing, unreadable or older than ROBOFLOW_MODEL_CACHE_TTL_SECONDS."""
+    ttl_s = float(os.environ.get("ROBOFLOW_MODEL_CACHE_TTL_SECONDS", "86400") or 0)
+    if ttl_s <= 0:
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            handle = json.load(f)
+        if time.time() - float(handle["resolved_at"]) > ttl_s:
+            return None
+        if not handle.get("project"):
+            return None
+        return handle
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        print(f"[ROBOFLOW] Ignoring unreadable model cache {path}: {type(e).__name__}: {e}")
+        return None
+
+
+def _store_model_handle(path: Path, handle: dict) -> None:
+    """Write the handle atomically (temp file + rename); failures are logged, not raised."""
+    tmp_path: Optional[str] = None
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=".tmp_", suffix=".json", dir=str(path.parent))
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(handle, f)
+        os.replace(tmp_path, path)
+        tmp_path = None
+    except OSError as e:
+        print(f"[ROBOFLOW] Failed to write model cache {path}: {type(e).__name__}: {e}")
+    finally:
+        if tmp_path:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+
+
 @dataclass
 class Detection:
     """Represents a single detection from the model."""
@@ -93,6 +200,10 @@ class Detection:
         return (self.x_min, self.y_min, self.x_max, self.y_max)
 
 
+# Model type _predict_bytes builds requests for (confidence/overlap query params, box predictions)
+OBJECT_DETECTION = "object-detection"
+
+
 class RoboflowDetector:
     """Wrapper for Roboflow object detection model."""
 
@@ -122,10 +233,139 @@ class RoboflowDetector:
         if not self.api_key:
             raise ValueError("ROBOFLOW_API_KEY not set. Please set it in .env file or environment.")
 
-        # Initialize Roboflow client
-        self.rf = Roboflow(api_key=self.api_key)
-        self.project = self.rf.workspace(self.workspace).project(self.project_name)
-        self.model = self.project.version(self.version).model
+        # SDK objects are only built if something asks for them (see the rf/project/model properties)
+        self._rf = None
+        self._project = None
+        self._model = None
+
+        # Hosted inference endpoint; images are posted to it from memory (see _predict_bytes)
+        self._detect_url = (os.environ.get("ROBOFLOW_DETECT_URL", "") or "https://detect.roboflow.com").rstrip("/")
+        self.request_timeout_s = float(os.environ.get("ROBOFLOW_TIMEOUT_SECONDS", "30"))
+
+        # Resolved model handle: cached on disk so workers skip the workspace/project/version round trips
+        self._handle_path = _model_cache_path(self.api_key, self.workspace, self.project_name, self.version)
+        self._handle_lock = threading.Lock()
+        handle = _load_model_handle(self._handle_path)
+        self.handle_from_cache = handle is not None
+        if handle is None:
+            handle = self._resolve_model_handle()
+            _store_model_handle(self._handle_path, handle)
+        self._apply_handle(handle)
+
+    def _resolve_model_handle(self) -> dict:
+        """Resolve the model through the Roboflow SDK (several API round trips)."""
+        project = self.project
+        # Project ids look like "<workspace>/<project slug>"
+        slug = str(getattr(project, "id", "") or self.project_name).split("/")[-1]
+        classes = getattr(project, "classes", None) or {}
+        return {
+            "workspace": self.workspace,
+            "project": slug,
+            "version": self.version,
+            "type": str(getattr(project, "type", "") or ""),
+            "classes": sorted(classes) if isinstance(classes, dict) else list(classes),
+            "resolved_at": time.time(),
+        }
+
+    def _apply_handle(self, handle: dict) -> None:
+        """Use a resolved handle; only object-detection models match the request _predict_bytes sends."""
+        model_type = handle.get("type", "")
+        if model_type and model_type != OBJECT_DETECTION:
+            raise ValueError(
+                f"Roboflow model {self.workspace}/{self.project_name}/{self.version} is a {model_type} model; "
+                f"RoboflowDetector only supports {OBJECT_DETECTION}"
+            )
+        self.project_slug = handle["project"]
+        self.model_type = model_type
+        self.classes = handle.get("classes", [])
+        self.predict_url = f"{self._detect_url}/{self.project_slug}/{self.version}"
+
+    def _refresh_handle(self, stale_url: str) -> None:
+        """Re-resolve the model through the SDK after its cached handle led to a 404."""
+        with self._handle_lock:
+            if self.predict_url != stale_url:
+                return  # another thread already refreshed it
+            print(f"[ROBOFLOW] {http_pool.redact(stale_url)} returned 404; re-resolving the model handle")
+            try:
+                self._handle_path.unlink()
+            except OSError:
+                pass
+            # Fresh SDK lookups (the project/model properties cache their objects)
+            self._project = None
+            self._model = None
+            handle = self._resolve_model_handle()
+            _store_model_handle(self._handle_path, handle)
+            self.handle_from_cache = False
+            self._apply_handle(handle)
+
+    @property
+    def rf(self) -> Roboflow:
+        if self._rf is None:
+            self._rf = Roboflow(api_key=self.api_key)
+        return self._rf
+
+    @property
+    def project(self):
+        if self._project is None:
+            self._project = self.rf.workspace(self.workspace).project(self.project_name)
+        return self._project
+
+    @property
+    def model(self):
+        if self._model is None:
+            self._model = self.project.version(self.version).model
+        return self._model
+
+    def _encode_payload(self, image: np.ndarray, max_dimension: int) -> Tuple[bytes, float]:
+        """
+        JPEG-encode the detector input in memory, downscaled to max_dimension.
+
+        Returns (jpeg bytes, scale applied to the image).
+        """
+        h, w = image.shape[:2]
+        scale = 1.0
+        quality = 90
+        if max(h, w) > max_dimension:
+            scale = max_dimension / max(h, w)
+            new_w, new_h = int(w * scale), int(h * scale)
+            image = cv2.resize(image, (new_w, new_h), interpolation=cv2.INTER_AREA)
+            quality = 85
+        ok, buf = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, quality])
+        if not ok:
+            raise ValueError("Could not encode image for detection")
+        return buf.tobytes(), scale
+
+    def _predict_bytes(self, payload: bytes, confidence_threshold: float) -> dict:
+        """
+        POST an encoded image to the hosted model (same request the SDK's predict() sends
+        for an object-detection model).
+
+        Goes through the pooled keep-alive session, so consecutive images reuse one TLS connection.
+        A 404 on a handle loaded from the disk cache re-resolves the model and retries once.
+        """
+        body = base64.b64encode(payload)
+        for attempt in range(2):
+            url = self.predict_url
+            response = http_pool.post(
+                "roboflow",
+                url,
+                params={
+                    "api_key": self.api_key,
+                    "confidence": int(confidence_threshold * 100),
+                    "overlap": 30,
+                    "format": "json",
+                },
+                data=body,
+                headers={"Content-Type": "application/x-www-form-urlencoded"},
+                timeout=self.request_timeout_s,
+            )
+            if response.status_code == 404 and self.handle_from_cache and attempt == 0:
+                # The cached handle may point at a model that no longer exists
+                self._refresh_handle(url)
+                continue
+            break
+        http_pool.raise_for_status(response)
+        return response.json()
 
     @retry_on_api_error(max_retries=3, delay=1.0)
     def detect(
@@ -133,6 +373,7 @@ class RoboflowDetector:
         image_path: str,
         confidence_threshold: float = DETECTION_CONFIDENCE_THRESHOLD,
         max_dimension: int = 1024,
+        image: Optional[np.ndarray] = None,
     ) -> List[Detection]:
         """
         Run object detection on an image.
@@ -141,34 +382,23 @@ class RoboflowDetector:
             image_path: Path to the image file
             confidence_threshold: Minimum confidence to include detection
             max_dimension: Maximum image dimension (resizes if larger to avoid 413 errors)
+            image: The image already decoded by the caller (BGR); read from image_path if omitted
 
         Returns:
             List of Detection objects
         """
-        import tempfile
-        import os as _os
-
-        # Check if image needs resizing (Roboflow has ~1MB limit)
-        image = cv2.imread(image_path)
-        h, w = image.shape[:2]
-        scale = 1.0
-
-        if max(h, w) > max_dimension:
-            scale = max_dimension / max(h, w)
-            new_w, new_h = int(w * scale), int(h * scale)
-            image = cv2.resize(image, (new_w, new_h), interpolation=cv2.INTER_AREA)
-
-            # Save to temp file for prediction
-            with tempfile.NamedTemporaryFile(suffix='.jpg', delete=False) as tmp:
-                cv2.imwrite(tmp.name, image, [cv2.IMWRITE_JPEG_QUALITY, 85])
-                predict_path = tmp.name
-        else:
-            predict_path = image_path
+        if image is None:
+            image = load_image(image_path)
 
         try:
-            # Run inference
-            result = self.model.predict(predict_path, confidence=int(confidence_threshold * 100))
-            predictions = result.json()["predictions"]
+            # Downscale (Roboflow has ~1MB limit) and encode in memory, no temp file
+            payload, scale = self._encode_payload(image, max_dimension)
+
+            # Run inference (each attempt, including retries, takes a rate-limit token and an in-flight slot)
+            _RATE_LIMITER.acquire()
+            with _IN_FLIGHT:
+                result = self._predict_bytes(payload, confidence_threshold)
+            predictions = result["predictions"]
 
             detections = []
             for pred in predictions:
@@ -191,13 +421,19 @@ class RoboflowDetector:
             print(f"Error detecting objects in {image_path}: {e}")
             raise
 
-        finally:
-            # Clean up temp file if created
-            if predict_path != image_path:
-                try:
-                    _os.unlink(predict_path)
-                except OSError as cleanup_err:
-                    print(f"Warning: Could not clean up temp file {predict_path}: {cleanup_err}")
+    def submit_detect(
+        self,
+        image_path: str,
+        confidence_threshold: float = DETECTION_CONFIDENCE_THRESHOLD,
+        image: Optional[np.ndarray] = None,
+    ) -> "Future[List[Detection]]":
+        """
+        Start detect() on a shared background thread pool and return its Future.
+
+        Lets callers keep up to ROBOFLOW_MAX_IN_FLIGHT requests outstanding while they
+        work on earlier images; retries and rate limiting behave exactly as in detect().
+        """
+        return _get_executor().submit(self.detect, image_path, confidence_threshold, image=image)
 
     def crop_detections(
         self,
@@ -255,13 +491,11 @@ class RoboflowDetector:
         Returns:
             Tuple of (list of detections, dict of cropped images)
         """
-        # Load image
-        image = cv2.imread(str(image_path))
-        if image is None:
-            raise ValueError(f"Could not load image: {image_path}")
+        # Load image once; detection and cropping share it
+        image = load_image(image_path)
 
         # Detect
-        detections = self.detect(image_path, confidence_threshold)
+        detections = self.detect(image_path, confidence_threshold, image=image)
 
         # Crop
         crops = self.crop_detections(image, detections, padding)
@@ -0,0 +1,216 @@
+"""
+Property tests for the edit distance engine (edit_distance.py).
+
+Every implementation is checked against a plain dynamic program on fuzzed
+strings, around the bit-vector / batch boundaries (64, 128 characters), on
+empty strings and on pairs with long common prefixes/suffixes.
+
+Run with:
+    cd OCR_scripts
+    python -m pytest test_edit_distance.py
+"""
+import random
+
+import pytest
+
+import edit_distance
+from edit_distance import (
+    BATCH_MAX_LENGTH,
+    BATCH_MIN_GROUP,
+    character_error_rate,
+    character_error_rates,
+    levenshtein,
+    levenshtein_batch,
+)
+
+
+def plain_levenshtein(s1: str, s2: str) -> int:
+    """Full (len(s1)+1) x (len(s2)+1) table, no shortcuts."""
+    table = [[0] * (len(s2) + 1) for _ in range(len(s1) + 1)]
+    for i in range(len(s1) + 1):
+        table[i][0] = i
+    for j in range(len(s2) + 1):
+        table[0][j] = j
+    for i in range(1, len(s1) + 1):
+        for j in range(1, len(s2) + 1):
+            table[i][j] = min(
+                table[i - 1][j] + 1,
+                table[i][j - 1] + 1,
+                table[i - 1][j - 1] + (s1[i - 1] != s2[j - 1]),
+            )
+    return table[len(s1)][len(s2)]
+
+
+# Small alphabets make matches (and ambiguous alignments) common; the last one is non-ASCII
+ALPHABETS = ["ab", "ACGT", "ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789 -/", "äöü€日本"]
+
+# Lengths either side of the 64-bit word size, the NumPy cut-off and beyond
+BOUNDARY_LENGTHS = [0, 1, 2, 31, 32, 33, 63, 64, 65, 127, 128, 129, 130, 200]
+
+
+def _random_string(rng: random.Random, length: int, alphabet: str) -> str:
+    return "".join(rng.choice(alphabet) for _ in range(length))
+
+
+def _mutate(rng: random.Random, text: str, alphabet: str, edits: int) -> str:
+    chars = list(text)
+    for _ in range(edits):
+        op = rng.randrange(3)
+        if op == 0 and chars:
+            del chars[rng.randrange(len(chars))]
+        elif op == 1 and chars:
+            chars[rng.randrange(len(chars))] = rng.choice(alphabet)
+        else:
+            chars.insert(rng.randrange(len(chars) + 1), rng.choice(alphabet))
+    return "".join(chars)
+
+
+def _fuzzed_pairs(seed: int, count: int, max_length: int):
+    rng = random.Random(seed)
+    pairs = []
+    for _ in range(count):
+        alphabet = rng.choice(ALPHABETS)
+        s1 = _random_string(rng, rng.randint(0, max_length), alphabet)
+        if rng.random() < 0.5:
+            # OCR-like: the prediction is a noisy copy of the ground truth
+            s2 = _mutate(rng, s1, alphabet, rng.randint(0, 6))
+        else:
+            s2 = _random_string(rng, rng.randint(0, max_length), alphabet)
+        pairs.append((s1, s2))
+    return pairs
+
+
+def _boundary_pairs(seed: int):
+    rng = random.Random(seed)
+    pairs = []
+    for n in BOUNDARY_LENGTHS:
+        for m in BOUNDARY_LENGTHS:
+            alphabet = rng.choice(ALPHABETS)
+            s1 = _random_string(rng, n, alphabet)
+            s2 = _random_string(rng, m, alphabet)
+            pairs.append((s1, s2))
+        base = _random_string(rng, n, "ACGT")
+        pairs.append((base, _mutate(rng, base, "ACGT", 3)))
+    return pairs
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_levenshtein_matches_plain_dp_on_fuzzed_pairs(seed):
+    for s1, s2 in _fuzzed_pairs(seed, 150, 90):
+        assert levenshtein(s1, s2) == plain_levenshtein(s1, s2), (s1, s2)
+
+
+def test_levenshtein_matches_plain_dp_around_word_boundaries():
+    for s1, s2 in _boundary_pairs(0):
+        expected = plain_levenshtein(s1, s2)
+        assert levenshtein(s1, s2) == expected, (len(s1), len(s2))
+        assert levenshtein(s2, s1) == expected, (len(s2), len(s1))
+
+
+def test_empty_strings():
+    assert levenshtein("", "") == 0
+    assert levenshtein("abc", "") == 3
+    assert levenshtein("", "abc") == 3
+    assert levenshtein_batch([("", ""), ("abc", ""), ("", "abcd"), ("x", "x")]) == [0, 3, 4, 0]
+    assert character_error_rate("", "") == 0.0
+    assert character_error_rate("abc", "") == 1.0
+    assert character_error_rate("", "abc") == 1.0
+    assert character_error_rates(["", "abc", ""], ["", "", "abc"]) == [0.0, 1.0, 1.0]
+
+
+@pytest.mark.parametrize(
+    "s1,s2",
+    [
+        ("LOT12345X", "LOT12345"),
+        ("LOT12345", "LOT12345X"),
+        ("XLOT12345", "LOT12345"),
+        ("aaaa", "aaa"),
+        ("abab", "ab"),
+        ("abcabc", "abc"),
+        ("prefix-middle-suffix", "prefix-MIDDLE-suffix"),
+        ("prefix-suffix", "prefix-inserted-suffix"),
+        ("a" * 150 + "b" + "a" * 150, "a" * 301),
+        ("x" * 70 + "abc" + "y" * 70, "x" * 70 + "acb" + "y" * 70),
+    ],
+)
+def test_common_affixes(s1, s2):
+    expected = plain_levenshtein(s1, s2)
+    assert levenshtein(s1, s2) == expected
+    assert levenshtein_batch([(s1, s2)] * BATCH_MIN_GROUP) == [expected] * BATCH_MIN_GROUP
+
+
+def test_affix_stripping_keeps_the_distance():
+    rng = random.Random(1)
+    for _ in range(200):
+        core1 = _random_string(rng, rng.randint(0, 20), "ab")
+        core2 = _random_string(rng, rng.randint(0, 20), "ab")
+        prefix = _random_string(rng, rng.randint(0, 80), "ab")
+        suffix = _random_string(rng, rng.randint(0, 80), "ab")
+        s1, s2 = prefix + core1 + suffix, prefix + core2 + suffix
+        a, b = edit_distance._strip_affixes(s1, s2)
+        assert plain_levenshtein(a, b) == plain_levenshtein(s1, s2)
+        assert levenshtein(s1, s2) == plain_levenshtein(s1, s2)
+
+
+@pytest.fixture
+def numpy_groups(monkeypatch):
+    """Sizes of the groups levenshtein_batch sent through the NumPy DP."""
+    sizes = []
+    group = edit_distance._levenshtein_group
+
+    def counted(pairs):
+        sizes.append(len(pairs))
+        return group(pairs)
+
+    monkeypatch.setattr(edit_distance, "_levenshtein_group", counted)
+    return sizes
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_batch_matches_plain_dp_on_fuzzed_pairs(seed, numpy_groups):
+    pairs = _fuzzed_pairs(seed, 400, 140)
+    assert levenshtein_batch(pairs) == [plain_levenshtein(s1, s2) for s1, s2 in pairs]
+    assert numpy_groups, "no group was large enough for the NumPy path"
+
+
+@pytest.mark.parametrize("length", [63, 64, 65, 127, BATCH_MAX_LENGTH, BATCH_MAX_LENGTH + 1])
+def test_batch_matches_plain_dp_at_length_boundaries(length, numpy_groups):
+    rng = random.Random(length)
+    pairs = []
+    # A full group per length offset: the batch buckets pairs by length bits
+    for offset in (-1, 0, 1):
+        for _ in range(BATCH_MIN_GROUP):
+            alphabet = rng.choice(ALPHABETS)
+            # Distinct first/last characters so the affix stripping leaves the full length
+            s1 = "<" + _random_string(rng, length - 2, alphabet) + ">"
+            s2 = "[" + _random_string(rng, length - 2 + offset, alphabet) + "]"
+            pairs.append((s1, s2))
+    assert levenshtein_batch(pairs) == [plain_levenshtein(s1, s2) for s1, s2 in pairs]
+    if length <= BATCH_MAX_LENGTH:
+        assert numpy_groups
+    else:
+        assert not numpy_groups
+
+
+def test_batch_below_min_group_uses_levenshtein(numpy_groups):
+    pairs = _fuzzed_pairs(7, BATCH_MIN_GROUP - 1, 10)
+    assert levenshtein_batch(pairs) == [plain_levenshtein(s1, s2) for s1, s2 in pairs]
+    assert not numpy_groups
+
+
+def test_character_error_rates_match_plain_dp():
+    pairs = _fuzzed_pairs(11, 300, 60) + _boundary_pairs(2)
+    predictions = [s1 for s1, _ in pairs]
+    ground_truths = [s2 for _, s2 in pairs]
+    expected = [
+        plain_levenshtein(p, g) / len(g) if g else (0.0 if not p else 1.0)
+        for p, g in pairs
+    ]
+    assert character_error_rates(predictions, ground_truths) == pytest.approx(expected)
+    assert [character_error_rate(p, g) for p, g in pairs] == pytest.approx(expected)
+
+
+def test_benchmark_levenshtein_distance_uses_the_engine():
+    benchmark = pytest.importorskip("benchmark")
+    for s1, s2 in _fuzzed_pairs(3, 100, 70):
+        assert benchmark.levenshtein_distance(s1, s2) == plain_levenshtein(s1, s2)
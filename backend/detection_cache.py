@@ -0,0 +1,117 @@
+"""
+Persistent Detection Cache for Box Label OCR
+
+Roboflow detections depend only on the image content, the detector model
+(workspace/project/version) and the confidence threshold, so they are stored
+on disk and shared by every worker process and job on this host:
+
+    <root>/<model key>/<sha256[:2]>/<sha256>.json
+
+Writes go to a temp file and are renamed into place, so concurrent workers
+never read a half-written entry; the worst case is two workers detecting the
+same image once each.
+"""
+
+import json
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import List, Optional
+
+from roboflow_detector import Detection
+
+DEFAULT_DETECTION_CACHE_DIR = "/tmp/box_label_ocr/detection_cache"
+
+
+def detection_cache_enabled() -> bool:
+    return os.environ.get("DETECTION_CACHE", "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+class DetectionCache:
+    """On-disk detections keyed by image hash, detector model and confidence threshold."""
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = Path(root or os.environ.get("DETECTION_CACHE_DIR", "") or DEFAULT_DETECTION_CACHE_DIR)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+
+    def _model_key(self, workspace: str, project: str, version: int, confidence_threshold: float) -> str:
+        raw = f"{workspace}_{project}_v{version}_conf{confidence_threshold:.4f}"
+        return re.sub(r"[^A-Za-z0-9._-]+", "-", raw)
+
+    def _entry_path(
+        self, image_sha256: str, workspace: str, project: str, version: int, confidence_threshold: float
+    ) -> Path:
+        model_key = self._model_key(workspace, project, version, confidence_threshold)
+        return self.root / model_key / image_sha256[:2] / f"{image_sha256}.json"
+
+    def get(
+        self, image_sha256: str, workspace: str, project: str, version: int, confidence_threshold: float
+    ) -> Optional[List[Detection]]:
+        """Return cached detections, or None on a miss (or an unreadable entry)."""
+        path = self._entry_path(image_sha256, workspace, project, version, confidence_threshold)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+            detections = [
+                Detection(
+                    class_name=d["class"],
+                    confidence=float(d["confidence"]),
+                    x=int(d["x"]),
+                    y=int(d["y"]),
+                    width=int(d["width"]),
+                    height=int(d["height"]),
+                )
+                for d in entries
+            ]
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"[DETECTION CACHE] Ignoring unreadable entry {path}: {type(e).__name__}: {e}")
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return detections
+
+    def put(
+        self,
+        image_sha256: str,
+        workspace: str,
+        project: str,
+        version: int,
+        confidence_threshold: float,
+        detections: List[Detection],
+    ) -> None:
+        """Store detections atomically (temp file + rename); failures are logged, not raised."""
+        path = self._entry_path(image_sha256, workspace, project, version, confidence_threshold)
+        payload = [
+            {
+                "class": d.class_name,
+                "confidence": float(d.confidence),
+                "x": int(d.x),
+                "y": int(d.y),
+                "width": int(d.width),
+                "height": int(d.height),
+            }
+            for d in detections
+        ]
+        tmp_path: Optional[str] = None
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(prefix=".tmp_", suffix=".json", dir=str(path.parent))
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(payload, f)
+            os.replace(tmp_path, path)
+            tmp_path = None
+        except OSError as e:
+            print(f"[DETECTION CACHE] Failed to write {path}: {type(e).__name__}: {e}")
+        finally:
+            if tmp_path:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
@@ -10,15 +10,17 @@ import os
 import sys
 import uuid
 import traceback
-import contextlib
+import contextvars
 import threading
-import signal
 from pathlib import Path
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Any
 import json
 import time
-import tempfile
+import hashlib
+import collections
+from concurrent.futures import Future, ThreadPoolExecutor
 
 import pixeltable as pxt
 import numpy as np
@@ -39,10 +41,12 @@ from config import (
     DETECTION_CONFIDENCE_THRESHOLD,
     OCR_CONFIDENCE_THRESHOLD,
 )
-from roboflow_detector import RoboflowDetector, Detection
+from roboflow_detector import RoboflowDetector, Detection, ROBOFLOW_MAX_IN_FLIGHT, load_image
+import http_pool
 from benchmark import (
     normalize_text,
     character_error_rate,
+    character_error_rates,
     word_accuracy,
 )
 
@@ -52,6 +56,9 @@ from pixeltable_schema import (
     get_image_results_table,
     get_benchmark_results_table,
     get_job_summaries_table,
+    get_result_cache_table,
+    get_stage_timeouts_table,
+    get_summary_partials_table,
     setup_all_tables,
     table_insert,
     table_update,
@@ -61,52 +68,20 @@ from pixeltable_schema import (
 )
 
 from preprocessing import preprocess_image
-from smolvlm2_engine import SmolVLM2Engine
+from smolvlm2_engine import SmolVLM2Engine, SMOLVLM2_MAX_IN_FLIGHT
 from superres import is_sr_preprocessing, apply_superres
+from detection_cache import DetectionCache, detection_cache_enabled
+from pipeline import Stage, StagedPipeline
+from timeouts import StageTimeout, call_with_timeout, check_cancelled, time_limit, wait_future
+from write_behind import WriteBehindWriter, write_behind_enabled
+from progress import ProgressReporter
+from summary import SummaryAccumulator
 
+# Bump when the pipeline changes in a way that invalidates memoized per-image results.
+RESULT_CACHE_VERSION = 2
 
-@contextlib.contextmanager
-def _time_limit(seconds: Optional[float], timeout_message: str):
-    """
-    Best-effort wall-clock timeout.
-
-    - Uses SIGALRM when available (Linux/macOS, main thread only).
-    - Falls back to no-op on platforms/threads where SIGALRM isn't usable.
-    """
-    if seconds is None or seconds <= 0:
-        yield
-        return
-
-    if not hasattr(signal, "SIGALRM"):
-        yield
-        return
-
-    if threading.current_thread() is not threading.main_thread():
-        yield
-        return
-
-    start = time.monotonic()
-    old_handler = signal.getsignal(signal.SIGALRM)
-    old_timer = signal.getitimer(signal.ITIMER_REAL)
-
-    def _handler(signum, frame):
-        raise TimeoutError(timeout_message)
-
-    signal.signal(signal.SIGALRM, _handler)
-    signal.setitimer(signal.ITIMER_REAL, float(seconds))
-    try:
-        yield
-    finally:
-        # Cancel our timer and restore previous handler/timer (supports nesting).
-        signal.setitimer(signal.ITIMER_REAL, 0)
-        signal.signal(signal.SIGALRM, old_handler)
-
-        old_remaining, old_interval = old_timer
-        if old_remaining and old_remaining > 0:
-            elapsed = time.monotonic() - start
-            remaining = max(0.0, float(old_remaining) - elapsed)
-            if remaining > 0:
-                signal.setitimer(signal.ITIMER_REAL, remaining, float(old_interval))
+# Write-behind insert order: an image's benchmark rows before the image_results row that checkpoints it
+_WRITE_ORDER = ["benchmark_results", "image_results", "stage_timeouts"]
 
 
 def _get_rss_mb() -> Optional[float]:
@@ -135,6 +110,44 @@ def _get_rss_mb() -> Optional[float]:
         return None
 
 
+@dataclass
+class _ImageWork:
+    """One image moving through the run_inference pipeline stages."""
+    image_path: Path
+    deadline: float = 0.0
+    digest: Optional[str] = None
+    cached: bool = False
+    detections: List[Detection] = field(default_factory=list)
+    crops: Dict[str, np.ndarray] = field(default_factory=dict)
+    predictions: Dict[str, str] = field(default_factory=dict)
+    failures: List[str] = field(default_factory=list)
+    # Stages whose time limit fired for this image (recorded in stage_timeouts)
+    timeouts: List[str] = field(default_factory=list)
+    processing_time_ms: float = 0.0
+    done: bool = False
+    # Decoded pixels (BGR), kept from the lookahead until the image is cropped
+    image: Optional[np.ndarray] = None
+    # Roboflow request started ahead of the detect stage (see _detection_lookahead)
+    detection_future: Optional[Future] = None
+    # _cached_detections() result from the lookahead, reused by the detect stage
+    detection_lookup: Optional[Tuple[Optional[List[Detection]], Optional[tuple]]] = None
+
+
+class JobStopped(Exception):
+    """A shard stopped because its job already ended elsewhere (a sibling failed, or it was cancelled)."""
+
+
+# Job states after which sibling shards stop processing
+_ENDED_STATUSES = ("completed", "failed", "cancelled")
+
+
+def _env_int(name: str, default: int, minimum: int = 1) -> int:
+    try:
+        return max(minimum, int(os.environ.get(name, "") or default))
+    except ValueError:
+        return default
+
+
 class InferenceService:
     """Service for running OCR inference and storing results in Pixeltable."""
 
@@ -143,8 +156,19 @@ class InferenceService:
         self.detector: Optional[RoboflowDetector] = None
         self.easyocr_reader = None
         self.paddleocr_engine = None
+        self.paddle_rec_model = None
+        self.paddle_textline_cls = None
         self.smolvlm2_engine: Optional[SmolVLM2Engine] = None
+        self.detection_cache: Optional[DetectionCache] = None
         self.use_gpu: bool = False
+        # (path, mtime_ns, size) -> sha256, so each image file is hashed once per worker
+        self._digests: Dict[Tuple[str, int, int], str] = {}
+        # Crop OCR thread pool (OCR_THREADS > 1); its threads keep their own engine instances
+        self._crop_pool: Optional[ThreadPoolExecutor] = None
+        self._crop_pool_size = 0
+        self._ocr_local = threading.local()
+        # Bumped whenever shared engines are dropped, so thread-local copies are rebuilt too
+        self._engine_generation = 0
 
         # Resolve GPU usage once (can be overridden per-run via run_inference(use_gpu=...))
         if use_gpu is None:
@@ -199,14 +223,44 @@ class InferenceService:
             # Re-init OCR engines with the correct device setting
             self.easyocr_reader = None
             self.paddleocr_engine = None
+            self.paddle_rec_model = None
+            self.paddle_textline_cls = None
+            self._engine_generation += 1
         print(f"[GPU] requested={requested} resolved={self.use_gpu}")
 
+    def _engine(self, attr: str, factory):
+        """
+        Return the OCR engine stored in `attr`, creating it with factory() on first use.
+
+        On a crop-pool or pipeline OCR thread (see _use_thread_local_engines) the engine
+        is private to that thread (EasyOCR and Paddle predictors are not safe to call
+        concurrently); elsewhere it is the shared instance on self.
+        """
+        local = getattr(self._ocr_local, "engines", None)
+        if local is None:
+            if getattr(self, attr) is None:
+                setattr(self, attr, factory())
+            return getattr(self, attr)
+
+        if getattr(self._ocr_local, "generation", None) != self._engine_generation:
+            local.clear()
+            self._ocr_local.generation = self._engine_generation
+        if local.get(attr) is None:
+            local[attr] = factory()
+        return local[attr]
+
     def _init_detector(self):
         """Lazy initialization of Roboflow detector."""
         if self.detector is None:
             self.detector = RoboflowDetector()
         return self.detector
 
+    def _init_detection_cache(self) -> Optional[DetectionCache]:
+        """Lazy initialization of the on-disk detection cache (None if DETECTION_CACHE=0)."""
+        if self.detection_cache is None and detection_cache_enabled():
+            self.detection_cache = DetectionCache()
+        return self.detection_cache
+
     def _init_smolvlm2(self) -> SmolVLM2Engine:
         """Lazy initialization of SmolVLM2 engine (Roboflow serverless VLM)."""
         if self.smolvlm2_engine is None:
@@ -215,15 +269,14 @@ class InferenceService:
 
     def _init_easyocr(self, languages: List[str] = None):
         """Lazy initialization of EasyOCR."""
-        if self.easyocr_reader is None:
+        def _create():
             import easyocr
-            languages = languages or ["en"]
-            self.easyocr_reader = easyocr.Reader(languages, gpu=self.use_gpu)
-        return self.easyocr_reader
+            return easyocr.Reader(languages or ["en"], gpu=self.use_gpu)
+        return self._engine("easyocr_reader", _create)
 
     def _init_paddleocr(self, lang: str = "en"):
         """Lazy initialization of PaddleOCR (v3.x API)."""
-        if self.paddleocr_engine is None:
+        def _create():
             import inspect
             from paddleocr import PaddleOCR
             # PaddleOCR 3.x uses simplified API - removed deprecated params
@@ -234,45 +287,150 @@ class InferenceService:
                     kwargs["use_gpu"] = self.use_gpu
                 if "show_log" in sig.parameters:
                     kwargs["show_log"] = False
+                kwargs.update(self._paddle_cpu_threads_kwargs(sig))
             except Exception:
                 # If signature introspection fails, fall back to minimal init
                 pass
-            self.paddleocr_engine = PaddleOCR(**kwargs)
-        return self.paddleocr_engine
+            return PaddleOCR(**kwargs)
+        return self._engine("paddleocr_engine", _create)
+
+    def _paddle_cpu_threads_kwargs(self, sig) -> Dict[str, Any]:
+        """cpu_threads for Paddle predictors created while the crop pool is active."""
+        if self.use_gpu or not self._crop_pool_size or "cpu_threads" not in sig.parameters:
+            return {}
+        return {"cpu_threads": self._intra_op_threads()}
+
+    def _paddle_device_kwargs(self, cls) -> Dict[str, Any]:
+        """Device kwargs for a PaddleOCR 3.x module class, if its signature accepts them."""
+        import inspect
+        try:
+            sig = inspect.signature(cls)
+            kwargs = self._paddle_cpu_threads_kwargs(sig)
+            if "device" in sig.parameters:
+                kwargs["device"] = "gpu" if self.use_gpu else "cpu"
+            return kwargs
+        except Exception:
+            pass
+        return {}
+
+    def _init_paddle_rec(self):
+        """
+        Lazy initialization of the standalone PaddleOCR text-recognition model.
+
+        Unlike _init_paddleocr this skips document orientation, unwarping and text
+        detection; set PADDLE_REC_TEXTLINE_ORIENTATION=1 to also load the textline
+        orientation classifier. PADDLE_REC_MODEL overrides the default rec model.
+        """
+        def _create_rec():
+            try:
+                from paddleocr import TextRecognition
+            except ImportError as e:
+                import paddleocr
+                raise ImportError(
+                    "paddleocr_rec needs paddleocr>=3.0 (TextRecognition); installed: "
+                    f"{getattr(paddleocr, '__version__', 'unknown')}. See backend/requirements.txt."
+                ) from e
+            kwargs = self._paddle_device_kwargs(TextRecognition)
+            model_name = os.environ.get("PADDLE_REC_MODEL", "").strip()
+            if model_name:
+                kwargs["model_name"] = model_name
+            return TextRecognition(**kwargs)
+
+        def _create_cls():
+            if os.environ.get("PADDLE_REC_TEXTLINE_ORIENTATION", "0").strip().lower() not in ("1", "true", "yes", "on"):
+                return None
+            from paddleocr import TextLineOrientationClassification
+            return TextLineOrientationClassification(**self._paddle_device_kwargs(TextLineOrientationClassification))
+
+        rec = self._engine("paddle_rec_model", _create_rec)
+        self._engine("paddle_textline_cls", _create_cls)
+        return rec
+
+    def _paddle_textline_classifier(self):
+        """The textline orientation classifier for this thread, or None if disabled."""
+        local = getattr(self._ocr_local, "engines", None)
+        if local is not None:
+            return local.get("paddle_textline_cls")
+        return self.paddle_textline_cls
+
+    def _paddle_rec_predict(self, crops: List[np.ndarray]) -> List[Dict[str, list]]:
+        """
+        Recognize crops with the standalone Paddle rec model, batched over all their lines.
+
+        Each crop is split into text lines (_text_line_boxes) and every line of every crop
+        goes through one predict() call. Returns one dict per crop with the same
+        'rec_texts'/'rec_scores' contract as the full PaddleOCR pipeline.
+        """
+        rec = self._init_paddle_rec()
+        batch_size = _env_int("OCR_BATCH_SIZE", 16)
+
+        lines: List[np.ndarray] = []
+        owners: List[int] = []
+        for i, crop in enumerate(crops):
+            if crop is None or crop.size == 0:
+                continue
+            grey = self._to_grey(crop)
+            bgr = crop if len(crop.shape) == 3 and crop.shape[2] == 3 else cv2.cvtColor(grey, cv2.COLOR_GRAY2BGR)
+            if bgr.dtype != np.uint8:
+                bgr = np.clip(bgr, 0, 255).astype(np.uint8)
+            for x0, x1, y0, y1 in self._text_line_boxes(grey):
+                lines.append(bgr[y0:y1, x0:x1])
+                owners.append(i)
+
+        out: List[Dict[str, list]] = [{"rec_texts": [], "rec_scores": []} for _ in crops]
+        if not lines:
+            return out
+
+        textline_cls = self._paddle_textline_classifier()
+        if textline_cls is not None:
+            for j, cls_result in enumerate(textline_cls.predict(lines, batch_size=batch_size)):
+                labels = cls_result.get("label_names") or [""]
+                if str(labels[0]).startswith("180"):
+                    lines[j] = cv2.rotate(lines[j], cv2.ROTATE_180)
+
+        results = list(rec.predict(lines, batch_size=batch_size))
+        if len(results) != len(lines):
+            raise RuntimeError(f"Paddle rec returned {len(results)} results for {len(lines)} lines")
+        for owner, result in zip(owners, results):
+            out[owner]["rec_texts"].append(result.get("rec_text", ""))
+            out[owner]["rec_scores"].append(float(result.get("rec_score", 0.0)))
+        return out
+
+    def warm_up(self, engines: List[str]) -> None:
+        """Preload the detector and the given engines so the first job doesn't pay init cost."""
+        for engine in engines:
+            try:
+                if engine == "smolvlm2":
+                    self._init_smolvlm2()
+                    continue
+                self._init_detector()
+                if engine in ("easyocr", "easyocr_rec"):
+                    self._init_easyocr()
+                elif engine == "paddleocr":
+                    self._init_paddleocr()
+                elif engine == "paddleocr_rec":
+                    self._init_paddle_rec()
+                else:
+                    print(f"[WARMUP] Unknown engine '{engine}', skipping")
+            except Exception as e:
+                # Lazy init will retry (and surface the error) when a job needs the engine.
+                print(f"[WARMUP] Failed to preload {engine}: {type(e).__name__}: {e}")
 
     def _run_ocr_on_crop(self, crop: np.ndarray, engine: str, preprocessing: str = "none") -> str:
         """Run OCR on a cropped image region with optional preprocessing.
 
         Args:
             crop: Input image crop as numpy array (BGR format)
-            engine: OCR engine to use ('easyocr' or 'paddleocr')
+            engine: OCR engine to use ('easyocr', 'easyocr_rec', 'paddleocr' or 'paddleocr_rec')
             preprocessing: Preprocessing type to apply before OCR
                            Supports super-resolution types: 'sr_fast_2x', 'sr_quality_2x', 'sr_gans_4x'
 
         Returns:
             Extracted text from the image crop
         """
-        # Check if super-resolution preprocessing is requested
-        if is_sr_preprocessing(preprocessing):
-            # Convert BGR to RGB for ISR models
-            if len(crop.shape) == 3 and crop.shape[2] == 3:
-                crop_rgb = cv2.cvtColor(crop, cv2.COLOR_BGR2RGB)
-            else:
-                crop_rgb = crop
-            
-            # Apply super-resolution
-            print(f"[SR] Applying {preprocessing} to crop shape {crop.shape}")
-            sr_crop_rgb = apply_superres(crop_rgb, preprocessing)
-            
-            # Convert back to BGR for OCR
-            crop = cv2.cvtColor(sr_crop_rgb, cv2.COLOR_RGB2BGR)
-            print(f"[SR] Output shape: {crop.shape}")
-            
-            # No further preprocessing after SR
-            preprocessing = "none"
-        
-        # Apply preprocessing before OCR
-        processed_crop = preprocess_image(crop, preprocessing)
+        check_cancelled()
+        processed_crop = self._prepare_crop(crop, preprocessing)
+        check_cancelled()
 
         if engine == "easyocr":
             reader = self._init_easyocr()
@@ -286,6 +444,19 @@ class InferenceService:
             texts = [text for bbox, text, conf in results if conf >= OCR_CONFIDENCE_THRESHOLD]
             return " ".join(texts)
 
+        elif engine == "easyocr_rec":
+            # Recognition only: the crop is already a detected field, so skip CRAFT
+            reader = self._init_easyocr()
+            grey = self._to_grey(processed_crop)
+            results = reader.recognize(
+                grey,
+                horizontal_list=self._text_line_boxes(grey),
+                free_list=[],
+                batch_size=_env_int("OCR_BATCH_SIZE", 16),
+            )
+            texts = [text for bbox, text, conf in results if conf >= OCR_CONFIDENCE_THRESHOLD]
+            return " ".join(texts)
+
         elif engine == "paddleocr":
             ocr = self._init_paddleocr()
             # PaddleOCR 3.x uses predict() instead of ocr()
@@ -299,20 +470,220 @@ class InferenceService:
             if not results:
                 return ""
 
-            # PaddleOCR 3.x returns list of dicts with 'rec_texts' and 'rec_scores'
-            result = results[0] if results else {}
-            rec_texts = result.get("rec_texts", [])
-            rec_scores = result.get("rec_scores", [])
+            return self._paddle_text(results[0])
 
-            texts = []
-            for text, score in zip(rec_texts, rec_scores):
-                if score >= OCR_CONFIDENCE_THRESHOLD:
-                    texts.append(text)
-            return " ".join(texts)
+        elif engine == "paddleocr_rec":
+            # Recognition only: no document/detection stages for an already-detected field
+            return self._paddle_text(self._paddle_rec_predict([processed_crop])[0])
+
+        else:
+            raise ValueError(f"Unknown OCR engine: {engine}")
+
+    def _to_grey(self, image: np.ndarray) -> np.ndarray:
+        if image.dtype != np.uint8:
+            image = np.clip(image, 0, 255).astype(np.uint8)
+        if len(image.shape) == 2:
+            return image
+        if image.shape[2] == 4:
+            return cv2.cvtColor(image, cv2.COLOR_BGRA2GRAY)
+        return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+    def _text_line_boxes(self, grey: np.ndarray) -> List[List[int]]:
+        """
+        Split a field crop into horizontal text lines for recognition-only OCR.
+
+        Uses the row ink profile of an Otsu-binarized crop: runs of inked rows separated
+        by blank rows become lines. Falls back to the whole crop as one line when the
+        profile is ambiguous (no clear gaps, or more than EASYOCR_REC_MAX_LINES lines).
+
+        Returns EasyOCR horizontal_list boxes: [x_min, x_max, y_min, y_max].
+        """
+        h, w = grey.shape[:2]
+        whole = [[0, w, 0, h]]
+        if h < 16 or w < 4:
+            return whole
+
+        _, binary = cv2.threshold(grey, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        # Ink is the minority class (dark text on light labels, or the reverse)
+        ink = binary == 0 if (binary == 0).mean() < 0.5 else binary == 255
+        inked_rows = ink.sum(axis=1) > max(1, int(0.01 * w))
+
+        lines: List[Tuple[int, int]] = []
+        start = None
+        for y, inked in enumerate(inked_rows):
+            if inked and start is None:
+                start = y
+            elif not inked and start is not None:
+                lines.append((start, y))
+                start = None
+        if start is not None:
+            lines.append((start, h))
+
+        # Drop specks, then require a plausible number of lines
+        min_height = max(4, h // 20)
+        lines = [(y0, y1) for y0, y1 in lines if y1 - y0 >= min_height]
+        if len(lines) <= 1 or len(lines) > _env_int("EASYOCR_REC_MAX_LINES", 4):
+            return whole
+
+        pad = 2
+        return [[0, w, max(0, y0 - pad), min(h, y1 + pad)] for y0, y1 in lines]
+
+    def _paddle_text(self, result) -> str:
+        """Join the confident lines of one PaddleOCR 3.x result (dict with 'rec_texts'/'rec_scores')."""
+        result = result or {}
+        rec_texts = result.get("rec_texts", [])
+        rec_scores = result.get("rec_scores", [])
+
+        texts = []
+        for text, score in zip(rec_texts, rec_scores):
+            if score >= OCR_CONFIDENCE_THRESHOLD:
+                texts.append(text)
+        return " ".join(texts)
+
+    def _prepare_crop(self, crop: np.ndarray, preprocessing: str = "none") -> np.ndarray:
+        """Apply super-resolution or classic preprocessing to a crop before OCR."""
+        # Check if super-resolution preprocessing is requested
+        if is_sr_preprocessing(preprocessing):
+            # Convert BGR to RGB for ISR models
+            if len(crop.shape) == 3 and crop.shape[2] == 3:
+                crop_rgb = cv2.cvtColor(crop, cv2.COLOR_BGR2RGB)
+            else:
+                crop_rgb = crop
+            
+            # Apply super-resolution
+            print(f"[SR] Applying {preprocessing} to crop shape {crop.shape}")
+            sr_crop_rgb = apply_superres(crop_rgb, preprocessing)
+            
+            # Convert back to BGR for OCR
+            crop = cv2.cvtColor(sr_crop_rgb, cv2.COLOR_RGB2BGR)
+            print(f"[SR] Output shape: {crop.shape}")
+            
+            # No further preprocessing after SR
+            preprocessing = "none"
+        
+        # Apply preprocessing before OCR
+        return preprocess_image(crop, preprocessing)
+
+    def _ocr_threads(self) -> int:
+        """Crop OCR threads per image (OCR_THREADS); 1 = serial. Always serial on GPU."""
+        if self.use_gpu:
+            return 1
+        return _env_int("OCR_THREADS", 1)
+
+    def _intra_op_threads(self) -> int:
+        """Threads each OCR call may use internally (OCR_INTRA_OP_THREADS, default cores / OCR_THREADS)."""
+        default = max(1, (os.cpu_count() or 1) // max(1, self._crop_pool_size or self._ocr_threads()))
+        return _env_int("OCR_INTRA_OP_THREADS", default)
+
+    def _get_crop_pool(self) -> Optional[ThreadPoolExecutor]:
+        """
+        Thread pool for crop OCR, or None when OCR_THREADS <= 1.
+
+        Creating it also caps torch/OpenCV intra-op threads so N crops in parallel
+        don't each try to use every core.
+        """
+        size = self._ocr_threads()
+        if size <= 1:
+            return None
+        if self._crop_pool is not None and self._crop_pool_size == size:
+            return self._crop_pool
+        if self._crop_pool is not None:
+            self._crop_pool.shutdown(wait=False)
+
+        self._crop_pool_size = size
+        intra = self._intra_op_threads()
+        cv2.setNumThreads(intra)
+        try:
+            import torch
+            torch.set_num_threads(intra)
+        except Exception:
+            pass
+
+        self._crop_pool = ThreadPoolExecutor(
+            max_workers=size, thread_name_prefix="ocr-crop", initializer=self._use_thread_local_engines
+        )
+        print(f"[OCR THREADS] {size} crop threads, {intra} intra-op threads each")
+        return self._crop_pool
+
+    def _use_thread_local_engines(self) -> None:
+        """Give the calling thread its own OCR engine instances (thread initializer)."""
+        self._ocr_local.engines = {}
+        self._ocr_local.generation = self._engine_generation
+
+    def _ocr_batch_enabled(self) -> bool:
+        return os.environ.get("OCR_BATCH", "0").strip().lower() in ("1", "true", "yes", "on")
+
+    def _ocr_batch(self, crops: List[np.ndarray], engine: str, preprocessing: str = "none") -> List[str]:
+        """
+        Recognize many crops (from one or more images) in as few engine calls as possible.
+
+        PaddleOCR gets the whole list in one predict() call; EasyOCR goes through
+        _easyocr_batched(). Either way each crop is recognized on its own, so the texts
+        match per-crop OCR.
+
+        Returns one text per input crop, in order.
+        """
+        processed = [self._prepare_crop(c, preprocessing) for c in crops]
+
+        if engine == "paddleocr":
+            ocr = self._init_paddleocr()
+            results = list(ocr.predict(processed))
+            if len(results) != len(processed):
+                raise RuntimeError(f"PaddleOCR returned {len(results)} results for {len(processed)} crops")
+            return [self._paddle_text(r) for r in results]
+
+        elif engine == "paddleocr_rec":
+            return [self._paddle_text(r) for r in self._paddle_rec_predict(processed)]
+
+        elif engine in ("easyocr", "easyocr_rec"):
+            return self._easyocr_batched(processed, recognition_only=engine == "easyocr_rec")
 
         else:
             raise ValueError(f"Unknown OCR engine: {engine}")
 
+    def _easyocr_batched(self, crops: List[np.ndarray], recognition_only: bool = False) -> List[str]:
+        """
+        EasyOCR over many crops with the same result as one _run_ocr_on_crop() per crop.
+
+        Crops of identical shape go through one readtext_batched() call (CRAFT runs on
+        them as a single batch; EasyOCR only batches same-sized images without resizing
+        them). With recognition_only, CRAFT is skipped and each crop's text lines
+        (_text_line_boxes) are recognized with recognize(), as easyocr_rec does per crop.
+        """
+        reader = self._init_easyocr()
+        batch_size = _env_int("OCR_BATCH_SIZE", 16)
+        texts: List[str] = [""] * len(crops)
+
+        if recognition_only:
+            for i, crop in enumerate(crops):
+                if crop is None or crop.size == 0:
+                    continue
+                grey = self._to_grey(crop)
+                results = reader.recognize(
+                    grey, horizontal_list=self._text_line_boxes(grey), free_list=[], batch_size=batch_size,
+                )
+                texts[i] = " ".join(text for _, text, conf in results if conf >= OCR_CONFIDENCE_THRESHOLD)
+            return texts
+
+        by_shape: Dict[Tuple[int, ...], List[Tuple[int, np.ndarray]]] = {}
+        for i, crop in enumerate(crops):
+            if crop is None or crop.size == 0:
+                continue
+            # Same RGB conversion as the per-crop path
+            if len(crop.shape) == 3 and crop.shape[2] == 3:
+                crop = cv2.cvtColor(crop, cv2.COLOR_BGR2RGB)
+            by_shape.setdefault(crop.shape, []).append((i, crop))
+
+        for group in by_shape.values():
+            if len(group) == 1:
+                i, crop = group[0]
+                batches = [reader.readtext(crop, batch_size=batch_size)]
+            else:
+                batches = reader.readtext_batched([crop for _, crop in group], batch_size=batch_size)
+            for (i, _), results in zip(group, batches):
+                texts[i] = " ".join(text for _, text, conf in results if conf >= OCR_CONFIDENCE_THRESHOLD)
+        return texts
+
     @retry_on_db_error(max_retries=3, delay=0.5)
     def create_job(
         self,
@@ -320,7 +691,8 @@ class InferenceService:
         dataset_version: str,
         dataset_name: str,
         total_images: int,
-        preprocessing: str = "none"
+        preprocessing: str = "none",
+        use_gpu: Optional[bool] = None,
     ) -> str:
         """Create a new inference job record.
 
@@ -330,6 +702,7 @@ class InferenceService:
             dataset_name: Name of the dataset
             total_images: Total number of images to process
             preprocessing: Preprocessing type to apply
+            use_gpu: Requested GPU setting (kept so a resumed job runs the same way)
 
         Returns:
             job_id: Unique identifier for the job
@@ -350,6 +723,7 @@ class InferenceService:
             "started_at": None,
             "completed_at": None,
             "error_message": None,
+            "use_gpu": use_gpu,
         }])
 
         return job_id
@@ -371,9 +745,15 @@ class InferenceService:
         if processed_images is not None:
             updates["processed_images"] = processed_images
 
-        # Only set started_at when transitioning into running (avoid overwriting it on every progress update)
+        # Only set started_at when transitioning into running: progress updates and the
+        # later shards of a sharded job find the row already running and keep the first time
         if status == "running" and processed_images is None:
-            updates["started_at"] = datetime.now()
+            table_update(
+                jobs_table,
+                {"started_at": datetime.now()},
+                (jobs_table.job_id == job_id)
+                & ((jobs_table.status != "running") | (jobs_table.started_at == None)),
+            )
         elif status in ("completed", "failed"):
             updates["completed_at"] = datetime.now()
 
@@ -383,6 +763,16 @@ class InferenceService:
         # Update using where clause with retry
         table_update(jobs_table, updates, (jobs_table.job_id == job_id))
 
+    @retry_on_db_error(max_retries=3, delay=0.5)
+    def increment_processed_images(self, job_id: str, count: int = 1):
+        """Add to processed_images in the database (shards of one job each report their own progress)."""
+        jobs_table = get_inference_jobs_table()
+        table_update(
+            jobs_table,
+            {"processed_images": jobs_table.processed_images + count},
+            (jobs_table.job_id == job_id),
+        )
+
     @retry_on_db_error(max_retries=3, delay=0.5)
     def store_image_result(
         self,
@@ -395,7 +785,19 @@ class InferenceService:
     ):
         """Store inference result for a single image."""
         results_table = get_image_results_table()
+        table_insert(results_table, [self._image_result_row(
+            job_id, image_filename, image_path, detections, ocr_results, processing_time_ms
+        )])
 
+    def _image_result_row(
+        self,
+        job_id: str,
+        image_filename: str,
+        image_path: str,
+        detections: List[Detection],
+        ocr_results: Dict[str, str],
+        processing_time_ms: float,
+    ) -> dict:
         # Serialize detections to JSON
         detections_json = json.dumps([
             {
@@ -409,7 +811,7 @@ class InferenceService:
         # Serialize OCR results
         ocr_results_json = json.dumps(ocr_results)
 
-        table_insert(results_table, [{
+        return {
             "result_id": str(uuid.uuid4()),
             "job_id": job_id,
             "image_filename": image_filename,
@@ -419,7 +821,7 @@ class InferenceService:
             "ocr_results_json": ocr_results_json,
             "processing_time_ms": processing_time_ms,
             "timestamp": datetime.now(),
-        }])
+        }
 
     @retry_on_db_error(max_retries=3, delay=0.5)
     def store_benchmark_result(
@@ -432,16 +834,27 @@ class InferenceService:
     ):
         """Store benchmark comparison for a single field."""
         benchmark_table = get_benchmark_results_table()
+        table_insert(benchmark_table, [self._benchmark_row(job_id, image_filename, field_name, ground_truth, prediction)])
 
+    def _benchmark_row(
+        self,
+        job_id: str,
+        image_filename: str,
+        field_name: str,
+        ground_truth: str,
+        prediction: str,
+        cer: Optional[float] = None,
+    ) -> dict:
         gt_str = str(ground_truth) if pd.notna(ground_truth) else ""
         pred_str = str(prediction) if prediction else ""
 
         exact = pred_str.strip() == gt_str.strip()
         normalized = normalize_text(pred_str) == normalize_text(gt_str)
-        cer = character_error_rate(pred_str, gt_str)
+        if cer is None:
+            cer = character_error_rate(pred_str, gt_str)
         word_acc = word_accuracy(pred_str, gt_str)
 
-        table_insert(benchmark_table, [{
+        return {
             "benchmark_id": str(uuid.uuid4()),
             "job_id": job_id,
             "image_filename": image_filename,
@@ -452,315 +865,1234 @@ class InferenceService:
             "normalized_match": normalized,
             "character_error_rate": cer,
             "word_accuracy": word_acc,
-        }])
+        }
 
     @retry_on_db_error(max_retries=3, delay=0.5)
-    def calculate_and_store_summary(self, job_id: str, engine: str, dataset_version: str, dataset_name: str):
-        """Calculate aggregate statistics and store job summary."""
-        benchmark_table = get_benchmark_results_table()
-        summary_table = get_job_summaries_table()
+    def calculate_and_store_summary(
+        self,
+        job_id: str,
+        engine: str,
+        dataset_version: str,
+        dataset_name: str,
+        summary: Optional[SummaryAccumulator] = None,
+    ):
+        """
+        Store the job summary.
 
-        # Query all benchmark results for this job with retry
-        results = table_query(benchmark_table, benchmark_table.job_id == job_id)
+        Args:
+            summary: Running accumulator covering every benchmark row of the job; without
+                     one the job's benchmark rows are queried and aggregated once
+        """
+        if summary is None:
+            benchmark_table = get_benchmark_results_table()
+            results = table_query(benchmark_table, benchmark_table.job_id == job_id)
+            if not results or len(results) == 0:
+                return
+            summary = SummaryAccumulator.from_frame(results.to_pandas())
 
-        if not results or len(results) == 0:
+        metrics = summary.summary()
+        if metrics is None:
             return
 
-        # Calculate overall metrics
-        total_fields = len(results)
-        exact_matches = sum(1 for r in results.to_pandas().itertuples() if r.exact_match)
-        normalized_matches = sum(1 for r in results.to_pandas().itertuples() if r.normalized_match)
-        total_cer = sum(r.character_error_rate for r in results.to_pandas().itertuples())
-
-        overall_exact_rate = exact_matches / total_fields if total_fields > 0 else 0
-        overall_normalized_rate = normalized_matches / total_fields if total_fields > 0 else 0
-        overall_cer = total_cer / total_fields if total_fields > 0 else 0
-
-        # Calculate per-field statistics
-        df = results.to_pandas()
-        per_field_stats = {}
-
-        for field_name in df["field_name"].unique():
-            field_df = df[df["field_name"] == field_name]
-            per_field_stats[field_name] = {
-                "exact_match_rate": field_df["exact_match"].mean(),
-                "normalized_match_rate": field_df["normalized_match"].mean(),
-                "average_cer": field_df["character_error_rate"].mean(),
-                "sample_count": len(field_df),
-            }
-
-        # Get unique image count
-        total_images = df["image_filename"].nunique()
-
         # Store summary with retry
+        summary_table = get_job_summaries_table()
         table_insert(summary_table, [{
             "summary_id": str(uuid.uuid4()),
             "job_id": job_id,
             "engine": engine,
             "dataset_version": dataset_version,
             "dataset_name": dataset_name,
-            "total_images": total_images,
-            "overall_exact_match_rate": overall_exact_rate,
-            "overall_normalized_match_rate": overall_normalized_rate,
-            "overall_cer": overall_cer,
-            "per_field_stats_json": json.dumps(per_field_stats),
+            "total_images": metrics["total_images"],
+            "overall_exact_match_rate": metrics["overall_exact_match_rate"],
+            "overall_normalized_match_rate": metrics["overall_normalized_match_rate"],
+            "overall_cer": metrics["overall_cer"],
+            "per_field_stats_json": json.dumps(metrics["per_field_stats"]),
             "created_at": datetime.now(),
         }])
 
-    def run_inference(
+    @retry_on_db_error(max_retries=3, delay=0.5)
+    def save_summary_state(self, job_id: str, summary: SummaryAccumulator, shard_index: int = 0) -> None:
+        """Write a job's (or shard's) running summary state to summary_partials."""
+        partials_table = get_summary_partials_table()
+        where = (partials_table.job_id == job_id) & (partials_table.shard_index == shard_index)
+        state = summary.to_json()
+        now = datetime.now()
+        status = table_update(partials_table, {"state_json": state, "updated_at": now}, where)
+        if not getattr(status, "num_rows", 0):
+            table_insert(partials_table, [
+                {"job_id": job_id, "shard_index": shard_index, "state_json": state, "updated_at": now}
+            ])
+
+    @retry_on_db_error(max_retries=3, delay=0.5)
+    def load_summary_state(self, job_id: str, shard_count: Optional[int] = None) -> Optional[SummaryAccumulator]:
+        """
+        Merge the running summary states of a job's shards (None if none were written).
+
+        With shard_count, only rows of shards 0..shard_count-1 are merged (rows left by an
+        earlier run with more shards are ignored).
+        """
+        partials_table = get_summary_partials_table()
+        where = partials_table.job_id == job_id
+        if shard_count is not None:
+            where = where & (partials_table.shard_index < shard_count)
+        rows = table_query(partials_table, where)
+        if not rows or len(rows) == 0:
+            return None
+        merged = SummaryAccumulator()
+        for row in rows.to_pandas().itertuples():
+            merged.merge(SummaryAccumulator.from_json(row.state_json))
+        return merged
+
+    @retry_on_db_error(max_retries=3, delay=0.5)
+    def clear_summary_state(self, job_id: str) -> None:
+        partials_table = get_summary_partials_table()
+        table_delete(partials_table, (partials_table.job_id == job_id))
+
+    def _complete_summary(
         self,
+        job_id: str,
         engine: str,
-        images_dir: Path,
-        ground_truth_csv: Optional[Path] = None,
-        progress_callback=None,
-        job_id: Optional[str] = None,
-        preprocessing: str = "none",
-        use_gpu: Optional[bool] = None,
-        detection_cache: Optional[Dict[str, List[Detection]]] = None,
-    ) -> str:
-        """
-        Run full inference pipeline on a dataset.
+        dataset_version: str,
+        dataset_name: str,
+        summary: Optional[SummaryAccumulator],
+    ) -> None:
+        """Store the final summary from the running accumulator and drop its partial state."""
+        self.calculate_and_store_summary(job_id, engine, dataset_version, dataset_name, summary)
+        try:
+            self.clear_summary_state(job_id)
+        except Exception as e:
+            print(f"[SUMMARY] Could not clear partial summary for {job_id}: {type(e).__name__}: {e}")
 
-        Args:
-            engine: OCR engine to use ('easyocr' or 'paddleocr')
-            images_dir: Directory containing images
-            ground_truth_csv: Optional path to ground truth CSV
-            progress_callback: Optional callback(job_id, processed, total, current_file)
-            job_id: Optional existing job ID (if not provided, creates new job)
-            preprocessing: Preprocessing type to apply to images before OCR
+    def get_partial_summary(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Summary of the images benchmarked so far by a running job (None if nothing yet)."""
+        summary = self.load_summary_state(job_id)
+        return summary.summary() if summary is not None else None
 
-        Returns:
-            job_id: The ID of the created/used job
-        """
-        if use_gpu is not None:
-            self.set_use_gpu(bool(use_gpu))
+    @retry_on_db_error(max_retries=3, delay=0.5)
+    def _seed_summary(self, job_id: str, image_filenames: set) -> SummaryAccumulator:
+        """Accumulator for the checkpointed images of a resumed job (one query, only on resume)."""
+        benchmark_table = get_benchmark_results_table()
+        results = table_query(benchmark_table, benchmark_table.job_id == job_id)
+        if not results or len(results) == 0:
+            return SummaryAccumulator()
+        df = results.to_pandas()
+        return SummaryAccumulator.from_frame(df[df["image_filename"].isin(image_filenames)])
 
-        # Get list of images
-        image_files = sorted(
+    def _list_image_files(self, images_dir: Path) -> List[Path]:
+        """List dataset images in a stable (sorted) order."""
+        return sorted(
             list(images_dir.glob("*.jpg")) +
             list(images_dir.glob("*.png")) +
             list(images_dir.glob("*.jpeg"))
         )
 
-        if not image_files:
-            raise ValueError(f"No images found in {images_dir}")
+    def _load_ground_truth(self, ground_truth_csv: Optional[Path]) -> Optional[pd.DataFrame]:
+        """Load ground truth indexed by image filename (None if not provided)."""
+        if ground_truth_csv and ground_truth_csv.exists():
+            ground_truth = pd.read_csv(ground_truth_csv)
+            return ground_truth.set_index("Box Label")
+        return None
 
-        # Parse dataset info from path
-        # Expected: .../test_data_OCR/version-1/images/
-        dataset_version = images_dir.parent.name
-        dataset_name = "default"
+    def _image_timeout_s(self, engine: str) -> float:
+        """Wall-clock budget for one image (VLM requests get a larger default)."""
+        default = "240" if engine == "smolvlm2" else "120"
+        return float(os.environ.get("MAX_IMAGE_SECONDS", default))
 
-        # Create job only if not provided
-        if job_id is None:
-            job_id = self.create_job(
-                engine=engine,
-                dataset_version=dataset_version,
-                dataset_name=dataset_name,
-                total_images=len(image_files),
-                preprocessing=preprocessing
-            )
-            # Update status to running (only for newly created jobs)
-            self.update_job_status(job_id, "running")
+    def _empty_predictions(self, engine: str) -> Dict[str, str]:
+        """Predictions stored when an image fails (VLM always returns every field)."""
+        if engine == "smolvlm2":
+            return {field: "" for field in DETECTION_CLASSES}
+        return {}
 
-        # Load ground truth if provided
-        ground_truth = None
-        if ground_truth_csv and ground_truth_csv.exists():
-            ground_truth = pd.read_csv(ground_truth_csv)
-            ground_truth = ground_truth.set_index("Box Label")
+    def _cached_detections(
+        self,
+        detector: RoboflowDetector,
+        image_path: Path,
+        detection_cache: Optional[Dict[str, List[Detection]]] = None,
+    ) -> Tuple[Optional[List[Detection]], Optional[tuple]]:
+        """
+        Look detections up in the per-run detection_cache dict, then in the on-disk
+        DetectionCache shared by all workers.
 
+        Returns (detections or None, on-disk key to store a fresh result under, if any).
+        """
+        cache_key = str(image_path)
+        cached_detections = detection_cache.get(cache_key) if detection_cache is not None else None
+        if cached_detections is not None:
+            return cached_detections, None
+
+        disk_cache = self._init_detection_cache()
+        if disk_cache is None:
+            return None, None
         try:
-            rss_every = int(os.environ.get("LOG_RSS_EVERY_N_IMAGES", "1") or "1")
-            if rss_every < 1:
-                rss_every = 1
-            start_rss = _get_rss_mb()
-            if start_rss is not None:
-                print(f"[MEM] rss_mb={start_rss:.1f} at job start")
+            disk_key = (
+                self._image_digest(image_path),
+                detector.workspace,
+                detector.project_name,
+                detector.version,
+                DETECTION_CONFIDENCE_THRESHOLD,
+            )
+        except OSError as e:
+            print(f"[DETECTION CACHE] Could not hash {image_path.name}: {e}")
+            return None, None
 
-            # SmolVLM2: end-to-end VLM over full image (no detection/cropping, preprocessing ignored)
-            if engine == "smolvlm2":
-                vlm = self._init_smolvlm2()
-                vlm_timeout_s = float(os.environ.get("SMOLVLM_TIMEOUT_SECONDS", "90"))
+        cached_detections = disk_cache.get(*disk_key)
+        if cached_detections is not None and detection_cache is not None:
+            detection_cache[cache_key] = cached_detections
+        return cached_detections, disk_key
 
-                for idx, image_path in enumerate(image_files):
-                    start_time = time.time()
-                    image_filename = image_path.name
-                    image_timeout_s = float(os.environ.get("MAX_IMAGE_SECONDS", "240"))
+    def _detect_image(
+        self,
+        detector: RoboflowDetector,
+        image_path: Path,
+        detection_cache: Optional[Dict[str, List[Detection]]] = None,
+        prefetched: Optional[Future] = None,
+        image: Optional[np.ndarray] = None,
+        lookup: Optional[Tuple[Optional[List[Detection]], Optional[tuple]]] = None,
+    ) -> Tuple[List[Detection], Dict[str, np.ndarray]]:
+        """
+        Decode, detect (or reuse cached detections) and crop one image.
 
-                    try:
-                        with _time_limit(image_timeout_s, f"timeout: smolvlm2_image {image_filename}"):
-                            # Apply preprocessing to the FULL image if requested (VLM still returns JSON keyed by classes).
-                            inference_input_path = str(image_path)
-                            tmp_path: Optional[str] = None
-                            try:
-                                if preprocessing and preprocessing != "none":
-                                    img = cv2.imread(str(image_path))
-                                    if img is None:
-                                        raise ValueError(f"Could not load image: {image_path}")
-                                    processed = preprocess_image(img, preprocessing)
-                                    if processed is None:
-                                        processed = img
-                                    if hasattr(processed, "dtype") and processed.dtype != np.uint8:
-                                        processed = np.clip(processed, 0, 255).astype(np.uint8)
-                                    tmp = tempfile.NamedTemporaryFile(prefix="smolvlm2_", suffix=".png", delete=False)
-                                    tmp_path = tmp.name
-                                    tmp.close()
-                                    ok = cv2.imwrite(tmp_path, processed)
-                                    if not ok:
-                                        raise RuntimeError("Failed to write preprocessed temp image")
-                                    inference_input_path = tmp_path
-
-                                with _time_limit(vlm_timeout_s, f"timeout: smolvlm2_infer {image_filename}"):
-                                    predictions = vlm.extract_all_fields(inference_input_path)
-                            finally:
-                                if tmp_path:
-                                    try:
-                                        os.remove(tmp_path)
-                                    except Exception:
-                                        pass
-                    except Exception as img_error:
-                        img_tb = traceback.format_exc()
-                        print(
-                            f"[SMOLVLM2 IMAGE ERROR] {image_filename}:\n"
-                            f"{type(img_error).__name__}: {img_error}\n{img_tb}"
-                        )
-                        predictions = {field: "" for field in DETECTION_CLASSES}
-
-                    processing_time = (time.time() - start_time) * 1000
-
-                    # Store image result (detections are empty for end-to-end VLM)
-                    self.store_image_result(
-                        job_id=job_id,
-                        image_filename=image_filename,
-                        image_path=str(image_path),
-                        detections=[],
-                        ocr_results=predictions,
-                        processing_time_ms=processing_time,
-                    )
+        Only a miss in both detection caches calls Roboflow. The image is decoded once:
+        the same pixels are encoded in memory for the detector and cropped afterwards.
 
-                    # Store benchmark results if ground truth available
-                    if ground_truth is not None and image_filename in ground_truth.index:
-                        gt_row = ground_truth.loc[image_filename]
-                        for class_name in DETECTION_CLASSES:
-                            csv_column = CLASS_TO_CSV_COLUMN.get(class_name, class_name)
-                            gt_value = gt_row.get(csv_column, "")
-                            pred_value = predictions.get(class_name, "")
-                            self.store_benchmark_result(
-                                job_id=job_id,
-                                image_filename=image_filename,
-                                field_name=class_name,
-                                ground_truth=gt_value,
-                                prediction=pred_value,
-                            )
+        Args:
+            prefetched: Future from detector.submit_detect() already in flight for this image
+            image: Already-decoded image (BGR); decoded from image_path if omitted
+            lookup: _cached_detections() result already obtained for this image (lookahead)
+        """
+        image_filename = image_path.name
+        roboflow_timeout_s = float(os.environ.get("ROBOFLOW_TIMEOUT_SECONDS", "30"))
+
+        if lookup is None:
+            lookup = self._cached_detections(detector, image_path, detection_cache)
+        cached_detections, disk_key = lookup
+        if image is None:
+            image = load_image(str(image_path))
+
+        if cached_detections is not None:
+            if prefetched is not None:
+                prefetched.cancel()
+            detections = cached_detections
+        elif prefetched is not None:
+            # Wait for the request started ahead of time
+            detections = wait_future(prefetched, roboflow_timeout_s, "roboflow_detect", f"roboflow_detect {image_filename}")
+        else:
+            # Run detection (also time-box Roboflow network call)
+            detections = call_with_timeout(
+                detector.detect, roboflow_timeout_s, "roboflow_detect", f"roboflow_detect {image_filename}",
+                str(image_path), DETECTION_CONFIDENCE_THRESHOLD, image=image,
+            )
 
-                    self.update_job_status(job_id, "running", processed_images=idx + 1)
-                    if progress_callback:
-                        progress_callback(job_id, idx + 1, len(image_files), image_filename)
+        if cached_detections is None:
+            if detection_cache is not None:
+                detection_cache[str(image_path)] = detections
+            if disk_key is not None:
+                self.detection_cache.put(*disk_key, detections)
 
-                    if ((idx + 1) % rss_every) == 0:
-                        rss = _get_rss_mb()
-                        if rss is not None:
-                            print(f"[MEM] rss_mb={rss:.1f} after {idx + 1}/{len(image_files)} ({image_filename})")
+        # Crop locally (cached or fresh detections)
+        crops = detector.crop_detections(image, detections, padding=5)
 
-                self.calculate_and_store_summary(job_id, engine, dataset_version, dataset_name)
-                self.update_job_status(job_id, "completed", processed_images=len(image_files))
-                return job_id
+        return detections, crops
 
-            # Default: detection + crop + OCR (EasyOCR/PaddleOCR)
-            detector = self._init_detector()
+    def _detection_lookahead(
+        self,
+        works: Iterable[_ImageWork],
+        detector: Optional[RoboflowDetector],
+        memo: Optional[Dict[str, Any]],
+        detection_cache: Optional[Dict[str, List[Detection]]],
+        depth: int,
+    ) -> Iterator[_ImageWork]:
+        """
+        Start Roboflow requests for the next `depth` images before they reach the detect
+        stage, so up to `depth` detections are in flight while earlier images are OCR'd.
+        Images with a memoized result or cached detections are not sent. Sent images are
+        decoded here and keep their pixels on work.image for cropping, so each is decoded once.
+        """
+        if detector is None or depth <= 0:
+            yield from works
+            return
 
-            for idx, image_path in enumerate(image_files):
-                start_time = time.time()
-                image_filename = image_path.name
-                image_timeout_s = float(os.environ.get("MAX_IMAGE_SECONDS", "120"))
-                roboflow_timeout_s = float(os.environ.get("ROBOFLOW_TIMEOUT_SECONDS", "30"))
+        window: "collections.deque[_ImageWork]" = collections.deque()
+        for work in works:
+            _, cached = self._memo_lookup(memo, work.image_path)
+            if cached is None:
+                # Recorded on the work so the detect stage doesn't look the caches up again
+                work.detection_lookup = self._cached_detections(detector, work.image_path, detection_cache)
+                if work.detection_lookup[0] is None:
+                    try:
+                        work.image = load_image(str(work.image_path))
+                    except ValueError:
+                        # Left to the detect stage, which records the failure for this image
+                        pass
+                    else:
+                        work.detection_future = detector.submit_detect(
+                            str(work.image_path), DETECTION_CONFIDENCE_THRESHOLD, image=work.image
+                        )
+            window.append(work)
+            if len(window) > depth:
+                yield window.popleft()
+        while window:
+            yield window.popleft()
 
-                # Per-image error handling - continue on failures instead of crashing
+    def _vlm_lookahead(
+        self,
+        works: Iterable[_ImageWork],
+        vlm: SmolVLM2Engine,
+        memo: Optional[Dict[str, Any]],
+        preprocessing: str,
+        depth: int,
+    ) -> Iterator[_ImageWork]:
+        """
+        Submit SmolVLM2 requests for the next `depth` images ahead of the detect stage, so
+        a VLM job keeps SMOLVLM2_MAX_IN_FLIGHT requests running instead of one at a time.
+        Images come out in input order; memoized images are not sent.
+        """
+        if depth <= 0:
+            yield from works
+            return
+
+        window: "collections.deque[_ImageWork]" = collections.deque()
+        for work in works:
+            _, cached = self._memo_lookup(memo, work.image_path)
+            if cached is None:
                 try:
-                    # Time-box the entire image pipeline so a single hang can't stall the whole job.
-                    with _time_limit(image_timeout_s, f"timeout: image_pipeline {image_filename}"):
-                        cache_key = str(image_path)
-                        cached_detections = detection_cache.get(cache_key) if detection_cache is not None else None
-
-                        if cached_detections is not None:
-                            detections = cached_detections
-                            # Crop locally using cached detections (avoids repeated Roboflow API calls)
-                            image = cv2.imread(str(image_path))
-                            if image is None:
-                                raise ValueError(f"Could not load image: {image_path}")
-                            crops = detector.crop_detections(image, detections, padding=5)
-                        else:
-                            # Run detection (also time-box Roboflow network call)
-                            with _time_limit(roboflow_timeout_s, f"timeout: roboflow_detect {image_filename}"):
-                                detections, crops = detector.detect_and_crop(
-                                    str(image_path),
-                                    confidence_threshold=DETECTION_CONFIDENCE_THRESHOLD
-                                )
-                            if detection_cache is not None:
-                                detection_cache[cache_key] = detections
+                    payload = self._vlm_payload(work.image_path, preprocessing)
+                except ValueError:
+                    # Left to the detect stage, which records the failure for this image
+                    pass
+                else:
+                    work.detection_future = vlm.submit_extract(str(work.image_path), payload)
+            window.append(work)
+            if len(window) > depth:
+                yield window.popleft()
+        while window:
+            yield window.popleft()
+
+    def _ocr_crops(
+        self,
+        crops: Dict[str, np.ndarray],
+        engine: str,
+        preprocessing: str,
+        image_filename: str,
+        failures: Optional[List[str]] = None,
+    ) -> Dict[str, str]:
+        """Run OCR on each crop with preprocessing; a failing crop yields an empty string.
 
-                        # Run OCR on each crop with preprocessing
-                        ocr_results = {}
-                        for class_name, crop_image in crops.items():
-                            try:
-                                text = self._run_ocr_on_crop(crop_image, engine, preprocessing)
-                                ocr_results[class_name] = text
-                            except Exception as ocr_err:
-                                ocr_tb = traceback.format_exc()
-                                print(f"[OCR ERROR] {class_name} in {image_filename}:\n{type(ocr_err).__name__}: {ocr_err}\n{ocr_tb}")
-                                ocr_results[class_name] = ""
+        With OCR_BATCH=1 all crops go through one batched call first (see _ocr_batch);
+        if that raises, the crops are retried one by one so a bad crop only loses itself.
+        With OCR_THREADS > 1 the per-crop calls (preprocessing included) run on the
+        crop thread pool, each thread with its own engine instance.
 
-                except Exception as img_error:
-                    # Log error with full traceback but continue processing other images
-                    img_tb = traceback.format_exc()
-                    print(f"[IMAGE ERROR] Error processing {image_filename}:\n{type(img_error).__name__}: {img_error}\n{img_tb}")
-                    detections = []
-                    ocr_results = {}
-
-                processing_time = (time.time() - start_time) * 1000
-
-                # Store image result (even if empty due to error)
-                self.store_image_result(
-                    job_id=job_id,
-                    image_filename=image_filename,
-                    image_path=str(image_path),
-                    detections=detections,
-                    ocr_results=ocr_results,
-                    processing_time_ms=processing_time
+        A StageTimeout is not treated as a crop failure: it propagates so the whole
+        image is recorded as timed out.
+
+        Args:
+            failures: If given, class names whose OCR raised are appended to it
+        """
+        if crops and self._ocr_batch_enabled():
+            try:
+                texts = self._ocr_batch(list(crops.values()), engine, preprocessing)
+                return dict(zip(crops.keys(), texts))
+            except StageTimeout:
+                raise
+            except Exception as batch_err:
+                print(f"[OCR BATCH ERROR] {image_filename}: {type(batch_err).__name__}: {batch_err}; retrying per crop")
+
+        pool = self._get_crop_pool() if len(crops) > 1 else None
+        futures: Dict[str, Future] = {}
+        if pool is not None:
+            # Each crop runs under the caller's deadline, so it can stop early (check_cancelled)
+            futures = {
+                class_name: pool.submit(
+                    contextvars.copy_context().run, self._run_ocr_on_crop, crop_image, engine, preprocessing
+                )
+                for class_name, crop_image in crops.items()
+            }
+
+        ocr_results = {}
+        try:
+            for class_name, crop_image in crops.items():
+                try:
+                    if pool is not None:
+                        text = wait_future(futures[class_name], None, "ocr", f"ocr_crop {class_name} {image_filename}")
+                    else:
+                        text = self._run_ocr_on_crop(crop_image, engine, preprocessing)
+                    ocr_results[class_name] = text
+                except StageTimeout:
+                    # The image's budget is spent; the remaining crops would fail the same way
+                    raise
+                except Exception as ocr_err:
+                    ocr_tb = traceback.format_exc()
+                    print(f"[OCR ERROR] {class_name} in {image_filename}:\n{type(ocr_err).__name__}: {ocr_err}\n{ocr_tb}")
+                    ocr_results[class_name] = ""
+                    if failures is not None:
+                        failures.append(class_name)
+        finally:
+            # On a timeout, don't leave queued crops of this image to hold up the next one
+            for future in futures.values():
+                future.cancel()
+        return ocr_results
+
+    def _vlm_upload_settings(self) -> Tuple[str, int, int]:
+        """
+        (format, quality, max dimension) for SmolVLM2 uploads.
+
+        SMOLVLM2_UPLOAD_FORMAT is png, jpeg or webp ('' = PNG for preprocessed images,
+        the original file otherwise); SMOLVLM2_UPLOAD_QUALITY applies to jpeg/webp;
+        SMOLVLM2_UPLOAD_MAX_DIMENSION > 0 downscales larger images before encoding.
+        """
+        fmt = os.environ.get("SMOLVLM2_UPLOAD_FORMAT", "").strip().lower()
+        if fmt == "jpg":
+            fmt = "jpeg"
+        if fmt not in ("", "png", "jpeg", "webp"):
+            print(f"[SMOLVLM2] Unknown SMOLVLM2_UPLOAD_FORMAT '{fmt}', using the default")
+            fmt = ""
+        quality = min(100, _env_int("SMOLVLM2_UPLOAD_QUALITY", 90))
+        max_dimension = _env_int("SMOLVLM2_UPLOAD_MAX_DIMENSION", 0, minimum=0)
+        return fmt, quality, max_dimension
+
+    def _vlm_payload(
+        self,
+        image_path: Path,
+        preprocessing: str,
+        image: Optional[np.ndarray] = None,
+    ) -> Optional[bytes]:
+        """
+        Encoded image to upload to SmolVLM2, or None to send the file unchanged.
+
+        Preprocessing applies to the FULL image (the VLM still returns JSON keyed by
+        classes). The image is downscaled and encoded in memory per _vlm_upload_settings.
+        """
+        fmt, quality, max_dimension = self._vlm_upload_settings()
+        preprocessed = bool(preprocessing) and preprocessing != "none"
+        if not preprocessed and not fmt and not max_dimension:
+            return None
+
+        img = image if image is not None else load_image(str(image_path))
+        processed = preprocess_image(img, preprocessing) if preprocessed else img
+        if processed is None:
+            processed = img
+        if hasattr(processed, "dtype") and processed.dtype != np.uint8:
+            processed = np.clip(processed, 0, 255).astype(np.uint8)
+
+        h, w = processed.shape[:2]
+        if max_dimension and max(h, w) > max_dimension:
+            scale = max_dimension / max(h, w)
+            processed = cv2.resize(processed, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_AREA)
+
+        fmt = fmt or "png"
+        params: List[int] = []
+        if fmt == "jpeg":
+            params = [cv2.IMWRITE_JPEG_QUALITY, quality]
+        elif fmt == "webp":
+            params = [cv2.IMWRITE_WEBP_QUALITY, quality]
+        ok, buf = cv2.imencode(f".{fmt}", processed, params)
+        if not ok:
+            raise RuntimeError(f"Failed to encode image as {fmt}")
+        return buf.tobytes()
+
+    def _vlm_extract(
+        self,
+        vlm: SmolVLM2Engine,
+        image_path: Path,
+        preprocessing: str,
+        image: Optional[np.ndarray] = None,
+        prefetched: Optional[Future] = None,
+    ) -> Dict[str, str]:
+        """Run SmolVLM2 over the full image, applying preprocessing to the whole image if requested.
+
+        Args:
+            image: Already-decoded image (BGR) to preprocess; decoded from image_path if omitted
+            prefetched: Future from vlm.submit_extract() already in flight for this image
+        """
+        vlm_timeout_s = float(os.environ.get("SMOLVLM_TIMEOUT_SECONDS", "90"))
+        label = f"smolvlm2_infer {image_path.name}"
+        if prefetched is None:
+            prefetched = vlm.submit_extract(str(image_path), self._vlm_payload(image_path, preprocessing, image))
+        return wait_future(prefetched, vlm_timeout_s, "smolvlm2_infer", label)
+
+    def record_stage_timeouts(
+        self,
+        job_id: str,
+        stages: List[str],
+        image_filename: str = "",
+        writer: Optional[WriteBehindWriter] = None,
+    ) -> None:
+        """Append one stage_timeouts row per time limit that fired (best-effort)."""
+        now = datetime.now()
+        rows = [
+            {"job_id": job_id, "stage": stage, "image_filename": image_filename, "created_at": now}
+            for stage in stages
+        ]
+        if writer is not None:
+            writer.insert("stage_timeouts", rows)
+            return
+        try:
+            table_insert(get_stage_timeouts_table(), rows)
+        except Exception as e:
+            print(f"[TIMEOUTS] Failed to record {stages} for {image_filename} in job {job_id}: {type(e).__name__}: {e}")
+
+    def get_stage_timeout_counts(self, job_id: str) -> Dict[str, int]:
+        """Number of timeouts per stage for a job ({} if none, or if they can't be read)."""
+        try:
+            timeouts_table = get_stage_timeouts_table()
+            rows = table_query(timeouts_table, timeouts_table.job_id == job_id)
+        except Exception as e:
+            print(f"[TIMEOUTS] Failed to read timeouts for job {job_id}: {type(e).__name__}: {e}")
+            return {}
+        if not rows or len(rows) == 0:
+            return {}
+        return {str(k): int(v) for k, v in rows.to_pandas()["stage"].value_counts().items()}
+
+    @retry_on_db_error(max_retries=3, delay=0.5)
+    def get_checkpoint(self, job_id: str) -> set:
+        """
+        Filenames of images this job has fully processed.
+
+        _store_image_outputs writes the image_results row last, so a row there means the
+        image and its benchmark rows are durable; it doubles as the job's checkpoint.
+        """
+        results_table = get_image_results_table()
+        rows = (
+            results_table.where(results_table.job_id == job_id)
+            .select(results_table.image_filename)
+            .collect()
+        )
+        if not rows or len(rows) == 0:
+            return set()
+        return set(rows.to_pandas()["image_filename"].astype(str))
+
+    @retry_on_db_error(max_retries=3, delay=0.5)
+    def discard_partial_results(self, job_id: str, checkpoint: set) -> int:
+        """Delete benchmark rows for images that never reached the checkpoint (worker died mid-store)."""
+        benchmark_table = get_benchmark_results_table()
+        rows = (
+            benchmark_table.where(benchmark_table.job_id == job_id)
+            .select(benchmark_table.image_filename)
+            .collect()
+        )
+        if not rows or len(rows) == 0:
+            return 0
+        partial = set(rows.to_pandas()["image_filename"].astype(str)) - checkpoint
+        for image_filename in partial:
+            table_delete(
+                benchmark_table,
+                (benchmark_table.job_id == job_id) & (benchmark_table.image_filename == image_filename),
+            )
+        return len(partial)
+
+    # ------------------------------------------------------------------
+    # Cross-job result memoization (content-addressed)
+    # ------------------------------------------------------------------
+
+    def _result_cache_enabled(self) -> bool:
+        return os.environ.get("RESULT_CACHE", "1").strip().lower() not in ("0", "false", "no", "off")
+
+    def _model_id(self, detector: Optional[RoboflowDetector], vlm: Optional[SmolVLM2Engine]) -> str:
+        """Identify the model that produces detections/predictions (part of the result cache key)."""
+        if vlm is not None:
+            return f"smolvlm2:{vlm.model_id}"
+        return f"roboflow:{detector.workspace}/{detector.project_name}/{detector.version}"
+
+    def _output_settings(self, engine: str) -> Dict[str, Any]:
+        """
+        Runtime settings (env knobs) that change an engine's per-image output.
+
+        Everything here goes into the result cache key, so changing a knob never serves
+        results produced under the old value. Add new output-affecting settings here.
+        """
+        settings: Dict[str, Any] = {}
+        if engine == "smolvlm2":
+            # A re-encoded/downscaled upload can change what the VLM reads
+            fmt, quality, max_dimension = self._vlm_upload_settings()
+            settings["upload_format"] = fmt
+            settings["upload_quality"] = quality
+            settings["upload_max_dimension"] = max_dimension
+            # The two transports send the prompt differently
+            pooled = os.environ.get("SMOLVLM2_HTTP_CLIENT", "sdk").strip().lower() == "pooled"
+            settings["http_client"] = "pooled" if pooled else "sdk"
+        else:
+            # Batched engine calls are kept apart from per-crop results in case they differ numerically
+            settings["ocr_batch"] = self._ocr_batch_enabled()
+            if settings["ocr_batch"]:
+                settings["ocr_batch_images"] = _env_int("OCR_BATCH_IMAGES", 4)
+                settings["ocr_batch_size"] = _env_int("OCR_BATCH_SIZE", 16)
+        if engine == "easyocr_rec":
+            settings["easyocr_rec_max_lines"] = _env_int("EASYOCR_REC_MAX_LINES", 4)
+            settings["ocr_batch_size"] = _env_int("OCR_BATCH_SIZE", 16)
+        if engine == "paddleocr_rec":
+            settings["paddle_rec_model"] = os.environ.get("PADDLE_REC_MODEL", "").strip()
+            settings["paddle_rec_textline_orientation"] = os.environ.get(
+                "PADDLE_REC_TEXTLINE_ORIENTATION", "0"
+            ).strip().lower() in ("1", "true", "yes", "on")
+            # Shares the line splitter with easyocr_rec
+            settings["easyocr_rec_max_lines"] = _env_int("EASYOCR_REC_MAX_LINES", 4)
+        return settings
+
+    def _result_config_key(self, engine: str, preprocessing: str, model_id: str) -> str:
+        """Fingerprint of everything besides the image itself that determines a per-image result."""
+        config = {
+            "version": RESULT_CACHE_VERSION,
+            "engine": engine,
+            "preprocessing": preprocessing or "none",
+            "model_id": model_id,
+            "detection_confidence": DETECTION_CONFIDENCE_THRESHOLD,
+            "ocr_confidence": OCR_CONFIDENCE_THRESHOLD,
+            "settings": self._output_settings(engine),
+        }
+        return hashlib.sha256(json.dumps(config, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def _image_digest(self, image_path: Path) -> str:
+        """SHA-256 of the image file, so renamed/re-uploaded copies still hit the caches."""
+        st = os.stat(image_path)
+        key = (str(image_path), st.st_mtime_ns, st.st_size)
+        digest = self._digests.get(key)
+        if digest is None:
+            h = hashlib.sha256()
+            with open(image_path, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    h.update(chunk)
+            digest = h.hexdigest()
+            self._digests[key] = digest
+        return digest
+
+    @retry_on_db_error(max_retries=3, delay=0.5)
+    def load_result_cache(self, config_key: str) -> Dict[str, Tuple[List[Detection], Dict[str, str], float]]:
+        """Memoized results for one config: image_sha256 -> (detections, predictions, processing_time_ms)."""
+        cache_table = get_result_cache_table()
+        rows = table_query(cache_table, cache_table.config_key == config_key)
+
+        cache: Dict[str, Tuple[List[Detection], Dict[str, str], float]] = {}
+        if rows and len(rows) > 0:
+            for row in rows.to_pandas().itertuples():
+                detections = [
+                    Detection(
+                        class_name=d["class"],
+                        confidence=float(d["confidence"]),
+                        x=int(d["x"]),
+                        y=int(d["y"]),
+                        width=int(d["width"]),
+                        height=int(d["height"]),
+                    )
+                    for d in json.loads(row.detections_json or "[]")
+                ]
+                predictions = json.loads(row.ocr_results_json or "{}")
+                cache[str(row.image_sha256)] = (detections, predictions, float(row.processing_time_ms or 0.0))
+        return cache
+
+    def store_cached_result(
+        self,
+        config_key: str,
+        image_sha256: str,
+        engine: str,
+        preprocessing: str,
+        model_id: str,
+        detections: List[Detection],
+        predictions: Dict[str, str],
+        processing_time_ms: float,
+    ) -> None:
+        """Memoize one image's result so later jobs with the same config can reuse it."""
+        cache_table = get_result_cache_table()
+        table_insert(cache_table, [self._cached_result_row(
+            config_key, image_sha256, engine, preprocessing, model_id, detections, predictions, processing_time_ms
+        )])
+
+    def _cached_result_row(
+        self,
+        config_key: str,
+        image_sha256: str,
+        engine: str,
+        preprocessing: str,
+        model_id: str,
+        detections: List[Detection],
+        predictions: Dict[str, str],
+        processing_time_ms: float,
+    ) -> dict:
+        detections_json = json.dumps([
+            {
+                "class": d.class_name,
+                "confidence": d.confidence,
+                "x": d.x,
+                "y": d.y,
+                "width": d.width,
+                "height": d.height,
+            }
+            for d in detections
+        ])
+        return {
+            "config_key": config_key,
+            "image_sha256": image_sha256,
+            "engine": engine,
+            "preprocessing": preprocessing or "none",
+            "model_id": model_id,
+            "detections_json": detections_json,
+            "ocr_results_json": json.dumps(predictions),
+            "processing_time_ms": processing_time_ms,
+            "created_at": datetime.now(),
+        }
+
+    def _open_result_memo(self, engine: str, preprocessing: str, model_id: str) -> Optional[Dict[str, Any]]:
+        """Load the memoized results for one engine/preprocessing/model config (None if disabled)."""
+        if not self._result_cache_enabled():
+            return None
+        config_key = self._result_config_key(engine, preprocessing, model_id)
+        try:
+            entries = self.load_result_cache(config_key)
+        except Exception as e:
+            print(f"[RESULT CACHE] Disabled for this run, load failed: {type(e).__name__}: {e}")
+            return None
+        print(f"[RESULT CACHE] {len(entries)} memoized image(s) for {engine}/{preprocessing or 'none'} ({model_id})")
+        return {
+            "config_key": config_key,
+            "engine": engine,
+            "preprocessing": preprocessing or "none",
+            "model_id": model_id,
+            "entries": entries,
+        }
+
+    def _memo_lookup(
+        self, memo: Optional[Dict[str, Any]], image_path: Path, digest: Optional[str] = None
+    ) -> Tuple[Optional[str], Optional[Tuple[List[Detection], Dict[str, str], float]]]:
+        """Return (image digest, memoized result or None); (None, None) when memoization is off.
+
+        Args:
+            digest: Already-computed digest of image_path (several memos, one image)
+        """
+        if memo is None:
+            return None, None
+        if digest is None:
+            try:
+                digest = self._image_digest(image_path)
+            except OSError as e:
+                print(f"[RESULT CACHE] Could not hash {image_path.name}: {e}")
+                return None, None
+        return digest, memo["entries"].get(digest)
+
+    def _memoize_result(
+        self,
+        memo: Optional[Dict[str, Any]],
+        digest: Optional[str],
+        detections: List[Detection],
+        predictions: Dict[str, str],
+        processing_time_ms: float,
+        writer: Optional[WriteBehindWriter] = None,
+    ) -> None:
+        """Record a fresh, error-free result; a failed cache write never fails the job.
+
+        Args:
+            writer: Best-effort write-behind writer to queue the row on instead of inserting it
+        """
+        if memo is None or digest is None:
+            return
+        try:
+            fields = dict(
+                config_key=memo["config_key"],
+                image_sha256=digest,
+                engine=memo["engine"],
+                preprocessing=memo["preprocessing"],
+                model_id=memo["model_id"],
+                detections=detections,
+                predictions=predictions,
+                processing_time_ms=processing_time_ms,
+            )
+            if writer is not None:
+                writer.insert("result_cache", [self._cached_result_row(**fields)])
+            else:
+                self.store_cached_result(**fields)
+            memo["entries"][digest] = (detections, predictions, processing_time_ms)
+        except Exception as e:
+            print(f"[RESULT CACHE] Failed to memoize result: {type(e).__name__}: {e}")
+
+    def _store_image_outputs(
+        self,
+        job_id: str,
+        image_path: Path,
+        detections: List[Detection],
+        predictions: Dict[str, str],
+        processing_time_ms: float,
+        ground_truth: Optional[pd.DataFrame],
+        writer: Optional[WriteBehindWriter] = None,
+        summary: Optional[SummaryAccumulator] = None,
+    ) -> None:
+        """
+        Store per-field benchmark rows (if ground truth is available), then the image result.
+
+        The image result goes last: it marks the image as checkpointed for resume.
+        With a writer the rows are queued and written in the background (same order);
+        otherwise they are inserted now, the benchmark rows as one multi-row insert.
+        The benchmark rows are also added to the job's running summary, if given.
+        """
+        image_filename = image_path.name
+
+        # Benchmark results if ground truth available
+        benchmark_rows: List[dict] = []
+        if ground_truth is not None and image_filename in ground_truth.index:
+            gt_row = ground_truth.loc[image_filename]
+
+            fields = []
+            for class_name in DETECTION_CLASSES:
+                csv_column = CLASS_TO_CSV_COLUMN.get(class_name, class_name)
+                fields.append((class_name, gt_row.get(csv_column, ""), predictions.get(class_name, "")))
+            # Edit distances for all fields of the image in one batch
+            cers = character_error_rates(
+                [str(pred) if pred else "" for _, _, pred in fields],
+                [str(gt) if pd.notna(gt) else "" for _, gt, _ in fields],
+            )
+            for (class_name, gt_value, pred_value), cer in zip(fields, cers):
+                benchmark_rows.append(
+                    self._benchmark_row(job_id, image_filename, class_name, gt_value, pred_value, cer=cer)
                 )
 
-                # Store benchmark results if ground truth available
-                if ground_truth is not None and image_filename in ground_truth.index:
-                    gt_row = ground_truth.loc[image_filename]
-
-                    for class_name in DETECTION_CLASSES:
-                        csv_column = CLASS_TO_CSV_COLUMN.get(class_name, class_name)
-                        gt_value = gt_row.get(csv_column, "")
-                        pred_value = ocr_results.get(class_name, "")
-
-                        self.store_benchmark_result(
-                            job_id=job_id,
-                            image_filename=image_filename,
-                            field_name=class_name,
-                            ground_truth=gt_value,
-                            prediction=pred_value
+        # Image result (even if empty due to error)
+        image_row = self._image_result_row(
+            job_id, image_filename, str(image_path), detections, predictions, processing_time_ms
+        )
+
+        if writer is not None:
+            writer.insert("benchmark_results", benchmark_rows)
+            writer.insert("image_results", [image_row])
+        else:
+            if benchmark_rows:
+                table_insert(get_benchmark_results_table(), benchmark_rows)
+            table_insert(get_image_results_table(), [image_row])
+        if summary is not None:
+            summary.add_image(benchmark_rows)
+
+    def _progress_reporter(
+        self,
+        job_id: str,
+        writer: Optional[WriteBehindWriter],
+        base: int = 0,
+        sharded: bool = False,
+        summary: Optional[SummaryAccumulator] = None,
+        shard_index: int = 0,
+    ) -> ProgressReporter:
+        """
+        Throttled processed_images writes for a job (shards add to the shared counter).
+
+        With a writer each write runs after the flush that stored its images' rows,
+        so the database count never gets ahead of the stored results. The running
+        summary state is saved with each write (queryable mid-run, merged per shard).
+        """
+        def save_summary() -> None:
+            if summary is not None:
+                self.save_summary_state(job_id, summary, shard_index)
+
+        if sharded:
+            def write(count: int) -> None:
+                save_summary()
+                self.increment_processed_images(job_id, count)
+        else:
+            def write(processed: int) -> None:
+                save_summary()
+                self.update_job_status(job_id, "running", processed_images=processed)
+        return ProgressReporter(
+            job_id, write, base=base, sharded=sharded, defer=writer.after_flush if writer is not None else None
+        )
+
+    def _open_writer(self, name: str, best_effort: bool = False) -> Optional[WriteBehindWriter]:
+        """A write-behind writer for one job's rows, or None when WRITE_BEHIND=0."""
+        if not write_behind_enabled():
+            return None
+        return WriteBehindWriter(name, best_effort=best_effort, table_order=_WRITE_ORDER)
+
+    def _close_writers(self, *writers: Optional[WriteBehindWriter], quiet: bool = False) -> None:
+        """Flush and stop writers; raises the first write error unless quiet."""
+        first_error: Optional[Exception] = None
+        for writer in writers:
+            if writer is None:
+                continue
+            try:
+                writer.close()
+            except Exception as e:
+                if quiet:
+                    print(f"[WRITE BEHIND] {writer.name}: {type(e).__name__}: {e}")
+                elif first_error is None:
+                    first_error = e
+        if first_error is not None:
+            raise first_error
+
+    def _image_pipeline(
+        self,
+        engine: str,
+        preprocessing: str,
+        detector: Optional[RoboflowDetector],
+        vlm: Optional[SmolVLM2Engine],
+        memo: Optional[Dict[str, Any]],
+        detection_cache: Optional[Dict[str, List[Detection]]],
+        image_timeout_s: float,
+    ) -> StagedPipeline:
+        """
+        Build the per-image stages: prepare (hash + memo lookup), detect (Roboflow, or the
+        whole SmolVLM2 call), then OCR. Persistence stays with the caller (Pixeltable).
+
+        INFERENCE_PIPELINE=1 runs the stages on threads over bounded queues, sized by
+        PIPELINE_PREFETCH_WORKERS, PIPELINE_DETECT_WORKERS, PIPELINE_OCR_WORKERS and
+        PIPELINE_QUEUE_SIZE. Otherwise each image goes through all stages on the calling
+        thread. The per-image time limit applies either way (see timeouts.py); every limit
+        that fires is added to the image's work.timeouts.
+        """
+
+        def _fail(work: _ImageWork, err: Exception) -> None:
+            # Log error with full traceback but continue processing other images
+            img_tb = traceback.format_exc()
+            print(f"[IMAGE ERROR] Error processing {work.image_path.name}:\n{type(err).__name__}: {err}\n{img_tb}")
+            work.detections = []
+            work.crops = {}
+            work.predictions = self._empty_predictions(engine)
+            work.failures.append(work.image_path.name)
+            if isinstance(err, TimeoutError):
+                work.timeouts.append(getattr(err, "stage", "image"))
+            work.done = True
+
+        def _budget(work: _ImageWork) -> float:
+            # The whole image shares one time budget across stages.
+            return max(0.001, work.deadline - time.monotonic())
+
+        def prepare(work: _ImageWork) -> _ImageWork:
+            start = time.time()
+            work.deadline = time.monotonic() + image_timeout_s
+            work.digest, cached = self._memo_lookup(memo, work.image_path)
+            if cached is not None:
+                # Same image content and config: copy the earlier result (and its timing)
+                work.detections, work.predictions, work.processing_time_ms = cached
+                work.cached = True
+                work.done = True
+                return work
+            work.processing_time_ms += (time.time() - start) * 1000
+            return work
+
+        def detect(work: _ImageWork) -> _ImageWork:
+            if work.done:
+                return work
+            start = time.time()
+            try:
+                # Time-box the image pipeline so a single hang can't stall the whole job.
+                with time_limit(_budget(work), "detect", f"image_pipeline {work.image_path.name}") as deadline:
+                    if vlm is not None:
+                        # Detections are empty for end-to-end VLM
+                        work.detections = []
+                        work.predictions = self._vlm_extract(
+                            vlm, work.image_path, preprocessing, prefetched=work.detection_future
+                        )
+                        work.done = True
+                    else:
+                        work.detections, work.crops = self._detect_image(
+                            detector, work.image_path, detection_cache,
+                            prefetched=work.detection_future, image=work.image,
+                            lookup=work.detection_lookup,
                         )
+                # Finished late (not interrupted off the main thread): keep the result, count the overrun
+                work.timeouts.extend(deadline.overruns)
+            except Exception as img_error:
+                _fail(work, img_error)
+            work.image = None  # the crops are views; the work no longer owns the full frame
+            work.processing_time_ms += (time.time() - start) * 1000
+            return work
+
+        def ocr(work: _ImageWork) -> _ImageWork:
+            if work.done:
+                return work
+            start = time.time()
+            try:
+                with time_limit(_budget(work), "ocr", f"image_pipeline {work.image_path.name}") as deadline:
+                    work.predictions = self._ocr_crops(
+                        work.crops, engine, preprocessing, work.image_path.name, work.failures
+                    )
+                work.timeouts.extend(deadline.overruns)
+            except Exception as img_error:
+                _fail(work, img_error)
+            work.crops = {}  # release crop pixels before the item waits for persistence
+            work.done = True
+            work.processing_time_ms += (time.time() - start) * 1000
+            return work
+
+        def ocr_batch(works: List[_ImageWork]) -> List[_ImageWork]:
+            # Crops of several images share one batched recognition call.
+            pending = [w for w in works if not w.done]
+            if not pending:
+                return works
+            start = time.time()
+            keys: List[Tuple[_ImageWork, str]] = []
+            crops: List[np.ndarray] = []
+            for work in pending:
+                for class_name, crop in work.crops.items():
+                    keys.append((work, class_name))
+                    crops.append(crop)
+
+            def charge_shared_time() -> None:
+                # The shared call's time goes to each image in proportion to its crops
+                elapsed_ms = (time.time() - start) * 1000
+                for work in pending:
+                    share = len(work.crops) / len(crops) if crops else 1 / len(pending)
+                    work.processing_time_ms += elapsed_ms * share
+            try:
+                # The batch may run until the latest of its images' deadlines, never past it
+                budget = max(_budget(work) for work in pending)
+                with time_limit(budget, "ocr_batch", f"ocr_batch ({len(pending)} images)") as deadline:
+                    texts = self._ocr_batch(crops, engine, preprocessing) if crops else []
+                if deadline.overruns:
+                    now = time.monotonic()
+                    for work in pending:
+                        if work.deadline <= now:
+                            work.timeouts.extend(deadline.overruns)
+            except Exception as batch_err:
+                print(
+                    f"[OCR BATCH ERROR] {len(pending)} image(s): {type(batch_err).__name__}: {batch_err}; "
+                    f"retrying per image within each image's remaining budget"
+                )
+                charge_shared_time()
+                now = time.monotonic()
+                for work in pending:
+                    if isinstance(batch_err, TimeoutError) and work.deadline <= now:
+                        # Out of time: no per-image retry with a budget it no longer has
+                        _fail(work, batch_err)
+                        work.crops = {}
+                    else:
+                        ocr(work)
+                return works
+
+            for work in pending:
+                work.predictions = {}
+            for (work, class_name), text in zip(keys, texts):
+                work.predictions[class_name] = text
+            charge_shared_time()
+            for work in pending:
+                work.crops = {}
+                work.done = True
+            return works
+
+        ocr_workers = _env_int("PIPELINE_OCR_WORKERS", 1)
+        # Several OCR threads would otherwise call the one shared engine concurrently
+        ocr_init = self._use_thread_local_engines if ocr_workers > 1 else None
+        if self._ocr_batch_enabled():
+            ocr_stage = Stage("ocr", ocr_batch, workers=ocr_workers,
+                              batch_size=_env_int("OCR_BATCH_IMAGES", 4), initializer=ocr_init)
+        else:
+            ocr_stage = Stage("ocr", ocr, workers=ocr_workers, initializer=ocr_init)
+
+        threaded = os.environ.get("INFERENCE_PIPELINE", "0").strip().lower() in ("1", "true", "yes", "on")
+        return StagedPipeline(
+            [
+                Stage("prepare", prepare, workers=_env_int("PIPELINE_PREFETCH_WORKERS", 2)),
+                Stage("detect", detect, workers=_env_int("PIPELINE_DETECT_WORKERS", 4)),
+                ocr_stage,
+            ],
+            queue_size=_env_int("PIPELINE_QUEUE_SIZE", 8),
+            inline=not threaded,
+        )
+
+    def _log_rss(self, done: int, total: int, image_filename: str, every: int) -> None:
+        if (done % every) == 0:
+            rss = _get_rss_mb()
+            if rss is not None:
+                print(f"[MEM] rss_mb={rss:.1f} after {done}/{total} ({image_filename})")
+
+    def _rss_every(self) -> int:
+        rss_every = int(os.environ.get("LOG_RSS_EVERY_N_IMAGES", "1") or "1")
+        return max(1, rss_every)
+
+    def run_inference(
+        self,
+        engine: str,
+        images_dir: Path,
+        ground_truth_csv: Optional[Path] = None,
+        progress_callback=None,
+        job_id: Optional[str] = None,
+        preprocessing: str = "none",
+        use_gpu: Optional[bool] = None,
+        detection_cache: Optional[Dict[str, List[Detection]]] = None,
+        shard_index: int = 0,
+        shard_count: int = 1,
+        resume: bool = False,
+    ) -> str:
+        """
+        Run full inference pipeline on a dataset.
+
+        Images whose content was already processed with the same engine, preprocessing,
+        model version and thresholds (by any earlier job) reuse that memoized result
+        instead of calling Roboflow/OCR again; set RESULT_CACHE=0 to disable.
+
+        Args:
+            engine: OCR engine to use ('easyocr', 'paddleocr' or 'smolvlm2')
+            images_dir: Directory containing images
+            ground_truth_csv: Optional path to ground truth CSV
+            progress_callback: Optional callback(job_id, processed, total, current_file)
+            job_id: Optional existing job ID (if not provided, creates new job)
+            preprocessing: Preprocessing type to apply to images before OCR
+            shard_index: Which slice of the image list to process (0-based)
+            shard_count: Number of slices the job is split into. When > 1, this call only
+                         processes every shard_count-th image, adds its progress to
+                         processed_images, and leaves the summary/completion to finalize_job()
+            resume: Continue an existing job from its checkpoint, skipping images that
+                    already have a row in image_results
+
+        Returns:
+            job_id: The ID of the created/used job
+        """
+        if use_gpu is not None:
+            self.set_use_gpu(bool(use_gpu))
+
+        # Get list of images
+        image_files = self._list_image_files(images_dir)
 
-                # Update progress
-                self.update_job_status(job_id, "running", processed_images=idx + 1)
+        if not image_files:
+            raise ValueError(f"No images found in {images_dir}")
+
+        sharded = shard_count > 1
+        if sharded:
+            if job_id is None:
+                raise ValueError("Sharded inference requires an existing job_id")
+            image_files = image_files[shard_index::shard_count]
+
+        # Running summary of this run's images (all shards' states are merged in finalize_job)
+        summary = SummaryAccumulator()
+
+        # Checkpoint: images fully stored by an earlier (crashed/interrupted) run of this job
+        already_done = 0
+        if resume and job_id is not None:
+            checkpoint = self.get_checkpoint(job_id)
+            if checkpoint:
+                self.discard_partial_results(job_id, checkpoint)
+                remaining = [p for p in image_files if p.name not in checkpoint]
+                already_done = len(image_files) - len(remaining)
+                summary = self._seed_summary(job_id, {p.name for p in image_files if p.name in checkpoint})
+                image_files = remaining
+                print(f"[RESUME] Job {job_id}: {already_done} image(s) already processed, {len(image_files)} remaining")
+            if not sharded:
+                # The seeded summary covers every checkpointed image; shard rows from an
+                # earlier sharded run would count them twice
+                self.clear_summary_state(job_id)
+
+        # Parse dataset info from path
+        # Expected: .../test_data_OCR/version-1/images/
+        dataset_version = images_dir.parent.name
+        dataset_name = "default"
+
+        # Create job only if not provided
+        if job_id is None:
+            job_id = self.create_job(
+                engine=engine,
+                dataset_version=dataset_version,
+                dataset_name=dataset_name,
+                total_images=len(image_files),
+                preprocessing=preprocessing,
+                use_gpu=self.use_gpu,
+            )
+            # Update status to running (only for newly created jobs)
+            self.update_job_status(job_id, "running")
+
+        # Load ground truth if provided
+        ground_truth = self._load_ground_truth(ground_truth_csv)
+
+        # Rows and progress go to Pixeltable from background threads (WRITE_BEHIND=0 writes inline)
+        writer = self._open_writer(f"job {job_id}")
+        memo_writer: Optional[WriteBehindWriter] = None
+        # Live progress every image; processed_images in the database only every PROGRESS_DB_* interval
+        progress = self._progress_reporter(
+            job_id, writer, base=already_done, sharded=sharded, summary=summary, shard_index=shard_index
+        )
+
+        try:
+            rss_every = self._rss_every()
+            start_rss = _get_rss_mb()
+            if start_rss is not None:
+                print(f"[MEM] rss_mb={start_rss:.1f} at job start")
+
+            # SmolVLM2: end-to-end VLM over full image (no detection/cropping)
+            # Default: detection + crop + OCR (EasyOCR/PaddleOCR)
+            vlm = self._init_smolvlm2() if engine == "smolvlm2" else None
+            detector = self._init_detector() if vlm is None else None
+            image_timeout_s = self._image_timeout_s(engine)
+
+            # Results memoized by earlier jobs with the same engine/preprocessing/model/thresholds
+            memo = self._open_result_memo(engine, preprocessing, self._model_id(detector, vlm))
+            if memo is not None and writer is not None:
+                memo_writer = self._open_writer(f"result cache {job_id}", best_effort=True)
+            memo_hits = 0
+            timeout_counts: collections.Counter = collections.Counter()
+
+            pipeline = self._image_pipeline(
+                engine, preprocessing, detector, vlm, memo, detection_cache, image_timeout_s
+            )
+            # Keep ROBOFLOW_MAX_IN_FLIGHT detections running ahead of the OCR stage
+            works: Iterable[_ImageWork] = (_ImageWork(image_path=p) for p in image_files)
+            if vlm is not None:
+                # Keep SMOLVLM2_MAX_IN_FLIGHT VLM requests running concurrently, collected in order
+                works = self._vlm_lookahead(
+                    works, vlm, memo, preprocessing,
+                    depth=_env_int("VLM_LOOKAHEAD", SMOLVLM2_MAX_IN_FLIGHT, minimum=0),
+                )
+            else:
+                works = self._detection_lookahead(
+                    works, detector, memo, detection_cache,
+                    depth=_env_int("DETECTION_LOOKAHEAD", ROBOFLOW_MAX_IN_FLIGHT, minimum=0),
+                )
+
+            # Shards look at the job row now and then: once a sibling failed (or the job was
+            # cancelled) there is no point processing the rest of this slice
+            status_check_s = float(os.environ.get("SHARD_STATUS_CHECK_SECONDS", "5") or "5")
+            next_status_check = time.monotonic() + status_check_s
+
+            # Persistence stage: queues rows on the writer (or writes them here with WRITE_BEHIND=0)
+            for done, work in enumerate(pipeline.run(works), start=1):
+                image_path = work.image_path
+                image_filename = image_path.name
+
+                if work.cached:
+                    memo_hits += 1
+                elif not work.failures:
+                    # Only error-free results are reused by later jobs
+                    self._memoize_result(
+                        memo, work.digest, work.detections, work.predictions, work.processing_time_ms, memo_writer
+                    )
+
+                self._store_image_outputs(
+                    job_id, image_path, work.detections, work.predictions, work.processing_time_ms, ground_truth,
+                    writer, summary,
+                )
+                if work.timeouts:
+                    self.record_stage_timeouts(job_id, work.timeouts, image_filename, writer)
+                    timeout_counts.update(work.timeouts)
+
+                # Update progress (shards add to the shared counter)
+                progress.advance()
 
                 if progress_callback:
-                    progress_callback(job_id, idx + 1, len(image_files), image_filename)
+                    progress_callback(job_id, done, len(image_files), image_filename)
+
+                self._log_rss(done, len(image_files), image_filename, rss_every)
 
-                if ((idx + 1) % rss_every) == 0:
-                    rss = _get_rss_mb()
-                    if rss is not None:
-                        print(f"[MEM] rss_mb={rss:.1f} after {idx + 1}/{len(image_files)} ({image_filename})")
+                if sharded and time.monotonic() >= next_status_check:
+                    next_status_check = time.monotonic() + status_check_s
+                    self._check_job_active(job_id)
 
-            # Calculate and store summary
-            self.calculate_and_store_summary(job_id, engine, dataset_version, dataset_name)
+            if memo is not None:
+                print(f"[RESULT CACHE] Job {job_id}: reused {memo_hits}/{len(image_files)} memoized image result(s)")
+            if timeout_counts:
+                print(f"[TIMEOUTS] Job {job_id}: {dict(timeout_counts)}")
+            # Connection reuse and latency of Roboflow/SmolVLM2 requests (process-wide)
+            http_pool.log_stats()
+
+            # Everything must be stored before the summary reads it (shards: including their exact count)
+            progress.finish()
+            self._close_writers(writer, memo_writer)
+
+            if sharded:
+                # The last shard to finish triggers finalize_job() from the dispatcher.
+                return job_id
+
+            # Store the summary from the running accumulator (no re-scan of benchmark rows)
+            self._complete_summary(job_id, engine, dataset_version, dataset_name, summary)
 
             # Mark as completed
-            self.update_job_status(job_id, "completed", processed_images=len(image_files))
+            self.update_job_status(job_id, "completed", processed_images=already_done + len(image_files))
+
+        except JobStopped as e:
+            # The job's status was set by whoever ended it; keep what this shard stored
+            print(f"[INFERENCE] Job {job_id} shard {shard_index + 1}/{shard_count} stopped: {e}")
+            raise
 
         except Exception as e:
             # Capture full traceback for debugging
@@ -768,15 +2100,249 @@ class InferenceService:
             error_msg = f"{type(e).__name__}: {str(e)}\n\nTraceback:\n{tb}"
             print(f"[INFERENCE ERROR] Job {job_id} failed:\n{error_msg}")
 
+            # Keep what was processed (resume checkpoint) and let no queued progress land after "failed"
+            progress.finish(quiet=True)
+            self._close_writers(writer, memo_writer, quiet=True)
+
             # Store truncated version in DB (limit to 2000 chars for DB field)
             self.update_job_status(job_id, "failed", error_message=error_msg[:2000])
             raise
 
+        finally:
+            # Cancellation (SIGTERM in the worker): flush finished images so a resume can skip them
+            progress.finish(quiet=True)
+            self._close_writers(writer, memo_writer, quiet=True)
+
         return job_id
 
+    def _check_job_active(self, job_id: str) -> None:
+        """Raise JobStopped if the job has ended (e.g. a sibling shard marked it failed)."""
+        status = self.get_job_status(job_id)
+        if not status or status.get("status") in _ENDED_STATUSES:
+            state = status.get("status") if status else "deleted"
+            raise JobStopped(f"job is {state}")
+
+    def finalize_job(
+        self,
+        job_id: str,
+        engine: str,
+        dataset_version: str,
+        dataset_name: str = "default",
+        shard_count: Optional[int] = None,
+    ) -> None:
+        """Summarize a sharded job after all shards finished and mark it completed."""
+        # Each shard saved its final running summary; jobs without saved states are re-scanned
+        summary = self.load_summary_state(job_id, shard_count)
+        self._complete_summary(job_id, engine, dataset_version, dataset_name, summary)
+        status = self.get_job_status(job_id)
+        total = status["total_images"] if status else None
+        self.update_job_status(job_id, "completed", processed_images=total)
+
+    def run_batch_inference(
+        self,
+        engine: str,
+        images_dir: Path,
+        jobs: List[Tuple[str, str]],
+        ground_truth_csv: Optional[Path] = None,
+        use_gpu: Optional[bool] = None,
+        detection_cache: Optional[Dict[str, List[Detection]]] = None,
+    ) -> None:
+        """
+        Run several preprocessing variants of one engine over a dataset in a single pass.
+
+        Image-major: each image is decoded, detected and cropped once, then the crops
+        are fanned out to every job's preprocessing + OCR and the results are written
+        to each job id. A sweep over N preprocessing options costs one pass of I/O and
+        detection plus N times the OCR work, instead of N full passes.
+
+        Args:
+            engine: OCR engine to use ('easyocr', 'paddleocr' or 'smolvlm2')
+            images_dir: Directory containing images
+            jobs: (job_id, preprocessing) pairs; jobs must already exist and be running
+            ground_truth_csv: Optional path to ground truth CSV
+            detection_cache: Optional detections keyed by image path (shared with other runs)
+
+        A job whose results can't be stored is marked failed and dropped; the rest continue.
+        """
+        if use_gpu is not None:
+            self.set_use_gpu(bool(use_gpu))
+
+        image_files = self._list_image_files(images_dir)
+        if not image_files:
+            raise ValueError(f"No images found in {images_dir}")
+
+        dataset_version = images_dir.parent.name
+        dataset_name = "default"
+        ground_truth = self._load_ground_truth(ground_truth_csv)
+
+        # job_id -> preprocessing, for jobs still running
+        active: Dict[str, str] = dict(jobs)
+        # One writer per job, so a job whose rows can't be written fails alone
+        writers: Dict[str, Optional[WriteBehindWriter]] = {job_id: self._open_writer(f"job {job_id}") for job_id in active}
+        memo_writer = self._open_writer("result cache", best_effort=True) if any(writers.values()) else None
+        summaries = {job_id: SummaryAccumulator() for job_id in active}
+        progress = {
+            job_id: self._progress_reporter(job_id, writers[job_id], summary=summaries[job_id]) for job_id in active
+        }
+
+        def _fail(job_id: str, err: Exception) -> None:
+            tb = traceback.format_exc()
+            error_msg = f"{type(err).__name__}: {str(err)}\n\nTraceback:\n{tb}"
+            print(f"[INFERENCE ERROR] Job {job_id} failed:\n{error_msg}")
+            active.pop(job_id, None)
+            self._close_writers(writers.pop(job_id, None), quiet=True)
+            try:
+                self.update_job_status(job_id, "failed", error_message=error_msg[:2000])
+            except Exception as update_err:
+                print(f"Failed to update job status: {update_err}")
+
+        try:
+            rss_every = self._rss_every()
+            vlm = self._init_smolvlm2() if engine == "smolvlm2" else None
+            detector = self._init_detector() if vlm is None else None
+            image_timeout_s = self._image_timeout_s(engine)
+            needs_pixels = vlm is not None and any(p and p != "none" for p in active.values())
+
+            # Per-job memoized results (each preprocessing option has its own cache config)
+            model_id = self._model_id(detector, vlm)
+            memos = {job_id: self._open_result_memo(engine, preprocessing, model_id) for job_id, preprocessing in active.items()}
+
+            for idx, image_path in enumerate(image_files):
+                if not active:
+                    break
+                start_time = time.time()
+                image_filename = image_path.name
+
+                # Jobs that can copy an earlier result for this image skip detection and OCR
+                digest: Optional[str] = None
+                cached_by_job: Dict[str, Tuple[List[Detection], Dict[str, str], float]] = {}
+                for job_id in active:
+                    job_digest, cached = self._memo_lookup(memos.get(job_id), image_path, digest)
+                    digest = digest or job_digest
+                    if cached is not None:
+                        cached_by_job[job_id] = cached
+
+                # Shared stage: decode + detect + crop once for every job
+                image: Optional[np.ndarray] = None
+                detections: List[Detection] = []
+                crops: Dict[str, np.ndarray] = {}
+                shared_ok = True
+                shared_timeout: Optional[str] = None
+                # Stages that finished past their limit but kept their result
+                shared_overruns: List[str] = []
+                try:
+                    if len(cached_by_job) < len(active):
+                        with time_limit(image_timeout_s, "detect", f"image_shared {image_filename}") as deadline:
+                            if vlm is not None:
+                                if needs_pixels:
+                                    image = cv2.imread(str(image_path))
+                                    if image is None:
+                                        raise ValueError(f"Could not load image: {image_path}")
+                            else:
+                                detections, crops = self._detect_image(detector, image_path, detection_cache)
+                        shared_overruns = list(deadline.overruns) if deadline is not None else []
+                except Exception as img_error:
+                    img_tb = traceback.format_exc()
+                    print(f"[IMAGE ERROR] Error processing {image_filename}:\n{type(img_error).__name__}: {img_error}\n{img_tb}")
+                    shared_ok = False
+                    if isinstance(img_error, TimeoutError):
+                        shared_timeout = getattr(img_error, "stage", "detect")
+                shared_ms = (time.time() - start_time) * 1000
+
+                # SmolVLM2: send every job's variant of this image at once rather than one after another
+                vlm_futures: Dict[str, Future] = {}
+                if vlm is not None and shared_ok:
+                    for job_id, preprocessing in active.items():
+                        if job_id in cached_by_job:
+                            continue
+                        try:
+                            payload = self._vlm_payload(image_path, preprocessing, image)
+                        except Exception:
+                            continue  # _vlm_extract below hits the same error and records it
+                        vlm_futures[job_id] = vlm.submit_extract(str(image_path), payload)
+
+                # Fan-out stage: per-job preprocessing + OCR on the shared crops
+                for job_id, preprocessing in list(active.items()):
+                    job_start = time.time()
+                    if job_id in cached_by_job:
+                        job_detections, predictions, processing_time = cached_by_job[job_id]
+                    else:
+                        job_detections = detections
+                        predictions = self._empty_predictions(engine)
+                        failures: List[str] = []
+                        timeouts: List[str] = [shared_timeout] if shared_timeout else list(shared_overruns)
+                        if shared_ok:
+                            try:
+                                with time_limit(image_timeout_s, "ocr", f"image_pipeline {image_filename}") as deadline:
+                                    if vlm is not None:
+                                        predictions = self._vlm_extract(
+                                            vlm, image_path, preprocessing, image=image, prefetched=vlm_futures.get(job_id)
+                                        )
+                                    else:
+                                        predictions = self._ocr_crops(crops, engine, preprocessing, image_filename, failures)
+                                if deadline is not None:
+                                    timeouts.extend(deadline.overruns)
+                            except Exception as img_error:
+                                img_tb = traceback.format_exc()
+                                print(
+                                    f"[IMAGE ERROR] Error processing {image_filename} ({preprocessing}):\n"
+                                    f"{type(img_error).__name__}: {img_error}\n{img_tb}"
+                                )
+                                job_detections = []
+                                predictions = self._empty_predictions(engine)
+                                failures.append(image_filename)
+                                if isinstance(img_error, TimeoutError):
+                                    timeouts.append(getattr(img_error, "stage", "ocr"))
+                        else:
+                            failures.append(image_filename)
+
+                        # Each job is charged the shared stage plus its own OCR time.
+                        processing_time = shared_ms + (time.time() - job_start) * 1000
+
+                        if not failures:
+                            self._memoize_result(
+                                memos.get(job_id), digest, job_detections, predictions, processing_time, memo_writer
+                            )
+
+                    try:
+                        writer = writers.get(job_id)
+                        self._store_image_outputs(
+                            job_id, image_path, job_detections, predictions, processing_time, ground_truth, writer,
+                            summaries[job_id],
+                        )
+                        if job_id not in cached_by_job and timeouts:
+                            self.record_stage_timeouts(job_id, timeouts, image_filename, writer)
+                        progress[job_id].advance()
+                    except Exception as store_err:
+                        _fail(job_id, store_err)
+
+                self._log_rss(idx + 1, len(image_files), image_filename, rss_every)
+
+            http_pool.log_stats()
+            self._close_writers(memo_writer, quiet=True)
+            for job_id in list(active):
+                try:
+                    progress[job_id].finish()
+                    self._close_writers(writers.pop(job_id, None))
+                    self._complete_summary(job_id, engine, dataset_version, dataset_name, summaries[job_id])
+                    self.update_job_status(job_id, "completed", processed_images=len(image_files))
+                except Exception as e:
+                    _fail(job_id, e)
+        finally:
+            # Cancellation (SIGTERM in the worker): flush finished images so a resume can skip them
+            for job_id in list(writers):
+                progress[job_id].finish(quiet=True)
+            self._close_writers(memo_writer, *writers.values(), quiet=True)
+
     @retry_on_db_error(max_retries=3, delay=0.5)
-    def get_job_status(self, job_id: str) -> Optional[Dict[str, Any]]:
-        """Get current status of a job."""
+    def get_job_status(self, job_id: str, include_stage_timeouts: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Get current status of a job.
+
+        Args:
+            include_stage_timeouts: Also count the job's stage_timeouts rows (a table scan;
+                                    used for the results view, not for status polling)
+        """
         jobs_table = get_inference_jobs_table()
         results = table_query(jobs_table, jobs_table.job_id == job_id)
 
@@ -798,6 +2364,7 @@ class InferenceService:
             "started_at": str(row["started_at"]) if row["started_at"] else None,
             "completed_at": str(row["completed_at"]) if row["completed_at"] else None,
             "error_message": row["error_message"],
+            "stage_timeouts": self.get_stage_timeout_counts(job_id) if include_stage_timeouts else {},
         }
 
     def _convert_numpy_types(self, obj):
@@ -815,27 +2382,41 @@ class InferenceService:
         return obj
 
     @retry_on_db_error(max_retries=3, delay=0.5)
-    def get_job_results(self, job_id: str) -> Dict[str, Any]:
-        """Get full results for a completed job."""
-        # Get job info
-        job = self.get_job_status(job_id)
-        if not job:
-            return {"error": "Job not found"}
+    def get_job_summary(self, job_id: str, status: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        The stored summary of a finished job, or the running summary of a job in progress.
 
-        # Get summary with retry
+        A running summary has "partial": True and covers the images benchmarked so far.
+        """
         summary_table = get_job_summaries_table()
         summary_results = table_query(summary_table, summary_table.job_id == job_id)
 
-        summary = None
         if summary_results and len(summary_results) > 0:
             summary_row = summary_results.to_pandas().iloc[0]
-            summary = {
+            return {
                 "total_images": int(summary_row["total_images"]),
                 "overall_exact_match_rate": float(summary_row["overall_exact_match_rate"]),
                 "overall_normalized_match_rate": float(summary_row["overall_normalized_match_rate"]),
                 "overall_cer": float(summary_row["overall_cer"]),
                 "per_field_stats": json.loads(summary_row["per_field_stats_json"]) if summary_row["per_field_stats_json"] else {},
             }
+        if status not in (None, "running"):
+            return None
+
+        summary = self.get_partial_summary(job_id)
+        if summary is not None:
+            summary["partial"] = True
+        return summary
+
+    @retry_on_db_error(max_retries=3, delay=0.5)
+    def get_job_results(self, job_id: str) -> Dict[str, Any]:
+        """Get full results for a completed job."""
+        # Get job info
+        job = self.get_job_status(job_id, include_stage_timeouts=True)
+        if not job:
+            return {"error": "Job not found"}
+
+        summary = self.get_job_summary(job_id, job["status"])
 
         # Get image results with retry
         results_table = get_image_results_table()
@@ -868,24 +2449,51 @@ class InferenceService:
         jobs = []
         if results and len(results) > 0:
             for row in results.to_pandas().itertuples():
-                jobs.append({
-                    "job_id": row.job_id,
-                    "engine": row.engine,
-                    "preprocessing": getattr(row, "preprocessing", "none"),
-                    "dataset_version": row.dataset_version,
-                    "dataset_name": row.dataset_name,
-                    "status": row.status,
-                    "total_images": row.total_images,
-                    "processed_images": row.processed_images,
-                    "progress": (row.processed_images / row.total_images * 100) if row.total_images > 0 else 0,
-                    "created_at": str(row.created_at) if row.created_at else None,
-                    "started_at": str(getattr(row, "started_at", None)) if getattr(row, "started_at", None) else None,
-                    "completed_at": str(getattr(row, "completed_at", None)) if getattr(row, "completed_at", None) else None,
-                    "error_message": getattr(row, "error_message", None),
-                })
+                jobs.append(self._job_row_to_dict(row))
+
+        return jobs
+
+    @retry_on_db_error(max_retries=3, delay=0.5)
+    def list_jobs_by_status(self, status: str) -> List[Dict[str, Any]]:
+        """List jobs with the given status, oldest first.
+
+        The status filter is pushed down to the database, so this stays cheap
+        no matter how many finished jobs the table holds.
+        """
+        jobs_table = get_inference_jobs_table()
+        results = (
+            jobs_table.where(jobs_table.status == status)
+            .order_by(jobs_table.created_at, asc=True)
+            .collect()
+        )
+
+        jobs = []
+        if results and len(results) > 0:
+            for row in results.to_pandas().itertuples():
+                jobs.append(self._job_row_to_dict(row))
 
         return jobs
 
+    def _job_row_to_dict(self, row) -> Dict[str, Any]:
+        """Serialize an inference_jobs row (pandas itertuples) for the API."""
+        use_gpu = getattr(row, "use_gpu", None)
+        return {
+            "job_id": row.job_id,
+            "engine": row.engine,
+            "preprocessing": getattr(row, "preprocessing", "none"),
+            "dataset_version": row.dataset_version,
+            "dataset_name": row.dataset_name,
+            "status": row.status,
+            "total_images": row.total_images,
+            "processed_images": row.processed_images,
+            "progress": (row.processed_images / row.total_images * 100) if row.total_images > 0 else 0,
+            "created_at": str(row.created_at) if row.created_at else None,
+            "started_at": str(getattr(row, "started_at", None)) if getattr(row, "started_at", None) else None,
+            "completed_at": str(getattr(row, "completed_at", None)) if getattr(row, "completed_at", None) else None,
+            "error_message": getattr(row, "error_message", None),
+            "use_gpu": None if use_gpu is None or pd.isna(use_gpu) else bool(use_gpu),
+        }
+
     @retry_on_db_error(max_retries=3, delay=0.5)
     def delete_job(self, job_id: str) -> bool:
         """
@@ -896,6 +2504,8 @@ class InferenceService:
         - image_results
         - benchmark_results
         - job_summaries
+        - stage_timeouts
+        - summary_partials
         """
         try:
             # Delete from all related tables
@@ -908,6 +2518,10 @@ class InferenceService:
             table_delete(results_table, (results_table.job_id == job_id))
             table_delete(benchmark_table, (benchmark_table.job_id == job_id))
             table_delete(summary_table, (summary_table.job_id == job_id))
+            timeouts_table = get_stage_timeouts_table()
+            table_delete(timeouts_table, (timeouts_table.job_id == job_id))
+            partials_table = get_summary_partials_table()
+            table_delete(partials_table, (partials_table.job_id == job_id))
 
             # Delete the job itself
             table_delete(jobs_table, (jobs_table.job_id == job_id))
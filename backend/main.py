@@ -44,25 +44,108 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from inference_service import get_inference_service, InferenceService
 from pixeltable_schema import setup_all_tables, get_job_summaries_table
+from worker_pool import WorkerPool, WorkerPoolError, PoolWorker
+from progress import LIVE_PROGRESS
 from contextlib import asynccontextmanager
 
 # ============================================================================
 # Background process supervision (best-effort, per-instance)
 # ============================================================================
 
-_JOB_PROCESSES: Dict[str, multiprocessing.Process] = {}
-_JOB_WATCH_TASKS: Dict[str, "asyncio.Task[None]"] = {}
+# Worker processes currently running each job id (a sharded job has one per running shard).
+_JOB_PROCESSES: Dict[str, List[multiprocessing.Process]] = {}
+# Strong references to in-flight reconcile tasks (asyncio only keeps weak ones).
+_RECONCILE_TASKS: "set[asyncio.Task[None]]" = set()
 _WATCHER_DB_LOCK = asyncio.Lock()
 _START_LOCK = asyncio.Lock()
 _JOB_QUEUE: "asyncio.Queue[dict]" = asyncio.Queue()
 _DISPATCHER_TASK: Optional["asyncio.Task[None]"] = None
+# Set on submits, worker completions/exits and cancellations; the dispatcher sleeps on it.
+_DISPATCH_WAKEUP = asyncio.Event()
+
+# Items drained from _JOB_QUEUE that are waiting for a free execution slot (oldest first).
+_BACKLOG: List[dict] = []
+
+# Warm worker processes; a busy worker owns one or more job ids (batch) but uses one slot.
+_WORKER_POOL: Optional[WorkerPool] = None
+
+# Sharded jobs: job_id -> {"pending": shards not yet finished, plus finalize info}.
+# The summary runs once, in a "finalize" item, after the last shard reports done.
+_SHARD_GROUPS: Dict[str, dict] = {}
+
+# Resume attempts per job after its worker died mid-run (bounded by JOB_MAX_RESUMES).
+_RESUME_COUNTS: Dict[str, int] = {}
+# Jobs terminated on purpose (delete/cancel); their worker exit must not trigger a resume.
+_NO_RESUME_JOBS: "set[str]" = set()
+
+# Serialize S3 downloads per dataset version so parallel jobs don't see a half-written cache.
+_DATASET_LOCKS: Dict[str, asyncio.Lock] = {}
+
+
+def _default_max_workers() -> int:
+    """Default host slot count: one worker per 8 cores (each worker runs multi-threaded OCR)."""
+    return max(1, (os.cpu_count() or 1) // 8)
+
+
+def _parse_engine_limits(raw: str) -> Dict[str, int]:
+    """Parse MAX_WORKERS_PER_ENGINE, e.g. "easyocr=2,paddleocr=1,smolvlm2=4"."""
+    limits: Dict[str, int] = {}
+    for part in (raw or "").split(","):
+        if "=" not in part:
+            continue
+        engine, _, value = part.partition("=")
+        try:
+            limits[engine.strip()] = max(1, int(value.strip()))
+        except ValueError:
+            print(f"[DISPATCHER] Ignoring invalid engine limit: {part!r}")
+    return limits
+
+
+# Engine ids accepted by the start endpoints (see /ocr-engines).
+SUPPORTED_ENGINES = ("easyocr", "easyocr_rec", "paddleocr", "paddleocr_rec", "smolvlm2")
+
+# Execution slots: total worker processes on this host, plus optional per-engine caps.
+MAX_CONCURRENT_WORKERS = max(1, int(os.environ.get("MAX_CONCURRENT_WORKERS", "") or _default_max_workers()))
+MAX_WORKERS_PER_ENGINE = _parse_engine_limits(os.environ.get("MAX_WORKERS_PER_ENGINE", ""))
+
+# Warm pool: idle workers kept ready on top of busy ones, and the engines each worker preloads.
+WORKER_POOL_STANDBY = max(0, int(os.environ.get("WORKER_POOL_STANDBY", "1") or "1"))
+WORKER_PRELOAD_ENGINES = [
+    e.strip() for e in os.environ.get("WORKER_PRELOAD_ENGINES", "easyocr").split(",") if e.strip()
+]
+# Workers that die while warming up are respawned with exponential backoff, and not at all
+# after this many failures in a row (jobs then fail with the pool's error).
+WORKER_MAX_WARMUP_FAILURES = max(1, int(os.environ.get("WORKER_MAX_WARMUP_FAILURES", "5") or "5"))
+WORKER_RESPAWN_BACKOFF_SECONDS = max(0.0, float(os.environ.get("WORKER_RESPAWN_BACKOFF_SECONDS", "1") or "1"))
+
+# Crashed/interrupted jobs are resumed from their checkpoint (images already in image_results)
+# up to this many times before they are marked failed.
+JOB_MAX_RESUMES = max(0, int(os.environ.get("JOB_MAX_RESUMES", "2") or "2"))
+
+
+def _get_worker_pool() -> WorkerPool:
+    """Get or create the warm worker pool (must be called from the event loop)."""
+    global _WORKER_POOL
+    if _WORKER_POOL is None:
+        _WORKER_POOL = WorkerPool(
+            max_workers=MAX_CONCURRENT_WORKERS,
+            standby=WORKER_POOL_STANDBY,
+            preload_engines=WORKER_PRELOAD_ENGINES,
+            on_done=_on_worker_done,
+            on_exit=_on_worker_exit,
+            max_warmup_failures=WORKER_MAX_WARMUP_FAILURES,
+            respawn_backoff_s=WORKER_RESPAWN_BACKOFF_SECONDS,
+        )
+    return _WORKER_POOL
 
 
 async def _prepare_local_dataset(version: str):
     """Download dataset to local cache and return (images_dir, ground_truth_csv_str, local_image_count)."""
     from pathlib import Path as _Path
 
-    local_dataset_dir = await asyncio.to_thread(download_dataset_from_s3, version)
+    lock = _DATASET_LOCKS.setdefault(version, asyncio.Lock())
+    async with lock:
+        local_dataset_dir = await asyncio.to_thread(download_dataset_from_s3, version)
     images_dir = _Path(local_dataset_dir) / "images"
     ground_truth_csv = _Path(local_dataset_dir) / "ground_truth.csv"
     ground_truth_csv_str = str(ground_truth_csv) if ground_truth_csv.exists() else None
@@ -73,27 +156,55 @@ async def _prepare_local_dataset(version: str):
     return images_dir, ground_truth_csv_str, local_image_count
 
 
-async def _start_single_job(job_id: str, engine: str, dataset_version: str, preprocessing: str, use_gpu: bool):
-    """Start a single inference worker process for one job id."""
+async def _start_single_job(
+    job_id: str,
+    engine: str,
+    dataset_version: str,
+    preprocessing: str,
+    use_gpu: bool,
+    shard_index: int = 0,
+    shard_count: int = 1,
+    resume: bool = False,
+):
+    """Hand a single job (or one shard of it) to a warm pool worker."""
     images_dir, ground_truth_csv_str, local_image_count = await _prepare_local_dataset(dataset_version)
-    ctx = multiprocessing.get_context("spawn")
-    process = ctx.Process(
-        target=run_inference_process,
-        args=(
-            job_id,
-            engine,
-            str(images_dir),
-            ground_truth_csv_str,
-            dataset_version,
-            local_image_count,
-            preprocessing,
-            use_gpu,
-        ),
-        daemon=True,
+    descriptor = {
+        "type": "single",
+        "job_id": job_id,
+        "engine": engine,
+        "images_dir": str(images_dir),
+        "ground_truth_csv": ground_truth_csv_str,
+        "dataset_version": dataset_version,
+        "total_images": local_image_count,
+        "preprocessing": preprocessing,
+        "use_gpu": use_gpu,
+        "shard_index": shard_index,
+        "shard_count": shard_count,
+        "resume": resume,
+    }
+    worker = _get_worker_pool().submit(descriptor, engine)
+    _register_worker(worker)
+    shard = f" shard={shard_index + 1}/{shard_count}" if shard_count > 1 else ""
+    mode = " (resume)" if resume else ""
+    print(
+        f"[DISPATCHER] Assigned job {job_id}{shard}{mode} to worker pid={worker.pid} "
+        f"engine={engine} preprocessing={preprocessing}"
     )
-    process.start()
-    _register_and_watch_job(job_id, process)
-    print(f"[DISPATCHER] Started worker pid={process.pid} for job {job_id} engine={engine} preprocessing={preprocessing}")
+
+
+async def _start_finalize_job(item: dict) -> None:
+    """Hand a sharded job's summary + completion step to a pool worker."""
+    descriptor = {
+        "type": "finalize",
+        "job_id": item["job_id"],
+        "engine": item["engine"],
+        "dataset_version": item["dataset_version"],
+        "dataset_name": item.get("dataset_name", "default"),
+        "shard_count": item.get("shard_count"),
+    }
+    worker = _get_worker_pool().submit(descriptor, item["engine"])
+    _register_worker(worker)
+    print(f"[DISPATCHER] Finalizing sharded job {item['job_id']} on worker pid={worker.pid}")
 
 
 async def _start_batch_jobs(
@@ -103,7 +214,7 @@ async def _start_batch_jobs(
     preprocessing_options: List[str],
     use_gpu: bool,
 ):
-    """Start a sequential batch worker that runs the provided preprocessing options in order."""
+    """Hand a sequential batch (one job per preprocessing option) to a warm pool worker."""
     images_dir, ground_truth_csv_str, local_image_count = await _prepare_local_dataset(dataset_version)
 
     job_configs = []
@@ -121,48 +232,67 @@ async def _start_batch_jobs(
             }
         )
 
-    ctx = multiprocessing.get_context("spawn")
-    process = ctx.Process(
-        target=run_sequential_batch_inference,
-        args=(job_configs,),
-        daemon=True,
-    )
-    process.start()
-    for job_id in job_ids:
-        _register_and_watch_job(job_id, process)
-    print(f"[DISPATCHER] Started batch worker pid={process.pid} for {len(job_ids)} jobs engine={engine}")
-
+    worker = _get_worker_pool().submit({"type": "batch", "job_configs": job_configs}, engine)
+    _register_worker(worker)
+    print(f"[DISPATCHER] Assigned batch of {len(job_ids)} jobs to worker pid={worker.pid} engine={engine}")
 
-async def _get_oldest_pending_job_from_db() -> Optional[dict]:
-    """Best-effort recovery: start oldest pending job even if queue state is lost."""
-    try:
-        async with _WATCHER_DB_LOCK:
-            service = get_inference_service()
-            jobs = service.list_jobs(limit=200)
-    except Exception:
-        return None
 
-    pending = [j for j in (jobs or []) if j.get("status") == "pending"]
-    if not pending:
-        return None
+def _wake_dispatcher() -> None:
+    """Signal the dispatcher that queue or slot state changed."""
+    _DISPATCH_WAKEUP.set()
 
-    # created_at is serialized as string; ISO-like ordering works, but parse defensively.
-    def _key(j: dict):
-        s = j.get("created_at") or ""
-        return s
 
-    pending.sort(key=_key)
-    j = pending[0]
+def _resume_item(job: dict) -> dict:
+    """Queue item that continues a job from its checkpoint (skips images already stored)."""
     return {
         "type": "single",
-        "job_id": j["job_id"],
-        "engine": j.get("engine", "easyocr"),
-        "dataset_version": j.get("dataset_version", "version-1"),
-        "preprocessing": j.get("preprocessing", "none") or "none",
-        "use_gpu": True,
+        "job_id": job["job_id"],
+        "engine": job.get("engine", "easyocr"),
+        "dataset_version": job.get("dataset_version", "version-1"),
+        "preprocessing": job.get("preprocessing", "none") or "none",
+        # Jobs created before use_gpu was stored have no value; they default to the request default
+        "use_gpu": True if job.get("use_gpu") is None else bool(job["use_gpu"]),
+        "resume": True,
     }
 
 
+def _tracked_job_ids() -> set:
+    """Jobs this process already owns: queued in the backlog, in a shard group, or on a worker."""
+    tracked = set(_SHARD_GROUPS) | {job_id for job_id, procs in _JOB_PROCESSES.items() if procs}
+    for item in _BACKLOG:
+        if item.get("job_id"):
+            tracked.add(item["job_id"])
+        tracked.update(item.get("job_ids", []))
+    for worker in _get_worker_pool().busy_workers().values():
+        tracked.update(worker.job_ids)
+    return tracked
+
+
+async def _recover_pending_jobs_from_db() -> List[dict]:
+    """
+    Best-effort recovery at startup: requeue pending jobs whose queue state was lost,
+    and resume jobs left 'running' by a previous server process from their checkpoint.
+
+    Jobs already queued or running in this process are left alone.
+    """
+    try:
+        async with _WATCHER_DB_LOCK:
+            service = get_inference_service()
+            tracked = _tracked_job_ids()
+            pending = [j for j in service.list_jobs_by_status("pending") if j["job_id"] not in tracked]
+            interrupted = [j for j in service.list_jobs_by_status("running") if j["job_id"] not in tracked]
+            for job in interrupted:
+                service.update_job_status(job["job_id"], "pending")
+    except Exception as e:
+        print(f"[DISPATCHER] Pending-job recovery failed: {type(e).__name__}: {e}")
+        return []
+
+    if interrupted:
+        print(f"[DISPATCHER] Resuming {len(interrupted)} interrupted job(s) from checkpoint")
+    # Interrupted jobs first: they already hold partial results.
+    return [_resume_item(j) for j in interrupted] + [_resume_item(j) for j in pending]
+
+
 async def _start_queue_item(item: dict) -> None:
     """Start a queued item if it still exists and is pending."""
     job_id = item.get("job_id")
@@ -189,10 +319,21 @@ async def _start_queue_item(item: dict) -> None:
     if not job_id:
         return
 
+    if item.get("type") == "finalize":
+        await _start_finalize_job(item)
+        return
+
     async with _WATCHER_DB_LOCK:
         service = get_inference_service()
         status = service.get_job_status(job_id)
-    if not status or status.get("status") != "pending":
+
+    shard_count = int(item.get("shard_count", 1) or 1)
+    if shard_count > 1:
+        # Sibling shards may already have moved the job to running.
+        if not status or status.get("status") not in ("pending", "running") or job_id not in _SHARD_GROUPS:
+            _SHARD_GROUPS.pop(job_id, None)
+            return
+    elif not status or status.get("status") != "pending":
         return
 
     await _start_single_job(
@@ -201,39 +342,127 @@ async def _start_queue_item(item: dict) -> None:
         dataset_version=item.get("dataset_version", status.get("dataset_version", "version-1")),
         preprocessing=item.get("preprocessing", status.get("preprocessing", "none") or "none"),
         use_gpu=bool(item.get("use_gpu", True)),
+        shard_index=int(item.get("shard_index", 0) or 0),
+        shard_count=shard_count,
+        resume=bool(item.get("resume", False)),
     )
 
 
-async def _dispatcher_loop() -> None:
-    """Background dispatcher: runs queued jobs sequentially (1 worker at a time)."""
-    print("[DISPATCHER] started")
+def _engine_limit(engine: str) -> int:
+    """Max concurrent workers for an engine (never more than the host slot count)."""
+    return min(MAX_WORKERS_PER_ENGINE.get(engine, MAX_CONCURRENT_WORKERS), MAX_CONCURRENT_WORKERS)
+
+
+def _running_workers_by_engine() -> Dict[str, int]:
+    """Count busy worker processes per engine (a batch worker counts once)."""
+    counts: Dict[str, int] = {}
+    for worker in _get_worker_pool().busy_workers().values():
+        engine = worker.engine or "unknown"
+        counts[engine] = counts.get(engine, 0) + 1
+    return counts
+
+
+def _queue_depth() -> int:
+    """Number of queued items not yet admitted to a worker slot."""
+    return len(_BACKLOG) + _JOB_QUEUE.qsize()
+
+
+def _drain_job_queue() -> None:
+    """Move newly submitted items from _JOB_QUEUE into the dispatcher backlog."""
     while True:
         try:
-            if _get_active_worker_pids():
-                await asyncio.sleep(1)
-                continue
+            _BACKLOG.append(_JOB_QUEUE.get_nowait())
+        except asyncio.QueueEmpty:
+            return
 
-            item: Optional[dict] = None
-            try:
-                item = _JOB_QUEUE.get_nowait()
-            except asyncio.QueueEmpty:
-                item = None
 
-            if item is None:
-                item = await _get_oldest_pending_job_from_db()
+def _select_next_item() -> Optional[dict]:
+    """
+    Pick the next backlog item that fits a free execution slot.
+
+    Admission looks at the whole backlog rather than only its head: engines at
+    their cap are skipped, and among the rest the engine with the fewest running
+    workers wins (oldest item first), so a deep queue for one engine can't starve
+    the others.
+    """
+    running = _running_workers_by_engine()
+    if sum(running.values()) >= MAX_CONCURRENT_WORKERS:
+        return None
+
+    best: Optional[dict] = None
+    best_running = 0
+    for item in _BACKLOG:
+        engine = item.get("engine", "easyocr")
+        engine_running = running.get(engine, 0)
+        if engine_running >= _engine_limit(engine):
+            continue
+        if best is None or engine_running < best_running:
+            best = item
+            best_running = engine_running
+    return best
+
 
-            if item is None:
-                await asyncio.sleep(1)
+async def _fail_queue_item(item: dict, reason: str) -> None:
+    """Mark every job a queue item covers as failed (it can't be started)."""
+    job_ids = item.get("job_ids") or [item.get("job_id")]
+    async with _WATCHER_DB_LOCK:
+        service = get_inference_service()
+        for job_id in job_ids:
+            if not job_id:
                 continue
+            _SHARD_GROUPS.pop(job_id, None)
+            try:
+                service.update_job_status(job_id, "failed", error_message=reason[:2000])
+            except Exception as e:
+                print(f"[DISPATCHER] Failed to mark job {job_id} failed: {type(e).__name__}: {e}")
+
+
+async def _admit_backlog() -> int:
+    """Start backlog items until the slots are full. Returns the number admitted."""
+    admitted = 0
+    while _BACKLOG:
+        item = _select_next_item()
+        if item is None:
+            break
+        _BACKLOG.remove(item)
+        try:
+            await _start_queue_item(item)
+        except WorkerPoolError as e:
+            print(f"[DISPATCHER ERROR] Cannot start {item.get('job_id') or item.get('job_ids')}: {e}")
+            await _fail_queue_item(item, str(e))
+            continue
+        admitted += 1
+    return admitted
+
+
+async def _dispatcher_loop() -> None:
+    """Background dispatcher: admits queued jobs into free execution slots."""
+    print(
+        f"[DISPATCHER] started slots={MAX_CONCURRENT_WORKERS} "
+        f"per_engine={MAX_WORKERS_PER_ENGINE or 'unlimited'}"
+    )
+    # Recover once at startup; afterwards every job arrives through _JOB_QUEUE.
+    # Drain first so jobs submitted before the dispatcher started count as queued.
+    _drain_job_queue()
+    recovered = await _recover_pending_jobs_from_db()
+    if recovered:
+        print(f"[DISPATCHER] Recovered {len(recovered)} pending job(s) from the database")
+        _BACKLOG.extend(recovered)
+
+    while True:
+        try:
+            # Clear before looking at state so a wakeup during admission isn't lost.
+            _DISPATCH_WAKEUP.clear()
+
+            # Reap exited workers and keep a warm standby ready.
+            _get_worker_pool().ensure_standby()
+            _drain_job_queue()
 
             async with _START_LOCK:
-                # Re-check within lock
-                if _get_active_worker_pids():
-                    # Put it back and try later
-                    await _JOB_QUEUE.put(item)
-                    await asyncio.sleep(1)
-                    continue
-                await _start_queue_item(item)
+                await _admit_backlog()
+
+            # Sleep until a submit, worker completion/exit or cancellation changes something.
+            await _DISPATCH_WAKEUP.wait()
         except asyncio.CancelledError:
             print("[DISPATCHER] cancelled")
             return
@@ -272,35 +501,34 @@ async def _terminate_process(process: multiprocessing.Process, reason: str, time
         return False
 
 
-async def _terminate_workers_for_job_ids(job_ids: List[str], reason: str) -> None:
-    """Terminate any active worker processes associated with the provided job IDs."""
+async def _terminate_workers_for_job_ids(job_ids: List[str], reason: str, allow_resume: bool = False) -> None:
+    """
+    Terminate any active worker processes associated with the provided job IDs.
+
+    Unless allow_resume is set, the jobs are not resumed from their checkpoint afterwards.
+    """
     procs_by_pid: Dict[int, multiprocessing.Process] = {}
     for jid in job_ids:
-        try:
-            proc = _JOB_PROCESSES.get(jid)
-            if proc is None or proc.pid is None:
+        for proc in list(_JOB_PROCESSES.get(jid, [])):
+            try:
+                if proc is None or proc.pid is None:
+                    continue
+                if proc.is_alive():
+                    procs_by_pid[int(proc.pid)] = proc
+                    if not allow_resume:
+                        _NO_RESUME_JOBS.add(jid)
+            except Exception:
                 continue
-            if proc.is_alive():
-                procs_by_pid[int(proc.pid)] = proc
-        except Exception:
-            continue
 
     for pid, proc in procs_by_pid.items():
         await _terminate_process(proc, reason=f"{reason} pid={pid}")
 
+    # Cancellation frees slots (and may make queued items obsolete).
+    _wake_dispatcher()
+
 def _get_active_worker_pids() -> Dict[int, multiprocessing.Process]:
-    """Return unique alive worker processes keyed by PID (dedupes batch jobs)."""
-    active: Dict[int, multiprocessing.Process] = {}
-    for proc in _JOB_PROCESSES.values():
-        try:
-            if proc is None or proc.pid is None:
-                continue
-            if proc.is_alive():
-                active[int(proc.pid)] = proc
-        except Exception:
-            # If the process handle is in a bad state, ignore it for concurrency accounting.
-            continue
-    return active
+    """Return unique busy worker processes keyed by PID (dedupes batch jobs)."""
+    return {pid: w.process for pid, w in _get_worker_pool().busy_workers().items()}
 
 
 def _format_exitcode(exitcode: Optional[int]) -> str:
@@ -318,73 +546,163 @@ def _format_exitcode(exitcode: Optional[int]) -> str:
     return f"exitcode={exitcode}"
 
 
-async def _watch_job_process(job_id: str, process: multiprocessing.Process, poll_seconds: float = 1.0) -> None:
+async def _reconcile_job(job_id: str, pid: int, exitcode: Optional[int]) -> None:
     """
-    Watch a background worker process and ensure the job isn't left 'running' forever.
+    Ensure a job released by its worker isn't left 'pending'/'running' forever.
 
-    If the worker exits unexpectedly (including SIGKILL/OOM), mark the job as failed.
+    exitcode=0 means the worker reported the job done (or exited cleanly); any other
+    value means the worker died (including SIGKILL/OOM). An unfinished job is requeued
+    to resume from its checkpoint (up to JOB_MAX_RESUMES times), then marked failed.
     Runs in the main event loop thread to avoid Pixeltable thread-local/session issues.
     """
+    if _JOB_PROCESSES.get(job_id):
+        # Another worker (a sibling shard being stopped) still owns the job;
+        # the last one to exit decides.
+        return
     try:
-        while process.is_alive():
-            await asyncio.sleep(poll_seconds)
+        # Pixeltable operations are not safe under high concurrency; serialize watcher DB work.
+        async with _WATCHER_DB_LOCK:
+            service = get_inference_service()
+            status = service.get_job_status(job_id)
+            if not status:
+                return
 
-        exitcode = process.exitcode
-        print(f"[WATCHER] Worker exited for job {job_id}: pid={process.pid} {_format_exitcode(exitcode)}")
+            current = status.get("status")
+            if current in ("completed", "failed", "cancelled"):
+                return
 
-        # Best-effort status correction: if the worker died without updating the DB,
-        # ensure the job is not stuck in pending/running.
-        try:
-            # Pixeltable operations are not safe under high concurrency; serialize watcher DB work.
-            async with _WATCHER_DB_LOCK:
-                service = get_inference_service()
-                status = service.get_job_status(job_id)
-                if not status:
-                    return
-
-                current = status.get("status")
-                if current in ("completed", "failed", "cancelled"):
-                    return
-
-                processed = int(status.get("processed_images", 0) or 0)
-                total = int(status.get("total_images", 0) or 0)
-
-                if exitcode == 0 and total > 0 and processed >= total:
-                    service.update_job_status(job_id, "completed", processed_images=processed)
-                    return
-
-                msg = (
-                    f"Worker process exited before job completed. "
-                    f"pid={process.pid} {_format_exitcode(exitcode)} "
-                    f"status={current} processed={processed}/{total}"
-                )
+            processed = int(status.get("processed_images", 0) or 0)
+            total = int(status.get("total_images", 0) or 0)
 
-                # Retry a few times on AssertionError which Pixeltable can raise under contention.
-                for attempt in range(5):
-                    try:
-                        service.update_job_status(job_id, "failed", error_message=msg[:2000])
-                        break
-                    except AssertionError:
-                        await asyncio.sleep(0.1 * (attempt + 1))
-        except Exception as watcher_err:
-            import traceback as _tb
-            print(
-                f"[WATCHER ERROR] Failed to reconcile job {job_id}: "
-                f"{type(watcher_err).__name__}: {watcher_err}\n{_tb.format_exc()}"
+            if exitcode == 0 and total > 0 and processed >= total:
+                service.update_job_status(job_id, "completed", processed_images=processed)
+                _RESUME_COUNTS.pop(job_id, None)
+                return
+
+            msg = (
+                f"Worker process finished or exited before job completed. "
+                f"pid={pid} {_format_exitcode(exitcode)} "
+                f"status={current} processed={processed}/{total}"
             )
-    finally:
-        _JOB_PROCESSES.pop(job_id, None)
-        task = _JOB_WATCH_TASKS.pop(job_id, None)
-        if task is not None and not task.done():
-            task.cancel()
+
+            attempts = _RESUME_COUNTS.get(job_id, 0)
+            if job_id in _NO_RESUME_JOBS:
+                _NO_RESUME_JOBS.discard(job_id)
+            elif any(i.get("job_id") == job_id for i in _BACKLOG):
+                # Already requeued (or still waiting on its own queue item).
+                return
+            elif attempts < JOB_MAX_RESUMES:
+                _RESUME_COUNTS[job_id] = attempts + 1
+                service.update_job_status(job_id, "pending")
+                # Resume ahead of newer work: the job already holds partial results.
+                _BACKLOG.insert(0, _resume_item(status))
+                _wake_dispatcher()
+                print(
+                    f"[WATCHER] Resuming job {job_id} from checkpoint "
+                    f"(attempt {attempts + 1}/{JOB_MAX_RESUMES}): {msg}"
+                )
+                return
+
+            _RESUME_COUNTS.pop(job_id, None)
+
+            # Retry a few times on AssertionError which Pixeltable can raise under contention.
+            for attempt in range(5):
+                try:
+                    service.update_job_status(job_id, "failed", error_message=msg[:2000])
+                    break
+                except AssertionError:
+                    await asyncio.sleep(0.1 * (attempt + 1))
+    except Exception as watcher_err:
+        import traceback as _tb
+        print(
+            f"[WATCHER ERROR] Failed to reconcile job {job_id}: "
+            f"{type(watcher_err).__name__}: {watcher_err}\n{_tb.format_exc()}"
+        )
+
+
+async def _reconcile_jobs(job_ids: List[str], pid: int, exitcode: Optional[int]) -> None:
+    for job_id in job_ids:
+        await _reconcile_job(job_id, pid, exitcode)
+
+
+def _release_shard(job_id: str, exitcode: Optional[int]) -> bool:
+    """
+    Account for one finished shard of a sharded job.
+
+    Returns True if reconciliation should wait (other shards still running, or the
+    finalize step was just queued). A crashed shard fails the whole job and stops
+    its sibling shards.
+    """
+    group = _SHARD_GROUPS.get(job_id)
+    if group is None:
+        return False
+
+    if exitcode != 0:
+        _SHARD_GROUPS.pop(job_id, None)
+        _BACKLOG[:] = [i for i in _BACKLOG if i.get("job_id") != job_id]
+        task = asyncio.get_running_loop().create_task(
+            _terminate_workers_for_job_ids([job_id], reason="sibling shard exited", allow_resume=True)
+        )
+        _RECONCILE_TASKS.add(task)
+        task.add_done_callback(_RECONCILE_TASKS.discard)
+        return False
+
+    group["pending"] -= 1
+    if group["pending"] > 0:
+        return True
+
+    _SHARD_GROUPS.pop(job_id, None)
+    # Run the summary ahead of newer work so the job completes promptly.
+    _BACKLOG.insert(0, {
+        "type": "finalize",
+        "job_id": job_id,
+        "engine": group["engine"],
+        "dataset_version": group["dataset_version"],
+        "dataset_name": group["dataset_name"],
+        "shard_count": group.get("shard_count"),
+    })
+    return True
+
+
+def _release_jobs(worker: PoolWorker, job_ids: List[str], exitcode: Optional[int]) -> None:
+    """Fan a worker event out to every job id it owned: release them and reconcile their status."""
+    for job_id in job_ids:
+        procs = _JOB_PROCESSES.get(job_id, [])
+        if worker.process in procs:
+            procs.remove(worker.process)
+        if not procs:
+            _JOB_PROCESSES.pop(job_id, None)
+    # A slot may have opened up.
+    _wake_dispatcher()
+
+    job_ids = [job_id for job_id in job_ids if not _release_shard(job_id, exitcode)]
+    if not job_ids:
+        return
+    task = asyncio.get_running_loop().create_task(_reconcile_jobs(job_ids, worker.pid, exitcode))
+    _RECONCILE_TASKS.add(task)
+    task.add_done_callback(_RECONCILE_TASKS.discard)
+
+
+def _register_worker(worker: PoolWorker) -> None:
+    """Record which worker owns each job id it was just assigned (used for cancellation)."""
+    for job_id in worker.job_ids:
+        _JOB_PROCESSES.setdefault(job_id, []).append(worker.process)
+
+
+def _on_worker_done(worker: PoolWorker, job_ids: List[str]) -> None:
+    """Pool callback: the worker finished these job ids and is idle again."""
+    print(f"[WATCHER] Worker pid={worker.pid} finished {len(job_ids)} job(s)")
+    _release_jobs(worker, job_ids, exitcode=0)
 
 
-def _register_and_watch_job(job_id: str, process: multiprocessing.Process) -> None:
-    _JOB_PROCESSES[job_id] = process
-    # Only start one watcher per job_id
-    existing = _JOB_WATCH_TASKS.get(job_id)
-    if existing is None or existing.done():
-        _JOB_WATCH_TASKS[job_id] = asyncio.create_task(_watch_job_process(job_id, process))
+def _on_worker_exit(worker: PoolWorker, job_ids: List[str]) -> None:
+    """Pool callback (process sentinel readable): the worker exited, possibly mid-job."""
+    exitcode = worker.process.exitcode
+    print(
+        f"[WATCHER] Worker exited: pid={worker.pid} {_format_exitcode(exitcode)} "
+        f"owned_jobs={len(job_ids)}"
+    )
+    _release_jobs(worker, job_ids, exitcode=exitcode)
 
 
 # ============================================================================
@@ -393,16 +711,17 @@ def _register_and_watch_job(job_id: str, process: multiprocessing.Process) -> No
 
 class StartInferenceRequest(BaseModel):
     """Request body for starting an inference job."""
-    engine: str = Field(..., description="OCR engine: 'easyocr', 'paddleocr', or 'smolvlm2'")
+    engine: str = Field(..., description="OCR engine: 'easyocr', 'easyocr_rec', 'paddleocr', 'paddleocr_rec', or 'smolvlm2'")
     dataset_version: str = Field(..., description="Dataset version (e.g., 'version-1')")
     dataset_name: str = Field(default="default", description="Dataset name")
     preprocessing: str = Field(default="none", description="Preprocessing type to apply")
     use_gpu: bool = Field(default=True, description="Whether to use GPU acceleration")
+    shards: int = Field(default=1, ge=1, description="Split the job's images across this many worker processes")
 
 
 class StartBatchInferenceRequest(BaseModel):
     """Request body for starting batch inference with multiple preprocessing options."""
-    engine: str = Field(..., description="OCR engine: 'easyocr', 'paddleocr', or 'smolvlm2' (batch preprocessing)")
+    engine: str = Field(..., description="OCR engine: 'easyocr', 'easyocr_rec', 'paddleocr', 'paddleocr_rec', or 'smolvlm2' (batch preprocessing)")
     dataset_version: str = Field(..., description="Dataset version (e.g., 'version-1')")
     dataset_name: str = Field(default="default", description="Dataset name")
     preprocessing_options: List[str] = Field(default=["none"], description="List of preprocessing types to run")
@@ -444,6 +763,9 @@ class JobStatusResponse(BaseModel):
     started_at: Optional[str] = None
     completed_at: Optional[str] = None
     error_message: Optional[str] = None
+    stage_timeouts: Dict[str, int] = Field(
+        default_factory=dict, description="Time limits that fired, per stage (filled in by the results endpoint)"
+    )
 
 
 class JobSummary(BaseModel):
@@ -453,6 +775,7 @@ class JobSummary(BaseModel):
     overall_normalized_match_rate: float
     overall_cer: float
     per_field_stats: dict
+    partial: bool = Field(default=False, description="Running summary of a job still in progress")
 
 
 class ImageResult(BaseModel):
@@ -485,6 +808,9 @@ class HealthResponse(BaseModel):
     status: str
     timestamp: str
     pixeltable_status: str
+    worker_pool_error: Optional[str] = Field(
+        default=None, description="Why the worker pool stopped respawning workers, if it has"
+    )
 
 
 # ============================================================================
@@ -510,8 +836,10 @@ async def lifespan(app: FastAPI):
         print(f"Warning: Failed to initialize Pixeltable tables: {e}")
         # Continue anyway - tables might already exist
 
-    # Start background dispatcher (queues pending jobs and runs them one-at-a-time)
+    # Start background dispatcher (queues pending jobs and runs them in the available worker slots)
     global _DISPATCHER_TASK
+    # Warm a standby worker now so the first job doesn't pay model load time.
+    _get_worker_pool().ensure_standby()
     if _DISPATCHER_TASK is None or _DISPATCHER_TASK.done():
         _DISPATCHER_TASK = asyncio.create_task(_dispatcher_loop())
     yield
@@ -523,6 +851,8 @@ async def lifespan(app: FastAPI):
             await _DISPATCHER_TASK
         except Exception:
             pass
+    if _WORKER_POOL is not None:
+        await _WORKER_POOL.shutdown()
 
 app = FastAPI(
     title="Box Label OCR Model Testing API",
@@ -548,8 +878,8 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Note: Using multiprocessing.Process for inference jobs instead of ThreadPoolExecutor
-# This ensures each process gets its own Pixeltable connection
+# Note: Using pooled multiprocessing workers (worker_pool.py) for inference jobs instead of
+# ThreadPoolExecutor. This ensures each process gets its own Pixeltable connection.
 
 
 # ============================================================================
@@ -699,127 +1029,6 @@ def download_dataset_from_s3(version: str) -> Path:
     return local_dir
 
 
-def run_inference_process(
-    job_id: str,
-    engine: str,
-    images_dir_str: str,
-    ground_truth_csv_str: Optional[str],
-    dataset_version: str,
-    total_images: int,
-    preprocessing: str = "none",
-    use_gpu: bool = True,
-):
-    """
-    Run inference in a separate process.
-
-    This function runs in its own process with fresh Pixeltable connections,
-    avoiding SQLAlchemy thread-local connection issues.
-
-    Args:
-        job_id: Unique job identifier
-        engine: OCR engine to use
-        images_dir_str: Path to images directory
-        ground_truth_csv_str: Path to ground truth CSV (optional)
-        dataset_version: Version of the dataset
-        total_images: Total number of images
-        preprocessing: Preprocessing type to apply before OCR
-    """
-    # Import everything fresh in this process
-    import sys
-    import os
-    from pathlib import Path
-
-    # Add paths for imports
-    backend_dir = Path(__file__).parent
-    project_root = backend_dir.parent
-    sys.path.insert(0, str(project_root))
-    sys.path.insert(0, str(backend_dir))
-
-    # Load environment variables BEFORE importing anything that uses config.py
-    from dotenv import load_dotenv
-
-    # Try .env.local first (Next.js convention)
-    env_file = project_root / ".env.local"
-    if env_file.exists():
-        load_dotenv(env_file, override=True)
-        print(f"Loaded environment from {env_file}")
-
-    # Also try OCR_scripts/.env
-    ocr_env = project_root / "OCR_scripts" / ".env"
-    if ocr_env.exists():
-        load_dotenv(ocr_env, override=True)
-        print(f"Loaded environment from {ocr_env}")
-
-    # Verify ROBOFLOW_API_KEY is now set
-    roboflow_key = os.environ.get("ROBOFLOW_API_KEY", "")
-    if roboflow_key:
-        print(f"ROBOFLOW_API_KEY loaded: {roboflow_key[:8]}...")
-    else:
-        print("WARNING: ROBOFLOW_API_KEY not found in environment")
-
-    # Force reload of config module to pick up the new env vars
-    # This is necessary because config.py reads env vars at import time
-    import importlib
-    if 'config' in sys.modules:
-        importlib.reload(sys.modules['config'])
-
-    # Now import inference_service (which imports config)
-    from inference_service import InferenceService
-    from pixeltable_schema import setup_all_tables
-
-    # Ensure Pixeltable tables are set up in this subprocess
-    # (Each process needs its own Pixeltable connection/context)
-    print("[SUBPROCESS] Initializing Pixeltable tables...")
-    try:
-        setup_all_tables()
-        print("[SUBPROCESS] Pixeltable tables ready")
-    except Exception as e:
-        print(f"[SUBPROCESS] Warning during Pixeltable setup: {e}")
-        # Continue anyway - tables might already exist
-
-    images_dir = Path(images_dir_str)
-    ground_truth_csv = Path(ground_truth_csv_str) if ground_truth_csv_str else None
-
-    try:
-        try:
-            current_method = multiprocessing.get_start_method(allow_none=True)
-        except TypeError:
-            current_method = multiprocessing.get_start_method()
-        print(f"[SUBPROCESS] multiprocessing start method: {current_method}")
-
-        # Create fresh service instance in this process
-        service = InferenceService(use_gpu=use_gpu)
-
-        # Update job to running
-        service.update_job_status(job_id, "running")
-
-        # Run the actual inference
-        service.run_inference(
-            job_id=job_id,
-            engine=engine,
-            images_dir=images_dir,
-            ground_truth_csv=ground_truth_csv,
-            preprocessing=preprocessing,
-            use_gpu=use_gpu,
-        )
-
-        print(f"Inference job {job_id} completed successfully")
-
-    except Exception as e:
-        import traceback
-        tb = traceback.format_exc()
-        error_msg = f"{type(e).__name__}: {str(e)}\n\nTraceback:\n{tb}"
-        print(f"[PROCESS ERROR] Background inference failed:\n{error_msg}")
-
-        # Try to update status to failed with full traceback
-        try:
-            service = InferenceService()
-            # Truncate to 2000 chars for DB field limit
-            service.update_job_status(job_id, "failed", error_message=error_msg[:2000])
-        except Exception as update_err:
-            print(f"Failed to update job status: {update_err}")
-
-
 # ============================================================================
 # API Endpoints
 # ============================================================================
@@ -835,10 +1044,12 @@ async def health_check():
     except Exception as e:
         pixeltable_status = f"error: {str(e)}"
 
+    worker_pool_error = _WORKER_POOL.failed_reason if _WORKER_POOL is not None else None
     return HealthResponse(
-        status="healthy",
+        status="degraded" if worker_pool_error else "healthy",
         timestamp=datetime.now().isoformat(),
         pixeltable_status=pixeltable_status,
+        worker_pool_error=worker_pool_error,
     )
 
 
@@ -852,10 +1063,10 @@ async def get_datasets():
 async def start_inference(request: StartInferenceRequest):
     """Start a new inference job."""
     # Validate engine
-    if request.engine not in ("easyocr", "paddleocr", "smolvlm2"):
+    if request.engine not in SUPPORTED_ENGINES:
         raise HTTPException(
             status_code=400,
-            detail=f"Invalid engine: {request.engine}. Must be 'easyocr', 'paddleocr', or 'smolvlm2'"
+            detail=f"Invalid engine: {request.engine}. Must be one of: {', '.join(SUPPORTED_ENGINES)}"
         )
 
     # Find dataset
@@ -891,6 +1102,7 @@ async def start_inference(request: StartInferenceRequest):
             dataset_name=request.dataset_name,
             total_images=dataset.image_count,
             preprocessing=preprocessing,
+            use_gpu=request.use_gpu,
         )
     except Exception as e:
         import traceback
@@ -900,17 +1112,35 @@ async def start_inference(request: StartInferenceRequest):
             detail=f"Failed to create job: {type(e).__name__}: {str(e)}\n{tb[:1000]}"
         )
 
-    # Enqueue the job; the dispatcher will run jobs sequentially as capacity is available.
-    queue_position = _JOB_QUEUE.qsize() + 1
-    await _JOB_QUEUE.put({
-        "type": "single",
-        "job_id": job_id,
-        "engine": request.engine,
-        "dataset_version": request.dataset_version,
-        "preprocessing": preprocessing,
-        "use_gpu": request.use_gpu,
-    })
-    print(f"[QUEUE] Enqueued job {job_id} engine={request.engine} preprocessing={preprocessing} pos={queue_position}")
+    # More shards than slots (or images) would only queue behind each other.
+    shard_count = max(1, min(request.shards, MAX_CONCURRENT_WORKERS, dataset.image_count))
+    if shard_count > 1:
+        _SHARD_GROUPS[job_id] = {
+            "pending": shard_count,
+            "shard_count": shard_count,
+            "engine": request.engine,
+            "dataset_version": request.dataset_version,
+            "dataset_name": request.dataset_name,
+        }
+
+    # Enqueue the job (one item per shard); the dispatcher starts each as soon as a worker slot is available.
+    queue_position = _queue_depth() + 1
+    for shard_index in range(shard_count):
+        await _JOB_QUEUE.put({
+            "type": "single",
+            "job_id": job_id,
+            "engine": request.engine,
+            "dataset_version": request.dataset_version,
+            "preprocessing": preprocessing,
+            "use_gpu": request.use_gpu,
+            "shard_index": shard_index,
+            "shard_count": shard_count,
+        })
+    _wake_dispatcher()
+    print(
+        f"[QUEUE] Enqueued job {job_id} engine={request.engine} preprocessing={preprocessing} "
+        f"shards={shard_count} pos={queue_position}"
+    )
 
     return StartInferenceResponse(
         success=True,
@@ -929,86 +1159,6 @@ async def get_preprocessing_options():
     return get_available_preprocessing_options()
 
 
-def run_sequential_batch_inference(
-    job_configs: List[dict],
-):
-    """
-    Run multiple inference jobs sequentially in a single process.
-
-    This avoids Pixeltable concurrency conflicts by running one job at a time.
-    Each job_config contains: job_id, engine, images_dir, ground_truth_csv,
-    dataset_version, total_images, preprocessing, use_gpu
-    """
-    import sys
-    import os
-    from pathlib import Path
-
-    # Add paths for imports
-    backend_dir = Path(__file__).parent
-    project_root = backend_dir.parent
-    sys.path.insert(0, str(project_root))
-    sys.path.insert(0, str(backend_dir))
-
-    # Load environment variables
-    from dotenv import load_dotenv
-    env_file = project_root / ".env.local"
-    if env_file.exists():
-        load_dotenv(env_file, override=True)
-    ocr_env = project_root / "OCR_scripts" / ".env"
-    if ocr_env.exists():
-        load_dotenv(ocr_env, override=True)
-
-    # Import inference service
-    from inference_service import InferenceService
-
-    if not job_configs:
-        return
-
-    # Reuse a single service + detector across all preprocessing runs to reduce overhead
-    # and allow detection caching to avoid repeated Roboflow API calls.
-    default_use_gpu = bool(job_configs[0].get("use_gpu", True))
-    service = InferenceService(use_gpu=default_use_gpu)
-    detection_cache: dict = {}
-
-    for config in job_configs:
-        job_id = config["job_id"]
-        engine = config["engine"]
-        images_dir = Path(config["images_dir"])
-        ground_truth_csv = Path(config["ground_truth_csv"]) if config["ground_truth_csv"] else None
-        preprocessing = config["preprocessing"]
-        use_gpu = bool(config.get("use_gpu", True))
-
-        try:
-            service.set_use_gpu(use_gpu)
-
-            # Update job to running
-            service.update_job_status(job_id, "running")
-            print(f"Starting sequential job {job_id} with preprocessing: {preprocessing}")
-
-            # Run the actual inference (reuse detection cache across jobs)
-            service.run_inference(
-                job_id=job_id,
-                engine=engine,
-                images_dir=images_dir,
-                ground_truth_csv=ground_truth_csv,
-                preprocessing=preprocessing,
-                use_gpu=use_gpu,
-                detection_cache=detection_cache,
-            )
-
-            print(f"Completed job {job_id} with preprocessing: {preprocessing}")
-
-        except Exception as e:
-            import traceback
-            traceback.print_exc()
-            print(f"Job {job_id} failed: {e}")
-
-            try:
-                service.update_job_status(job_id, "failed", error_message=str(e))
-            except Exception as update_err:
-                print(f"Failed to update job status: {update_err}")
-
-
 @app.post("/inference/start-batch", response_model=StartBatchInferenceResponse)
 async def start_batch_inference(request: StartBatchInferenceRequest):
     """Start multiple inference jobs with different preprocessing options.
@@ -1017,10 +1167,10 @@ async def start_batch_inference(request: StartBatchInferenceRequest):
     to avoid Pixeltable concurrency conflicts.
     """
     # Validate engine
-    if request.engine not in ("easyocr", "paddleocr", "smolvlm2"):
+    if request.engine not in SUPPORTED_ENGINES:
         raise HTTPException(
             status_code=400,
-            detail=f"Invalid engine: {request.engine}. Must be 'easyocr', 'paddleocr', or 'smolvlm2'"
+            detail=f"Invalid engine: {request.engine}. Must be one of: {', '.join(SUPPORTED_ENGINES)}"
         )
 
     # Find dataset
@@ -1056,6 +1206,7 @@ async def start_batch_inference(request: StartBatchInferenceRequest):
                     dataset_name=request.dataset_name,
                     total_images=dataset.image_count,
                     preprocessing=preprocessing,
+                    use_gpu=request.use_gpu,
                 )
                 job_ids.append(job_id)
                 print(f"Created batch job {job_id} with preprocessing: {preprocessing}")
@@ -1082,7 +1233,7 @@ async def start_batch_inference(request: StartBatchInferenceRequest):
         await asyncio.sleep(JOB_CREATE_DELAY_S)
 
     # Enqueue a single batch item; the dispatcher will start the sequential batch worker when capacity is available.
-    queue_position = _JOB_QUEUE.qsize() + 1
+    queue_position = _queue_depth() + 1
     await _JOB_QUEUE.put({
         "type": "batch",
         "job_ids": job_ids,
@@ -1091,12 +1242,13 @@ async def start_batch_inference(request: StartBatchInferenceRequest):
         "preprocessing_options": request.preprocessing_options,
         "use_gpu": request.use_gpu,
     })
+    _wake_dispatcher()
     print(f"[QUEUE] Enqueued batch {len(job_ids)} jobs engine={request.engine} pos={queue_position}")
 
     return StartBatchInferenceResponse(
         success=True,
         job_ids=job_ids,
-        message=f"Queued {len(job_ids)} inference jobs (will run sequentially)",
+        message=f"Queued {len(job_ids)} inference jobs (will run as one batch)",
         total_jobs=len(job_ids),
         queued=True,
         queue_position=queue_position,
@@ -1107,7 +1259,24 @@ async def start_batch_inference(request: StartBatchInferenceRequest):
 async def list_jobs(limit: int = 50):
     """List recent inference jobs."""
     service = get_inference_service()
-    return service.list_jobs(limit=limit)
+    # Running jobs report progress live from their workers; the database lags behind by design
+    return [LIVE_PROGRESS.apply(job) for job in service.list_jobs(limit=limit)]
+
+
+@app.get("/inference/queue")
+async def get_queue_status():
+    """Report dispatcher slot usage and queue depth."""
+    running = _running_workers_by_engine()
+    return {
+        "max_workers": MAX_CONCURRENT_WORKERS,
+        "max_workers_per_engine": {
+            engine: _engine_limit(engine) for engine in SUPPORTED_ENGINES
+        },
+        "active_workers": sum(running.values()),
+        "active_workers_per_engine": running,
+        "active_job_ids": sorted(_JOB_PROCESSES),
+        "queued_items": _queue_depth(),
+    }
 
 
 @app.get("/inference/job-summaries", response_model=List[dict])
@@ -1146,7 +1315,7 @@ async def get_job_status(job_id: str):
     if not status:
         raise HTTPException(status_code=404, detail="Job not found")
 
-    return JobStatusResponse(**status)
+    return JobStatusResponse(**LIVE_PROGRESS.apply(status))
 
 
 @app.get("/inference/jobs/{job_id}/results")
@@ -1161,6 +1330,22 @@ async def get_job_results(job_id: str):
     return results
 
 
+@app.get("/inference/jobs/{job_id}/summary", response_model=JobSummary)
+async def get_job_summary(job_id: str):
+    """Get a job's summary (a partial one, over the images so far, while it runs)."""
+    service = get_inference_service()
+    status = service.get_job_status(job_id)
+
+    if not status:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    summary = service.get_job_summary(job_id, status["status"])
+    if summary is None:
+        raise HTTPException(status_code=404, detail="No summary available for this job yet")
+
+    return JobSummary(**service._convert_numpy_types(summary))
+
+
 @app.delete("/inference/jobs/{job_id}")
 async def delete_job(job_id: str):
     """Delete a job and all its related data from Pixeltable."""
@@ -1259,6 +1444,13 @@ async def list_ocr_engines():
             "supports_gpu": True,
             "languages": ["en"],
         },
+        {
+            "id": "easyocr_rec",
+            "name": "EasyOCR (recognition only)",
+            "description": "EasyOCR recognizer on the detected field crops, skipping CRAFT text detection",
+            "supports_gpu": True,
+            "languages": ["en"],
+        },
         {
             "id": "paddleocr",
             "name": "PaddleOCR",
@@ -1266,6 +1458,13 @@ async def list_ocr_engines():
             "supports_gpu": True,
             "languages": ["en"],
         },
+        {
+            "id": "paddleocr_rec",
+            "name": "PaddleOCR (recognition only)",
+            "description": "Paddle text-recognition model on the detected field crops, without document/detection stages",
+            "supports_gpu": True,
+            "languages": ["en"],
+        },
         {
             "id": "smolvlm2",
             "name": "SmolVLM2 (VLM)",
@@ -0,0 +1,203 @@
+"""
+Staged Pipeline Executor for Box Label OCR
+
+Runs a per-item workload as a chain of stages connected by bounded queues,
+each stage with its own thread count, so network-bound work (Roboflow,
+SmolVLM2) overlaps with CPU-bound work (decode, OCR). Throughput is set by
+the slowest stage instead of the sum of all of them, and the bounded queues
+keep memory flat (at most queue_size items wait between two stages).
+
+The caller consumes finished items from run() on its own thread, which is
+where anything that must stay on one thread (Pixeltable writes) belongs.
+
+With inline=True the stages run one after another on the caller's thread,
+which keeps SIGALRM-based time limits working.
+
+A stage with batch_size > 1 receives a list of up to batch_size items and
+returns a list (e.g. one OCR call for the crops of several images).
+
+A stage's initializer runs once on each of its threads before the first item
+(like ThreadPoolExecutor's), e.g. to give every OCR thread its own engine.
+"""
+
+import queue
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Iterator, List, Optional
+
+# End-of-stream marker passed down the queues.
+_STOP = object()
+
+
+@dataclass
+class Stage:
+    """
+    One pipeline step: fn(item) -> item, run by `workers` threads.
+
+    With batch_size > 1, fn(list of items) -> list of items; a threaded worker takes
+    whatever is already queued (up to batch_size) rather than waiting to fill a batch.
+    initializer() runs once per worker thread (threaded mode only; inline stages run
+    on the caller's thread).
+    """
+    name: str
+    fn: Callable[[Any], Any]
+    workers: int = 1
+    batch_size: int = 1
+    initializer: Optional[Callable[[], None]] = None
+
+
+class StagedPipeline:
+    """
+    Push items through stages over bounded queues; results come out unordered.
+
+    Stage functions should handle per-item failures themselves (e.g. record the
+    error on the item). An exception escaping a stage aborts the whole run and
+    is re-raised from run().
+    """
+
+    def __init__(self, stages: List[Stage], queue_size: int = 8, inline: bool = False):
+        if not stages:
+            raise ValueError("StagedPipeline needs at least one stage")
+        self.stages = stages
+        self.queue_size = max(1, int(queue_size))
+        self.inline = inline
+
+    def run(self, items: Iterable[Any]) -> Iterator[Any]:
+        if self.inline:
+            yield from self._run_inline(items)
+        else:
+            yield from self._run_threaded(items)
+
+    def _run_inline(self, items: Iterable[Any]) -> Iterator[Any]:
+        stream: Iterator[Any] = iter(items)
+        for stage in self.stages:
+            stream = self._apply_inline(stage, stream)
+        yield from stream
+
+    def _apply_inline(self, stage: Stage, stream: Iterator[Any]) -> Iterator[Any]:
+        if stage.batch_size <= 1:
+            for item in stream:
+                yield stage.fn(item)
+            return
+        batch: List[Any] = []
+        for item in stream:
+            batch.append(item)
+            if len(batch) >= stage.batch_size:
+                yield from stage.fn(batch)
+                batch = []
+        if batch:
+            yield from stage.fn(batch)
+
+    def _run_threaded(self, items: Iterable[Any]) -> Iterator[Any]:
+        abort = threading.Event()
+        errors: List[BaseException] = []
+        # queues[i] feeds stage i; queues[-1] is the output consumed by the caller.
+        queues: List["queue.Queue[Any]"] = [queue.Queue(maxsize=self.queue_size) for _ in range(len(self.stages) + 1)]
+        threads: List[threading.Thread] = []
+
+        def _put(q: "queue.Queue[Any]", item: Any) -> bool:
+            while not abort.is_set():
+                try:
+                    q.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def _get(q: "queue.Queue[Any]") -> Optional[Any]:
+            while not abort.is_set():
+                try:
+                    return q.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+            return _STOP
+
+        def _fail(err: BaseException) -> None:
+            errors.append(err)
+            abort.set()
+
+        def _feed() -> None:
+            try:
+                for item in items:
+                    if not _put(queues[0], item):
+                        return
+            except BaseException as e:
+                _fail(e)
+                return
+            for _ in range(max(1, self.stages[0].workers)):
+                _put(queues[0], _STOP)
+
+        def _work(idx: int, stage: Stage, remaining: List[int], lock: threading.Lock) -> None:
+            inbox, outbox = queues[idx], queues[idx + 1]
+            if stage.initializer is not None:
+                try:
+                    stage.initializer()
+                except BaseException as e:
+                    print(f"[PIPELINE] Stage '{stage.name}' initializer failed: {type(e).__name__}: {e}")
+                    _fail(e)
+                    return
+            stopping = False
+            while not stopping:
+                item = _get(inbox)
+                if item is _STOP:
+                    break
+                batch = [item]
+                while len(batch) < stage.batch_size:
+                    try:
+                        item = inbox.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is _STOP:
+                        stopping = True
+                        break
+                    batch.append(item)
+                try:
+                    if stage.batch_size > 1:
+                        results = stage.fn(batch)
+                    else:
+                        results = [stage.fn(batch[0])]
+                except BaseException as e:
+                    print(f"[PIPELINE] Stage '{stage.name}' failed: {type(e).__name__}: {e}")
+                    _fail(e)
+                    return
+                for result in results:
+                    if not _put(outbox, result):
+                        return
+            # The last worker of this stage to finish tells the next stage to stop.
+            with lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last:
+                downstream = self.stages[idx + 1].workers if idx + 1 < len(self.stages) else 1
+                for _ in range(max(1, downstream)):
+                    _put(outbox, _STOP)
+
+        threads.append(threading.Thread(target=_feed, name="pipeline-feed", daemon=True))
+        for idx, stage in enumerate(self.stages):
+            count = max(1, stage.workers)
+            remaining = [count]
+            lock = threading.Lock()
+            for n in range(count):
+                threads.append(threading.Thread(
+                    target=_work,
+                    args=(idx, stage, remaining, lock),
+                    name=f"pipeline-{stage.name}-{n}",
+                    daemon=True,
+                ))
+
+        for t in threads:
+            t.start()
+        try:
+            while True:
+                item = _get(queues[-1])
+                if item is _STOP:
+                    break
+                yield item
+        finally:
+            # Normal end, a stage error, or the consumer stopped early: release every thread.
+            abort.set()
+            for t in threads:
+                t.join(timeout=5.0)
+
+        if errors:
+            raise errors[0]
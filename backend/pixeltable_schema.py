@@ -99,6 +99,7 @@ if not OCR_SCRIPTS_DIR.exists():
 sys.path.insert(0, str(OCR_SCRIPTS_DIR))
 
 from config import DETECTION_CLASSES, CLASS_TO_CSV_COLUMN
+import edit_distance
 
 # Directory name in Pixeltable
 PIXELTABLE_DIR = "box_label_ocr"
@@ -138,6 +139,7 @@ def create_inference_jobs_table() -> Table:
     - started_at: Job start timestamp
     - completed_at: Job completion timestamp
     - error_message: Error details if failed
+    - use_gpu: GPU setting the job was started with (reused when it is resumed)
     """
     # Ensure directory exists first
     init_pixeltable()
@@ -147,10 +149,15 @@ def create_inference_jobs_table() -> Table:
     # Check if table already exists - DO NOT drop existing tables!
     try:
         existing_table = pxt.get_table(table_path)
+    except Exception:
+        existing_table = None  # Table doesn't exist, create it
+    if existing_table is not None:
         print(f"Table already exists: {table_path}")
+        # Tables created before use_gpu was recorded get the column (NULL for their old jobs)
+        if "use_gpu" not in existing_table.column_names():
+            existing_table.add_column(use_gpu=pxt.Bool, if_exists="ignore")
+            print(f"Added column use_gpu to {table_path}")
         return existing_table
-    except Exception:
-        pass  # Table doesn't exist, create it
 
     t = pxt.create_table(
         table_path,
@@ -167,6 +174,7 @@ def create_inference_jobs_table() -> Table:
             "started_at": pxt.Timestamp,
             "completed_at": pxt.Timestamp,
             "error_message": pxt.String,
+            "use_gpu": pxt.Bool,
         },
         if_exists="ignore"
     )
@@ -313,6 +321,121 @@ def create_job_summary_table() -> Table:
     return t
 
 
+def create_result_cache_table() -> Table:
+    """
+    Create table for memoized per-image results, shared across jobs.
+
+    Columns:
+    - config_key: Fingerprint of engine, preprocessing, model version and thresholds
+    - image_sha256: Content hash of the image file
+    - engine: OCR engine used
+    - preprocessing: Preprocessing type applied
+    - model_id: Detector (or VLM) model the result came from
+    - detections_json: JSON list of detections (class, confidence, x, y, width, height)
+    - ocr_results_json: JSON string of OCR text per class
+    - processing_time_ms: Time the original run spent on this image
+    - created_at: When this result was memoized
+    """
+    table_path = f"{PIXELTABLE_DIR}.result_cache"
+
+    # Check if table already exists - DO NOT drop existing tables!
+    try:
+        existing_table = pxt.get_table(table_path)
+        print(f"Table already exists: {table_path}")
+        return existing_table
+    except Exception:
+        pass  # Table doesn't exist, create it
+
+    t = pxt.create_table(
+        table_path,
+        {
+            "config_key": pxt.String,
+            "image_sha256": pxt.String,
+            "engine": pxt.String,
+            "preprocessing": pxt.String,
+            "model_id": pxt.String,
+            "detections_json": pxt.String,
+            "ocr_results_json": pxt.String,
+            "processing_time_ms": pxt.Float,
+            "created_at": pxt.Timestamp,
+        },
+        if_exists="ignore"
+    )
+
+    print(f"Created table: {table_path}")
+    return t
+
+
+def create_stage_timeouts_table() -> Table:
+    """
+    Create table recording each time limit that fired during a job.
+
+    Columns:
+    - job_id: Job the timed-out image belongs to
+    - stage: Limit that fired (detect, ocr, ocr_batch, roboflow_detect, smolvlm2_infer, ...)
+    - image_filename: Image being processed (empty for multi-image stages)
+    - created_at: When the timeout was recorded
+    """
+    table_path = f"{PIXELTABLE_DIR}.stage_timeouts"
+
+    # Check if table already exists - DO NOT drop existing tables!
+    try:
+        existing_table = pxt.get_table(table_path)
+        print(f"Table already exists: {table_path}")
+        return existing_table
+    except Exception:
+        pass  # Table doesn't exist, create it
+
+    t = pxt.create_table(
+        table_path,
+        {
+            "job_id": pxt.String,
+            "stage": pxt.String,
+            "image_filename": pxt.String,
+            "created_at": pxt.Timestamp,
+        },
+        if_exists="ignore"
+    )
+
+    print(f"Created table: {table_path}")
+    return t
+
+
+def create_summary_partials_table() -> Table:
+    """
+    Create table holding the running summary state of in-progress jobs.
+
+    Columns:
+    - job_id: Job the state belongs to
+    - shard_index: Shard that owns the row (0 for unsharded jobs)
+    - state_json: SummaryAccumulator state (per-field counts, matches, CER sums)
+    - updated_at: Last time the state was written
+    """
+    table_path = f"{PIXELTABLE_DIR}.summary_partials"
+
+    # Check if table already exists - DO NOT drop existing tables!
+    try:
+        existing_table = pxt.get_table(table_path)
+        print(f"Table already exists: {table_path}")
+        return existing_table
+    except Exception:
+        pass  # Table doesn't exist, create it
+
+    t = pxt.create_table(
+        table_path,
+        {
+            "job_id": pxt.String,
+            "shard_index": pxt.Int,
+            "state_json": pxt.String,
+            "updated_at": pxt.Timestamp,
+        },
+        if_exists="ignore"
+    )
+
+    print(f"Created table: {table_path}")
+    return t
+
+
 # ============================================================================
 # User-Defined Functions (UDFs) for OCR
 # ============================================================================
@@ -455,29 +578,8 @@ def calculate_cer(prediction: str, ground_truth: str) -> float:
 
     CER = Levenshtein distance / length of ground truth
     """
-    if not ground_truth:
-        return 0.0 if not prediction else 1.0
-
-    # Levenshtein distance calculation
-    def levenshtein(s1: str, s2: str) -> int:
-        if len(s1) < len(s2):
-            return levenshtein(s2, s1)
-        if len(s2) == 0:
-            return len(s1)
-
-        prev_row = range(len(s2) + 1)
-        for i, c1 in enumerate(s1):
-            curr_row = [i + 1]
-            for j, c2 in enumerate(s2):
-                insertions = prev_row[j + 1] + 1
-                deletions = curr_row[j] + 1
-                substitutions = prev_row[j] + (c1 != c2)
-                curr_row.append(min(insertions, deletions, substitutions))
-            prev_row = curr_row
-        return prev_row[-1]
-
-    distance = levenshtein(prediction, ground_truth)
-    return distance / len(ground_truth)
+    # Shared bit-parallel engine (same numbers as benchmark.character_error_rate)
+    return edit_distance.character_error_rate(prediction, ground_truth)
 
 
 @pxt.udf
@@ -542,6 +644,18 @@ def get_job_summaries_table() -> Table:
     return get_table("job_summaries")
 
 
+def get_result_cache_table() -> Table:
+    return get_table("result_cache")
+
+
+def get_stage_timeouts_table() -> Table:
+    return get_table("stage_timeouts")
+
+
+def get_summary_partials_table() -> Table:
+    return get_table("summary_partials")
+
+
 # Retry-enabled wrappers for table operations
 @retry_on_db_error(max_retries=3, delay=0.5)
 def table_insert(table: Table, rows: list):
@@ -576,6 +690,9 @@ def setup_all_tables():
     create_image_results_table()
     create_benchmark_results_table()
     create_job_summary_table()
+    create_result_cache_table()
+    create_stage_timeouts_table()
+    create_summary_partials_table()
     print("All Pixeltable tables created successfully!")
 
 
@@ -585,7 +702,7 @@ if __name__ == "__main__":
 
     # Print table info
     print("\n--- Tables Created ---")
-    for table_name in ["inference_jobs", "image_results", "benchmark_results", "job_summaries"]:
+    for table_name in ["inference_jobs", "image_results", "benchmark_results", "job_summaries", "result_cache", "stage_timeouts", "summary_partials"]:
         t = get_table(table_name)
         print(f"\n{table_name}:")
         print(f"  Columns: {list(t.column_names())}")
@@ -0,0 +1,214 @@
+"""
+Throttled Job Progress for Box Label OCR
+
+Writing processed_images to the inference_jobs table after every image costs
+one Pixeltable UPDATE per image, which on fast engines is more load on the
+jobs table than the result inserts themselves. ProgressReporter coalesces
+those writes:
+
+- PROGRESS_DB_INTERVAL_SECONDS: write progress at most this often (default 5)
+- PROGRESS_DB_EVERY_IMAGES: also write once this many images are unwritten
+  (default 0 = time-based only; 1 writes every image as before)
+
+The exact final count is still written when a job completes (and by
+ProgressReporter.finish() for shards and failed jobs).
+
+Live progress goes through a cheaper in-memory channel instead: every image
+publishes a small message. In a pool worker the publisher sends it over the
+worker's pipe to the API process, which keeps it in LIVE_PROGRESS; without a
+publisher (in-process runs) messages go straight to LIVE_PROGRESS. The status
+endpoints overlay it on the database row while the job is running.
+"""
+
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return max(0.0, float(os.environ.get(name, "") or default))
+    except ValueError:
+        return default
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(0, int(os.environ.get(name, "") or default))
+    except ValueError:
+        return default
+
+
+class LiveProgress:
+    """
+    In-memory progress of running jobs, per (job_id, source).
+
+    A source (worker pid) reports either an absolute processed count or, for a
+    shard, how many of its images are not yet in the database's counter.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, Dict[Any, Tuple[Optional[int], int]]] = {}
+        self._lock = threading.Lock()
+
+    def update(self, msg: Dict[str, Any], source: Any = None) -> None:
+        job_id = msg.get("job_id")
+        if not job_id:
+            return
+        entry = (msg.get("processed"), int(msg.get("unwritten", 0) or 0))
+        with self._lock:
+            self._entries.setdefault(job_id, {})[source] = entry
+
+    def clear(self, job_id: str, source: Any = None) -> None:
+        """Forget a job's live progress (from one source, or from all when source is None)."""
+        with self._lock:
+            if source is None:
+                self._entries.pop(job_id, None)
+                return
+            sources = self._entries.get(job_id)
+            if sources is not None:
+                sources.pop(source, None)
+                if not sources:
+                    self._entries.pop(job_id, None)
+
+    def processed(self, job_id: str, db_processed: int, total: int) -> int:
+        """Best current processed count: the database value plus what hasn't been written yet."""
+        with self._lock:
+            entries = list(self._entries.get(job_id, {}).values())
+        if not entries:
+            return db_processed
+        absolute = max((p for p, _ in entries if p is not None), default=0)
+        processed = max(db_processed, absolute) + sum(unwritten for _, unwritten in entries)
+        return min(processed, total) if total > 0 else processed
+
+    def apply(self, status: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Overlay live progress on a job status dict (running jobs only)."""
+        if not status or status.get("status") != "running":
+            return status
+        total = int(status.get("total_images", 0) or 0)
+        db_processed = int(status.get("processed_images", 0) or 0)
+        processed = self.processed(status["job_id"], db_processed, total)
+        if processed != db_processed:
+            status = dict(status)
+            status["processed_images"] = processed
+            status["progress"] = (processed / total * 100) if total > 0 else 0
+        return status
+
+
+LIVE_PROGRESS = LiveProgress()
+
+_publisher: Optional[Callable[[Dict[str, Any]], None]] = None
+_publish_lock = threading.Lock()
+
+
+def set_publisher(publisher: Optional[Callable[[Dict[str, Any]], None]]) -> None:
+    """Route live progress messages (e.g. a pool worker's pipe); None keeps them in this process."""
+    global _publisher
+    _publisher = publisher
+
+
+def publish(msg: Dict[str, Any]) -> None:
+    """Send a live progress message; never raises (progress is advisory)."""
+    msg = {"type": "progress", **msg}
+    publisher = _publisher
+    if publisher is None:
+        LIVE_PROGRESS.update(msg)
+        return
+    try:
+        with _publish_lock:
+            publisher(msg)
+    except Exception as e:
+        print(f"[PROGRESS] Live update for {msg.get('job_id')} failed: {type(e).__name__}: {e}")
+
+
+class ProgressReporter:
+    """
+    Per-job progress: published live on every image, written to the database throttled.
+
+    Args:
+        job_id: Job to report for
+        write: Writes progress to the database; called with the absolute processed
+               count, or for a shard with the number of images to add
+        base: Images already counted when this run started (resume checkpoint)
+        sharded: Report increments to a counter shared with sibling shards
+        defer: Runs a write once the rows it covers are stored (the write-behind
+               writer's after_flush); None writes immediately
+    """
+
+    def __init__(
+        self,
+        job_id: str,
+        write: Callable[[int], Any],
+        base: int = 0,
+        sharded: bool = False,
+        defer: Optional[Callable[[Any, Callable[[], Any]], None]] = None,
+        interval_s: Optional[float] = None,
+        every: Optional[int] = None,
+    ):
+        self.job_id = job_id
+        self._write = write
+        self.sharded = sharded
+        self._defer = defer
+        self.interval_s = _env_float("PROGRESS_DB_INTERVAL_SECONDS", 5.0) if interval_s is None else interval_s
+        self.every = _env_int("PROGRESS_DB_EVERY_IMAGES", 0) if every is None else every
+
+        # Shards count from 0 (their work is added to the shared counter); others from the checkpoint
+        self._base = 0 if sharded else base
+        self.done = 0
+        # done as of the last write handed to defer, and as of the last write that ran
+        self._scheduled = 0
+        self._written = 0
+        self._last_write = time.monotonic()
+        self.db_writes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def processed(self) -> int:
+        return self._base + self.done
+
+    def advance(self, count: int = 1) -> None:
+        """Count processed images; writes to the database only when due."""
+        self.done += count
+        self._publish()
+        unscheduled = self.done - self._scheduled
+        due = time.monotonic() - self._last_write >= self.interval_s
+        if (self.every and unscheduled >= self.every) or (due and unscheduled):
+            self._schedule()
+
+    def finish(self, quiet: bool = False) -> None:
+        """Schedule a write of the exact count; quiet logs a failure instead of raising."""
+        if self.done <= self._scheduled:
+            return
+        try:
+            self._schedule()
+        except Exception as e:
+            if not quiet:
+                raise
+            print(f"[PROGRESS] Final progress write for {self.job_id} failed: {type(e).__name__}: {e}")
+
+    def _schedule(self) -> None:
+        target = self.done
+        self._scheduled = target
+        self._last_write = time.monotonic()
+        if self._defer is None:
+            self._write_until(target)
+        else:
+            # A later write replaces this one if it hasn't run yet (it covers more images)
+            self._defer(("progress", self.job_id), lambda: self._write_until(target))
+
+    def _write_until(self, target: int) -> None:
+        with self._lock:
+            if target <= self._written:
+                return
+            amount = target - self._written if self.sharded else self._base + target
+            self._write(amount)
+            self._written = target
+            self.db_writes += 1
+        self._publish()
+
+    def _publish(self) -> None:
+        if self.sharded:
+            publish({"job_id": self.job_id, "unwritten": self.done - self._written})
+        else:
+            publish({"job_id": self.job_id, "processed": self.processed})
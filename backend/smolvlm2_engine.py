@@ -1,8 +1,15 @@
 """
-SmolVLM2 inference wrapper (Roboflow Serverless via inference_sdk).
+SmolVLM2 inference wrapper (Roboflow Serverless).
 
 Used by the FastAPI backend to run end-to-end OCR over the full image
 (no detection/cropping required), returning a dict keyed by DETECTION_CLASSES.
+
+Requests go through inference_sdk. SMOLVLM2_HTTP_CLIENT=pooled sends them
+over the keep-alive session in http_pool instead (opt-in: that request is
+built here, see _infer_pooled).
+
+Up to SMOLVLM2_MAX_IN_FLIGHT requests run at once (submit_extract), under a SMOLVLM2_MAX_RPS token bucket. Transient failures are
+retried with jittered exponential backoff.
 """
 
 from __future__ import annotations
@@ -11,10 +18,21 @@ import json
 import os
 import re
 import ast
+import base64
+import random
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Dict, Optional
 
+import cv2
+import numpy as np
+import requests
 from inference_sdk import InferenceHTTPClient
 
+import http_pool
+from roboflow_detector import RateLimiter
+
 from config import (
     DETECTION_CLASSES,
     ROBOFLOW_API_KEY,
@@ -23,6 +41,44 @@ from config import (
     SMOLVLM2_VERSION,
 )
 
+# Shared by every engine (and thread) in this process, like the Roboflow detector's limits.
+SMOLVLM2_MAX_IN_FLIGHT = max(1, int(os.environ.get("SMOLVLM2_MAX_IN_FLIGHT", "4") or "4"))
+_RATE_LIMITER = RateLimiter(float(os.environ.get("SMOLVLM2_MAX_RPS", "0") or "0"))
+_IN_FLIGHT = threading.BoundedSemaphore(SMOLVLM2_MAX_IN_FLIGHT)
+_EXECUTOR: Optional[ThreadPoolExecutor] = None
+_EXECUTOR_LOCK = threading.Lock()
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is None:
+            _EXECUTOR = ThreadPoolExecutor(max_workers=SMOLVLM2_MAX_IN_FLIGHT, thread_name_prefix="smolvlm2")
+        return _EXECUTOR
+
+
+def _is_transient(err: Exception) -> bool:
+    """Network failures, timeouts, 429 and 5xx responses are worth retrying; anything else is not."""
+    if isinstance(err, (requests.ConnectionError, requests.Timeout)):
+        return True
+    response = getattr(err, "response", None)
+    # inference_sdk's HTTPCallErrorError carries the status code itself
+    status = getattr(response, "status_code", None) if response is not None else getattr(err, "status_code", None)
+    if not isinstance(status, int):
+        return False
+    return status == 429 or status >= 500
+
+
+def _retry_delay(err: Exception, attempt: int, base_s: float) -> float:
+    """Backoff before the next attempt: Retry-After if the server sent one, else jittered exponential."""
+    response = getattr(err, "response", None)
+    retry_after = getattr(response, "headers", {}).get("Retry-After") if response is not None else None
+    if retry_after:
+        try:
+            return float(retry_after)
+        except ValueError:
+            pass
+    return base_s * (2 ** attempt) * random.uniform(0.5, 1.5)
+
 
 class SmolVLM2Engine:
     """Wrapper for SmolVLM2 via Roboflow Inference SDK."""
@@ -51,13 +107,83 @@ class SmolVLM2Engine:
 
         self.client = InferenceHTTPClient(api_url=self.api_url, api_key=self.api_key)
         self.model_id = f"{self.project}/{self.version}"
-        print(f"[SMOLVLM2] Initialized model_id={self.model_id} api_url={self.api_url}")
+        self.use_sdk = os.environ.get("SMOLVLM2_HTTP_CLIENT", "sdk").strip().lower() != "pooled"
+        self.request_timeout_s = float(os.environ.get("SMOLVLM_TIMEOUT_SECONDS", "90"))
+        print(f"[SMOLVLM2] Initialized model_id={self.model_id} api_url={self.api_url} sdk={self.use_sdk}")
 
-    def extract_all_fields(self, image_path: str) -> Dict[str, str]:
+    def _infer_pooled(self, image_bytes: bytes, prompt: str) -> object:
+        """
+        POST the encoded image and the prompt to the model over the pooled session.
+
+        The request is the inference server's LMM request (JSON body with model_id, the
+        base64 image, the prompt and the api_key), so neither the prompt nor the key
+        goes into the URL. It has not been checked against every serverless deployment,
+        which is why the SDK stays the default.
+        """
+        payload = {
+            "api_key": self.api_key,
+            "model_id": self.model_id,
+            "image": {"type": "base64", "value": base64.b64encode(image_bytes).decode("ascii")},
+            "prompt": prompt,
+        }
+        response = http_pool.post(
+            "smolvlm2",
+            f"{self.api_url.rstrip('/')}/infer/lmm",
+            data=json.dumps(payload),
+            headers={"Content-Type": "application/json"},
+            timeout=self.request_timeout_s,
+        )
+        http_pool.raise_for_status(response)
+        return response.json()
+
+    def _infer(self, image_path: str, image_bytes: Optional[bytes], prompt: str) -> object:
+        """One request, holding a rate-limit token and an in-flight slot."""
+        _RATE_LIMITER.acquire()
+        with _IN_FLIGHT:
+            if not self.use_sdk:
+                if image_bytes is None:
+                    with open(image_path, "rb") as f:
+                        image_bytes = f.read()
+                return self._infer_pooled(image_bytes, prompt)
+
+            inference_input: object = str(image_path)
+            if image_bytes is not None:
+                inference_input = cv2.imdecode(np.frombuffer(image_bytes, dtype=np.uint8), cv2.IMREAD_COLOR)
+            # Some inference-sdk versions support a 'prompt' kwarg for generative/VLM models.
+            try:
+                return self.client.infer(inference_input=inference_input, model_id=self.model_id, prompt=prompt)
+            except TypeError:
+                return self.client.infer(inference_input=inference_input, model_id=self.model_id)
+
+    def _infer_with_retry(self, image_path: str, image_bytes: Optional[bytes], prompt: str) -> object:
+        """_infer() with SMOLVLM2_MAX_RETRIES attempts on transient (network / 429 / 5xx) errors."""
+        max_retries = max(1, int(os.environ.get("SMOLVLM2_MAX_RETRIES", "3") or "3"))
+        base_s = float(os.environ.get("SMOLVLM2_RETRY_BASE_SECONDS", "1.0") or "1.0")
+        for attempt in range(max_retries):
+            try:
+                return self._infer(image_path, image_bytes, prompt)
+            except Exception as e:
+                if not _is_transient(e) or attempt == max_retries - 1:
+                    raise
+                delay = _retry_delay(e, attempt, base_s)
+                print(f"[SMOLVLM2] Transient error (attempt {attempt + 1}/{max_retries}), retrying in {delay:.1f}s: {e}")
+                time.sleep(delay)
+
+    def submit_extract(self, image_path: str, image_bytes: Optional[bytes] = None) -> "Future[Dict[str, str]]":
+        """Start extract_all_fields() on the shared pool (at most SMOLVLM2_MAX_IN_FLIGHT run at once)."""
+        return _get_executor().submit(self.extract_all_fields, image_path, image_bytes)
+
+    def extract_all_fields(self, image_path: str, image_bytes: Optional[bytes] = None) -> Dict[str, str]:
         """
         Extract all label fields from a full image using SmolVLM2.
 
+        Args:
+            image_path: Image file (used for logging, and read if image_bytes is omitted)
+            image_bytes: Encoded image to upload as-is
+
         Returns a dict with keys = DETECTION_CLASSES (missing fields are empty strings).
+        Raises if the request fails (after retries), so callers record the image as failed
+        instead of storing (and memoizing) all-empty fields as a real result.
         """
         fields_list = "\n".join(f"- {field}" for field in DETECTION_CLASSES)
         prompt = (
@@ -68,15 +194,10 @@ class SmolVLM2Engine:
         )
 
         try:
-            # Some inference-sdk versions support a 'prompt' kwarg for generative/VLM models.
-            try:
-                result = self.client.infer(inference_input=str(image_path), model_id=self.model_id, prompt=prompt)
-            except TypeError:
-                result = self.client.infer(inference_input=str(image_path), model_id=self.model_id)
-            return self._parse_response(result)
+            return self._parse_response(self._infer_with_retry(image_path, image_bytes, prompt))
         except Exception as e:
             print(f"[SMOLVLM2] Error during inference for {image_path}: {type(e).__name__}: {e}")
-            return {field: "" for field in DETECTION_CLASSES}
+            raise
 
     def _parse_response(self, result: object) -> Dict[str, str]:
         """Parse raw inference response into a DETECTION_CLASSES-keyed dict."""
@@ -0,0 +1,138 @@
+"""
+Streaming Job Summaries for Box Label OCR
+
+A job summary used to be computed at the end by re-querying every
+benchmark_results row of the job. SummaryAccumulator keeps the same numbers as
+running per-field sums instead, fed with each image's benchmark rows as they
+are stored, so completing a job costs O(fields) rather than O(rows).
+
+Its state is plain JSON. Jobs persist it to the summary_partials table
+(one row per shard) alongside their throttled progress writes, which makes a
+partial summary queryable mid-run and lets finalize_job() merge the shards of
+a sharded job without scanning their rows.
+"""
+
+import json
+import threading
+from typing import Any, Dict, Iterable, Optional
+
+
+class _FieldStats:
+    """Running sums for one field."""
+
+    __slots__ = ("count", "exact", "normalized", "cer_sum")
+
+    def __init__(self, count: int = 0, exact: int = 0, normalized: int = 0, cer_sum: float = 0.0):
+        self.count = count
+        self.exact = exact
+        self.normalized = normalized
+        self.cer_sum = cer_sum
+
+    def add(self, exact: bool, normalized: bool, cer: float) -> None:
+        self.count += 1
+        self.exact += int(bool(exact))
+        self.normalized += int(bool(normalized))
+        self.cer_sum += float(cer)
+
+    def merge(self, other: "_FieldStats") -> None:
+        self.count += other.count
+        self.exact += other.exact
+        self.normalized += other.normalized
+        self.cer_sum += other.cer_sum
+
+    def to_list(self) -> list:
+        return [self.count, self.exact, self.normalized, self.cer_sum]
+
+
+class SummaryAccumulator:
+    """Per-field counts, exact/normalized matches and CER sums for one job (or shard)."""
+
+    def __init__(self):
+        self.images = 0
+        self.fields: Dict[str, _FieldStats] = {}
+        # The job thread adds rows while the write-behind thread serializes the state
+        self._lock = threading.Lock()
+
+    def add_image(self, benchmark_rows: Iterable[Dict[str, Any]]) -> None:
+        """Add one image's benchmark rows (images without ground truth add nothing)."""
+        with self._lock:
+            counted = False
+            for row in benchmark_rows:
+                stats = self.fields.get(row["field_name"])
+                if stats is None:
+                    stats = self.fields[row["field_name"]] = _FieldStats()
+                stats.add(row["exact_match"], row["normalized_match"], row["character_error_rate"])
+                counted = True
+            if counted:
+                self.images += 1
+
+    def merge(self, other: "SummaryAccumulator") -> None:
+        """Fold in another accumulator covering different images (e.g. a sibling shard)."""
+        self.images += other.images
+        for field_name, stats in other.fields.items():
+            mine = self.fields.get(field_name)
+            if mine is None:
+                mine = self.fields[field_name] = _FieldStats()
+            mine.merge(stats)
+
+    @property
+    def total_fields(self) -> int:
+        return sum(stats.count for stats in self.fields.values())
+
+    def summary(self) -> Optional[Dict[str, Any]]:
+        """Summary metrics in the job_summaries layout, or None when nothing was benchmarked."""
+        total_fields = self.total_fields
+        if total_fields == 0:
+            return None
+        return {
+            "total_images": self.images,
+            "overall_exact_match_rate": sum(s.exact for s in self.fields.values()) / total_fields,
+            "overall_normalized_match_rate": sum(s.normalized for s in self.fields.values()) / total_fields,
+            "overall_cer": sum(s.cer_sum for s in self.fields.values()) / total_fields,
+            "per_field_stats": {
+                field_name: {
+                    "exact_match_rate": s.exact / s.count,
+                    "normalized_match_rate": s.normalized / s.count,
+                    "average_cer": s.cer_sum / s.count,
+                    "sample_count": s.count,
+                }
+                for field_name, s in self.fields.items()
+                if s.count
+            },
+        }
+
+    def to_json(self) -> str:
+        with self._lock:
+            return json.dumps({
+                "images": self.images,
+                "fields": {field_name: stats.to_list() for field_name, stats in self.fields.items()},
+            })
+
+    @classmethod
+    def from_json(cls, state: str) -> "SummaryAccumulator":
+        data = json.loads(state) if state else {}
+        acc = cls()
+        acc.images = int(data.get("images", 0))
+        for field_name, values in (data.get("fields") or {}).items():
+            count, exact, normalized, cer_sum = values
+            acc.fields[field_name] = _FieldStats(int(count), int(exact), int(normalized), float(cer_sum))
+        return acc
+
+    @classmethod
+    def from_frame(cls, df) -> "SummaryAccumulator":
+        """Build from a benchmark_results DataFrame (jobs without a stored state, resume seeding)."""
+        acc = cls()
+        if df is None or len(df) == 0:
+            return acc
+        acc.images = int(df["image_filename"].nunique())
+        grouped = df.groupby("field_name").agg(
+            count=("exact_match", "size"),
+            exact=("exact_match", "sum"),
+            normalized=("normalized_match", "sum"),
+            cer_sum=("character_error_rate", "sum"),
+        )
+        for field_name, row in grouped.iterrows():
+            acc.fields[field_name] = _FieldStats(
+                int(row["count"]), int(row["exact"]), int(row["normalized"]), float(row["cer_sum"])
+            )
+        return acc
@@ -0,0 +1,276 @@
+"""
+Tests for the staged pipeline (pipeline.py) and the threaded run_inference path.
+
+Run with:
+    cd backend
+    python -m pytest test_pipeline.py
+
+The run_inference tests need the backend's dependencies (pixeltable, cv2, ...)
+importable and are skipped otherwise; no database or network is used.
+"""
+import threading
+import time
+
+import pytest
+
+from pipeline import Stage, StagedPipeline
+
+
+def _double(x):
+    return x * 2
+
+
+def _pipeline(inline, **kwargs):
+    return StagedPipeline(
+        [
+            Stage("add", lambda x: x + 1, workers=kwargs.get("workers", 3)),
+            Stage("double", _double, workers=kwargs.get("workers", 3)),
+        ],
+        queue_size=kwargs.get("queue_size", 2),
+        inline=inline,
+    )
+
+
+@pytest.mark.parametrize("inline", [True, False])
+def test_every_item_passes_every_stage(inline):
+    results = list(_pipeline(inline).run(range(50)))
+    assert sorted(results) == [(x + 1) * 2 for x in range(50)]
+
+
+def test_inline_keeps_order_and_runs_on_caller_thread():
+    caller = threading.current_thread()
+    seen = []
+
+    def record(x):
+        seen.append(threading.current_thread())
+        return x
+
+    results = list(StagedPipeline([Stage("a", record, workers=4)], inline=True).run(range(10)))
+    assert results == list(range(10))
+    assert all(t is caller for t in seen)
+
+
+@pytest.mark.parametrize("inline", [True, False])
+def test_batch_stage_gets_lists_no_larger_than_batch_size(inline):
+    sizes = []
+
+    def batch(items):
+        sizes.append(len(items))
+        return [x * 10 for x in items]
+
+    pipeline = StagedPipeline([Stage("batch", batch, batch_size=4)], inline=inline)
+    results = list(pipeline.run(range(10)))
+    assert sorted(results) == [x * 10 for x in range(10)]
+    assert sum(sizes) == 10
+    assert max(sizes) <= 4
+    if inline:
+        assert sizes == [4, 4, 2]
+
+
+def test_stage_error_aborts_run_and_is_reraised():
+    started = []
+
+    def boom(x):
+        started.append(x)
+        if x == 3:
+            raise RuntimeError("stage failed")
+        return x
+
+    pipeline = StagedPipeline([Stage("boom", boom, workers=2)], queue_size=1)
+    with pytest.raises(RuntimeError, match="stage failed"):
+        list(pipeline.run(range(1000)))
+    # The abort stops feeding: far fewer items than the input were processed
+    assert len(started) < 1000
+
+
+def test_input_iterator_error_is_reraised():
+    def items():
+        yield 1
+        raise ValueError("bad input")
+
+    with pytest.raises(ValueError, match="bad input"):
+        list(StagedPipeline([Stage("id", lambda x: x)]).run(items()))
+
+
+def test_consumer_stopping_early_releases_threads():
+    before = threading.active_count()
+    run = StagedPipeline([Stage("slow", lambda x: x, workers=3)], queue_size=1).run(range(10_000))
+    assert next(run) is not None
+    run.close()
+    deadline = time.monotonic() + 5
+    while threading.active_count() > before and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert threading.active_count() <= before
+
+
+def test_initializer_runs_once_per_worker_thread():
+    local = threading.local()
+    inits = []
+
+    def init():
+        local.engine = object()
+        inits.append(threading.current_thread().name)
+
+    def use(x):
+        time.sleep(0.001)
+        return id(local.engine)
+
+    engines = set(StagedPipeline([Stage("ocr", use, workers=3, initializer=init)]).run(range(60)))
+    assert len(inits) == 3
+    assert len(set(inits)) == 3
+    assert 1 <= len(engines) <= 3
+
+
+def test_initializer_is_not_run_inline():
+    inits = []
+    pipeline = StagedPipeline([Stage("ocr", lambda x: x, initializer=lambda: inits.append(1))], inline=True)
+    assert list(pipeline.run(range(3))) == [0, 1, 2]
+    assert inits == []
+
+
+def test_initializer_error_aborts_run():
+    def init():
+        raise RuntimeError("no model")
+
+    with pytest.raises(RuntimeError, match="no model"):
+        list(StagedPipeline([Stage("ocr", lambda x: x, workers=2, initializer=init)]).run(range(5)))
+
+
+def test_empty_stage_list_is_rejected():
+    with pytest.raises(ValueError):
+        StagedPipeline([])
+
+
+# ---------------------------------------------------------------------------
+# Threaded run_inference path
+# ---------------------------------------------------------------------------
+
+class _FakeDetector:
+    workspace = "ws"
+    project_name = "proj"
+    version = 1
+
+
+@pytest.fixture
+def threaded_service(monkeypatch, tmp_path):
+    inference_service = pytest.importorskip("inference_service")
+    monkeypatch.setattr(inference_service, "setup_all_tables", lambda: None)
+    monkeypatch.setenv("DEFAULT_USE_GPU", "0")
+    monkeypatch.setenv("INFERENCE_PIPELINE", "1")
+    monkeypatch.setenv("PIPELINE_OCR_WORKERS", "3")
+    monkeypatch.setenv("DETECTION_LOOKAHEAD", "0")
+    monkeypatch.setenv("RESULT_CACHE", "0")
+    monkeypatch.setenv("WRITE_BEHIND", "0")
+    monkeypatch.setenv("OCR_BATCH", "0")
+    monkeypatch.setenv("OCR_THREADS", "1")
+
+    service = inference_service.InferenceService(use_gpu=False)
+
+    images_dir = tmp_path / "version-1" / "images"
+    images_dir.mkdir(parents=True)
+    for n in range(12):
+        (images_dir / f"img{n:02d}.jpg").write_bytes(b"not decoded in this test")
+
+    stored = []
+    statuses = []
+    engines = []
+    engines_lock = threading.Lock()
+
+    def fake_detect(detector, image_path, detection_cache=None, prefetched=None, image=None, lookup=None):
+        return [], {"lot_number": image_path.name}
+
+    def fake_ocr_crops(crops, engine, preprocessing, image_filename, failures=None):
+        reader = service._init_easyocr()
+        with engines_lock:
+            engines.append((threading.current_thread().name, id(reader)))
+        time.sleep(0.002)
+        return {name: str(crop) for name, crop in crops.items()}
+
+    class _Reader:
+        pass
+
+    monkeypatch.setattr(service, "_init_detector", lambda: _FakeDetector())
+    monkeypatch.setattr(service, "_detect_image", fake_detect)
+    monkeypatch.setattr(service, "_ocr_crops", fake_ocr_crops)
+    monkeypatch.setattr(service, "_init_easyocr", lambda languages=None: service._engine("easyocr_reader", _Reader))
+    monkeypatch.setattr(service, "_store_image_outputs", lambda job_id, path, *a, **k: stored.append(path.name))
+    monkeypatch.setattr(service, "save_summary_state", lambda *a, **k: None)
+    monkeypatch.setattr(service, "_complete_summary", lambda *a, **k: None)
+    monkeypatch.setattr(service, "record_stage_timeouts", lambda *a, **k: None)
+    monkeypatch.setattr(
+        service, "update_job_status", lambda job_id, status, **k: statuses.append((status, k.get("processed_images")))
+    )
+    return service, images_dir, stored, statuses, engines
+
+
+def test_threaded_run_inference_stores_every_image(threaded_service):
+    service, images_dir, stored, statuses, _ = threaded_service
+    service.run_inference("easyocr", images_dir, job_id="job-1")
+    assert sorted(stored) == sorted(p.name for p in images_dir.iterdir())
+    assert statuses[-1] == ("completed", 12)
+
+
+def test_threaded_ocr_workers_never_share_an_engine(threaded_service):
+    service, images_dir, _, _, engines = threaded_service
+    service.run_inference("easyocr", images_dir, job_id="job-1")
+    by_thread = {}
+    for thread_name, engine_id in engines:
+        by_thread.setdefault(thread_name, set()).add(engine_id)
+    # Each OCR thread kept one engine, and no two threads used the same one
+    assert all(len(ids) == 1 for ids in by_thread.values())
+    all_ids = [next(iter(ids)) for ids in by_thread.values()]
+    assert len(all_ids) == len(set(all_ids))
+    # The shared instance on the service was never handed to a pipeline thread
+    assert service.easyocr_reader is None
+
+
+def test_threaded_stage_error_fails_the_job(threaded_service, monkeypatch):
+    service, images_dir, _, statuses, _ = threaded_service
+
+    def broken_lookup(*args, **kwargs):
+        raise RuntimeError("hashing crashed")
+
+    # _detect_image errors are per-image failures; an error in the memo lookup escapes the stage
+    monkeypatch.setattr(service, "_memo_lookup", broken_lookup)
+    with pytest.raises(RuntimeError, match="hashing crashed"):
+        service.run_inference("easyocr", images_dir, job_id="job-1")
+    assert statuses[-1][0] == "failed"
+
+
+def test_per_image_failures_do_not_stop_the_run(threaded_service, monkeypatch):
+    service, images_dir, stored, statuses, _ = threaded_service
+
+    def flaky_detect(detector, image_path, *args, **kwargs):
+        if image_path.name == "img03.jpg":
+            raise RuntimeError("roboflow 500")
+        return [], {"lot_number": image_path.name}
+
+    monkeypatch.setattr(service, "_detect_image", flaky_detect)
+    service.run_inference("easyocr", images_dir, job_id="job-1")
+    assert len(stored) == 12
+    assert statuses[-1] == ("completed", 12)
+
+
+def test_stage_threads_are_named_after_the_stage():
+    names = set()
+
+    def record(x):
+        names.add(threading.current_thread().name)
+        return x
+
+    list(StagedPipeline([Stage("ocr", record, workers=2)]).run(range(20)))
+    assert names and all(n.startswith("pipeline-ocr-") for n in names)
+
+
+def test_shard_stops_once_a_sibling_failed_the_job(threaded_service, monkeypatch):
+    service, images_dir, stored, statuses, _ = threaded_service
+    from inference_service import JobStopped
+
+    monkeypatch.setenv("SHARD_STATUS_CHECK_SECONDS", "0")
+    monkeypatch.setattr(service, "increment_processed_images", lambda *a, **k: None)
+    monkeypatch.setattr(service, "get_job_status", lambda job_id, **k: {"job_id": job_id, "status": "failed"})
+    with pytest.raises(JobStopped):
+        service.run_inference("easyocr", images_dir, job_id="job-1", shard_index=0, shard_count=2)
+    # Stopped after the first stored image, without overwriting the sibling's failure
+    assert len(stored) < 6
+    assert all(status != "failed" for status, _ in statuses)
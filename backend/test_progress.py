@@ -0,0 +1,178 @@
+"""
+Tests for throttled job progress (progress.py).
+
+Run with:
+    cd backend
+    python -m pytest test_progress.py
+"""
+import pytest
+
+import progress
+from progress import LiveProgress, ProgressReporter
+
+
+@pytest.fixture
+def published(monkeypatch):
+    """Live progress messages sent by reporters in this test."""
+    messages = []
+    monkeypatch.setattr(progress, "_publisher", messages.append)
+    return messages
+
+
+def _reporter(writes, **kwargs):
+    kwargs.setdefault("interval_s", 60.0)
+    kwargs.setdefault("every", 0)
+    return ProgressReporter("job-1", writes.append, **kwargs)
+
+
+def test_writes_wait_for_the_interval(published):
+    writes = []
+    reporter = _reporter(writes)
+    for _ in range(10):
+        reporter.advance()
+    assert writes == []
+    reporter.finish()
+    assert writes == [10]
+    assert reporter.db_writes == 1
+
+
+def test_every_n_images_writes_in_between(published):
+    writes = []
+    reporter = _reporter(writes, every=3)
+    for _ in range(10):
+        reporter.advance()
+    assert writes == [3, 6, 9]
+    reporter.finish()
+    assert writes == [3, 6, 9, 10]
+
+
+def test_due_interval_writes_on_the_next_image(published):
+    writes = []
+    reporter = _reporter(writes, interval_s=0.0)
+    reporter.advance()
+    reporter.advance(2)
+    assert writes == [1, 3]
+
+
+def test_finish_without_new_images_does_not_write(published):
+    writes = []
+    reporter = _reporter(writes, every=2)
+    reporter.advance(2)
+    reporter.finish()
+    reporter.finish()
+    assert writes == [2]
+
+
+def test_resumed_job_writes_absolute_counts_from_its_checkpoint(published):
+    writes = []
+    reporter = _reporter(writes, base=40)
+    reporter.advance(5)
+    reporter.finish()
+    assert writes == [45]
+    assert published[-1] == {"type": "progress", "job_id": "job-1", "processed": 45}
+
+
+def test_shard_writes_increments_and_publishes_unwritten(published):
+    writes = []
+    reporter = _reporter(writes, base=40, sharded=True, every=4)
+    for _ in range(10):
+        reporter.advance()
+    reporter.finish()
+    # Increments to the shared counter; the checkpoint base doesn't apply to shards
+    assert writes == [4, 4, 2]
+    assert published[-1] == {"type": "progress", "job_id": "job-1", "unwritten": 0}
+
+
+def test_deferred_writes_are_replaced_by_later_ones(published):
+    writes = []
+    pending = {}
+    reporter = _reporter(writes, every=2, defer=lambda key, fn: pending.__setitem__(key, fn))
+    for _ in range(6):
+        reporter.advance()
+    # Three writes were scheduled, but only the latest is still waiting for its flush
+    assert writes == []
+    assert list(pending) == [("progress", "job-1")]
+    pending.pop(("progress", "job-1"))()
+    assert writes == [6]
+    assert reporter.db_writes == 1
+
+
+def test_stale_deferred_write_is_skipped(published):
+    writes = []
+    callbacks = []
+    reporter = _reporter(writes, sharded=True, every=2, defer=lambda key, fn: callbacks.append(fn))
+    for _ in range(4):
+        reporter.advance()
+    # The writes run out of order: the one for 4 images covers the one for 2
+    callbacks[1]()
+    callbacks[0]()
+    assert writes == [4]
+
+
+def test_finish_quiet_logs_a_failed_write(published, capsys):
+    def failing_write(count):
+        raise ConnectionError("database went away")
+
+    reporter = ProgressReporter("job-1", failing_write, interval_s=60.0, every=0)
+    reporter.advance()
+    reporter.finish(quiet=True)
+    assert "database went away" in capsys.readouterr().out
+
+    reporter.advance()
+    with pytest.raises(ConnectionError):
+        reporter.finish()
+
+
+def test_env_knobs_set_the_throttle(published, monkeypatch):
+    monkeypatch.setenv("PROGRESS_DB_INTERVAL_SECONDS", "2.5")
+    monkeypatch.setenv("PROGRESS_DB_EVERY_IMAGES", "7")
+    reporter = ProgressReporter("job-1", lambda count: None)
+    assert reporter.interval_s == 2.5
+    assert reporter.every == 7
+
+
+def test_publish_failure_never_raises(monkeypatch, capsys):
+    def broken_pipe(msg):
+        raise BrokenPipeError("pipe closed")
+
+    monkeypatch.setattr(progress, "_publisher", broken_pipe)
+    progress.publish({"job_id": "job-1", "processed": 1})
+    assert "pipe closed" in capsys.readouterr().out
+
+
+# ---------------------------------------------------------------------------
+# LiveProgress (API process side)
+# ---------------------------------------------------------------------------
+
+def _running(processed, total=100):
+    return {"job_id": "job-1", "status": "running", "processed_images": processed, "total_images": total}
+
+
+def test_live_progress_overlays_the_database_count():
+    live = LiveProgress()
+    live.update({"job_id": "job-1", "processed": 30}, source=1)
+    status = live.apply(_running(20))
+    assert status["processed_images"] == 30
+    assert status["progress"] == 30.0
+
+
+def test_live_progress_adds_unwritten_shard_images():
+    live = LiveProgress()
+    live.update({"job_id": "job-1", "unwritten": 3}, source=1)
+    live.update({"job_id": "job-1", "unwritten": 4}, source=2)
+    assert live.processed("job-1", db_processed=50, total=100) == 57
+    # Never more than the job's total
+    assert live.processed("job-1", db_processed=98, total=100) == 100
+
+
+def test_live_progress_clear_and_non_running_jobs():
+    live = LiveProgress()
+    live.update({"job_id": "job-1", "processed": 30}, source=1)
+    live.update({"job_id": "job-1", "processed": 10}, source=2)
+    completed = dict(_running(100), status="completed")
+    assert live.apply(completed) is completed
+
+    live.clear("job-1", source=1)
+    assert live.processed("job-1", db_processed=0, total=100) == 10
+    live.clear("job-1")
+    assert live.processed("job-1", db_processed=5, total=100) == 5
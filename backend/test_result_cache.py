@@ -0,0 +1,170 @@
+"""
+Tests for cross-job result memoization (the result cache in inference_service.py).
+
+Run with:
+    cd backend
+    python -m pytest test_result_cache.py
+
+Apart from the env knob scan, needs the backend's dependencies (pixeltable,
+cv2, ...) importable and is skipped otherwise; no database or network is used.
+"""
+import re
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).parent
+
+# Env knobs that change an engine's per-image output: (engine, knob, value, other value, extra env)
+OUTPUT_KNOBS = [
+    ("smolvlm2", "SMOLVLM2_UPLOAD_FORMAT", "png", "jpeg", {}),
+    ("smolvlm2", "SMOLVLM2_UPLOAD_QUALITY", "80", "90", {"SMOLVLM2_UPLOAD_FORMAT": "jpeg"}),
+    ("smolvlm2", "SMOLVLM2_UPLOAD_MAX_DIMENSION", "0", "1024", {}),
+    ("smolvlm2", "SMOLVLM2_HTTP_CLIENT", "sdk", "pooled", {}),
+    ("easyocr", "OCR_BATCH", "0", "1", {}),
+    ("easyocr", "OCR_BATCH_IMAGES", "2", "4", {"OCR_BATCH": "1"}),
+    ("easyocr", "OCR_BATCH_SIZE", "8", "16", {"OCR_BATCH": "1"}),
+    ("paddleocr", "OCR_BATCH", "0", "1", {}),
+    ("easyocr_rec", "EASYOCR_REC_MAX_LINES", "2", "4", {}),
+    ("easyocr_rec", "OCR_BATCH_SIZE", "8", "16", {}),
+    ("paddleocr_rec", "PADDLE_REC_MODEL", "", "PP-OCRv5_server_rec", {}),
+    ("paddleocr_rec", "PADDLE_REC_TEXTLINE_ORIENTATION", "0", "1", {}),
+    ("paddleocr_rec", "EASYOCR_REC_MAX_LINES", "2", "4", {}),
+]
+
+# Env knobs read on the OCR/VLM path that don't change results: scheduling, limits,
+# retries, credentials, and the model identity (already in the key as model_id)
+NOT_OUTPUT_KNOBS = {
+    "DEFAULT_USE_GPU", "FORCE_CPU", "RESULT_CACHE", "LOG_RSS_EVERY_N_IMAGES",
+    "INFERENCE_PIPELINE", "PIPELINE_DETECT_WORKERS", "PIPELINE_OCR_WORKERS",
+    "PIPELINE_PREFETCH_WORKERS", "PIPELINE_QUEUE_SIZE", "DETECTION_LOOKAHEAD", "VLM_LOOKAHEAD",
+    "OCR_THREADS", "OCR_INTRA_OP_THREADS", "SHARD_STATUS_CHECK_SECONDS",
+    "MAX_IMAGE_SECONDS", "ROBOFLOW_TIMEOUT_SECONDS", "SMOLVLM_TIMEOUT_SECONDS",
+    "SMOLVLM2_MAX_IN_FLIGHT", "SMOLVLM2_MAX_RPS", "SMOLVLM2_MAX_RETRIES", "SMOLVLM2_RETRY_BASE_SECONDS",
+    "ROBOFLOW_API_KEY", "SMOLVLM2_API_URL", "SMOLVLM2_PROJECT", "SMOLVLM2_VERSION",
+}
+
+_ENV_READ = re.compile(r"""(?:environ\.get|getenv|_env_int|_env_float)\(\s*["']([A-Z0-9_]+)["']""")
+
+
+@pytest.fixture
+def service(monkeypatch):
+    inference_service = pytest.importorskip("inference_service")
+    monkeypatch.setattr(inference_service, "setup_all_tables", lambda: None)
+    for name in {knob for _, knob, _, _, _ in OUTPUT_KNOBS}:
+        monkeypatch.delenv(name, raising=False)
+    return inference_service.InferenceService(use_gpu=False)
+
+
+def test_every_env_knob_on_the_output_path_is_classified():
+    found = set()
+    for module in ("inference_service.py", "smolvlm2_engine.py", "preprocessing.py"):
+        found.update(_ENV_READ.findall((BACKEND_DIR / module).read_text()))
+    output = {knob for _, knob, _, _, _ in OUTPUT_KNOBS}
+    unclassified = found - output - NOT_OUTPUT_KNOBS
+    # A new knob must either go into _output_settings (and OUTPUT_KNOBS) or NOT_OUTPUT_KNOBS
+    assert not unclassified, f"classify these env knobs: {sorted(unclassified)}"
+
+
+@pytest.mark.parametrize("engine,knob,value,other,extra", OUTPUT_KNOBS)
+def test_output_knob_changes_the_result_key(service, monkeypatch, engine, knob, value, other, extra):
+    for name, extra_value in extra.items():
+        monkeypatch.setenv(name, extra_value)
+    monkeypatch.setenv(knob, value)
+    key = service._result_config_key(engine, "none", "model")
+    monkeypatch.setenv(knob, other)
+    assert service._result_config_key(engine, "none", "model") != key
+
+
+def test_scheduling_knobs_keep_the_result_key(service, monkeypatch):
+    key = service._result_config_key("easyocr", "none", "model")
+    monkeypatch.setenv("OCR_THREADS", "8")
+    monkeypatch.setenv("PIPELINE_OCR_WORKERS", "4")
+    monkeypatch.setenv("MAX_IMAGE_SECONDS", "5")
+    assert service._result_config_key("easyocr", "none", "model") == key
+
+
+# ---------------------------------------------------------------------------
+# Memo hit / miss / failed results
+# ---------------------------------------------------------------------------
+
+class _FakeDetector:
+    workspace = "ws"
+    project_name = "proj"
+    version = 1
+
+
+@pytest.fixture
+def memo_run(service, monkeypatch, tmp_path):
+    monkeypatch.setenv("INFERENCE_PIPELINE", "0")
+    monkeypatch.setenv("DETECTION_LOOKAHEAD", "0")
+    monkeypatch.setenv("RESULT_CACHE", "1")
+    monkeypatch.setenv("WRITE_BEHIND", "0")
+    monkeypatch.setenv("OCR_BATCH", "0")
+    monkeypatch.setenv("OCR_THREADS", "1")
+
+    images_dir = tmp_path / "version-1" / "images"
+    images_dir.mkdir(parents=True)
+    for n in range(4):
+        (images_dir / f"img{n}.jpg").write_bytes(f"image {n}".encode())
+
+    # The result_cache table, keyed like Pixeltable's: config_key -> image_sha256 -> result
+    table = {}
+    detected = []
+    broken = set()
+
+    def fake_detect(detector, image_path, *args, **kwargs):
+        detected.append(image_path.name)
+        if image_path.name in broken:
+            raise RuntimeError("roboflow 500")
+        return [], {"lot_number": image_path.name}
+
+    def store_cached_result(config_key, image_sha256, engine, preprocessing, model_id, detections,
+                            predictions, processing_time_ms):
+        table.setdefault(config_key, {})[image_sha256] = (detections, predictions, processing_time_ms)
+
+    monkeypatch.setattr(service, "_init_detector", lambda: _FakeDetector())
+    monkeypatch.setattr(service, "_detect_image", fake_detect)
+    monkeypatch.setattr(service, "_ocr_crops", lambda crops, *a, **k: {})
+    monkeypatch.setattr(service, "load_result_cache", lambda config_key: dict(table.get(config_key, {})))
+    monkeypatch.setattr(service, "store_cached_result", store_cached_result)
+    monkeypatch.setattr(service, "_store_image_outputs", lambda *a, **k: None)
+    monkeypatch.setattr(service, "save_summary_state", lambda *a, **k: None)
+    monkeypatch.setattr(service, "_complete_summary", lambda *a, **k: None)
+    monkeypatch.setattr(service, "record_stage_timeouts", lambda *a, **k: None)
+    monkeypatch.setattr(service, "update_job_status", lambda *a, **k: None)
+
+    def run(job_id):
+        detected.clear()
+        service.run_inference("easyocr", images_dir, job_id=job_id)
+        return sorted(detected)
+
+    return run, table, broken
+
+
+def test_first_run_misses_and_memoizes_every_image(memo_run):
+    run, table, _ = memo_run
+    assert run("job-1") == ["img0.jpg", "img1.jpg", "img2.jpg", "img3.jpg"]
+    (entries,) = table.values()
+    assert len(entries) == 4
+
+
+def test_second_run_hits_the_memo(memo_run):
+    run, _, _ = memo_run
+    run("job-1")
+    assert run("job-2") == []
+
+
+def test_failed_image_is_not_memoized(memo_run):
+    run, table, broken = memo_run
+    broken.add("img2.jpg")
+    run("job-1")
+    (entries,) = table.values()
+    assert len(entries) == 3
+
+    # The failed image is processed again; the others come from the memo
+    broken.clear()
+    assert run("job-2") == ["img2.jpg"]
+    (entries,) = table.values()
+    assert len(entries) == 4
+
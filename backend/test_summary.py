@@ -0,0 +1,205 @@
+"""
+Tests for streaming job summaries (summary.py) and the shard merge in finalize_job.
+
+Run with:
+    cd backend
+    python -m pytest test_summary.py
+
+The finalize_job tests need the backend's dependencies (pixeltable, pandas, ...)
+importable and are skipped otherwise; no database is used.
+"""
+import pytest
+
+from summary import SummaryAccumulator
+
+
+def _row(field_name, exact, normalized, cer, image="a.jpg"):
+    return {
+        "image_filename": image,
+        "field_name": field_name,
+        "exact_match": exact,
+        "normalized_match": normalized,
+        "character_error_rate": cer,
+    }
+
+
+IMAGES = {
+    "a.jpg": [_row("lot", True, True, 0.0, "a.jpg"), _row("expiry", False, True, 0.25, "a.jpg")],
+    "b.jpg": [_row("lot", False, False, 0.5, "b.jpg"), _row("expiry", True, True, 0.0, "b.jpg")],
+    "c.jpg": [_row("lot", True, True, 0.0, "c.jpg")],
+    "d.jpg": [_row("lot", False, True, 0.1, "d.jpg"), _row("gtin", False, False, 1.0, "d.jpg")],
+}
+
+
+def _assert_same_summary(actual, expected):
+    """Summaries match up to float rounding (sums are added in a different order)."""
+    assert actual.keys() == expected.keys()
+    assert actual["per_field_stats"].keys() == expected["per_field_stats"].keys()
+    for field_name, stats in expected["per_field_stats"].items():
+        assert actual["per_field_stats"][field_name] == pytest.approx(stats)
+    for key in expected.keys() - {"per_field_stats"}:
+        assert actual[key] == pytest.approx(expected[key])
+
+
+def _accumulate(names):
+    acc = SummaryAccumulator()
+    for name in names:
+        acc.add_image(IMAGES[name])
+    return acc
+
+
+def test_summary_rates():
+    summary = _accumulate(["a.jpg", "b.jpg"]).summary()
+    assert summary["total_images"] == 2
+    assert summary["overall_exact_match_rate"] == pytest.approx(2 / 4)
+    assert summary["overall_normalized_match_rate"] == pytest.approx(3 / 4)
+    assert summary["overall_cer"] == pytest.approx(0.75 / 4)
+    assert summary["per_field_stats"]["expiry"] == {
+        "exact_match_rate": 0.5,
+        "normalized_match_rate": 1.0,
+        "average_cer": pytest.approx(0.125),
+        "sample_count": 2,
+    }
+
+
+def test_images_without_ground_truth_add_nothing():
+    acc = SummaryAccumulator()
+    acc.add_image([])
+    assert acc.images == 0
+    assert acc.summary() is None
+
+
+def test_merged_shards_match_one_accumulator_over_all_images():
+    shard0 = _accumulate(["a.jpg", "c.jpg"])
+    shard1 = _accumulate(["b.jpg", "d.jpg"])
+    merged = SummaryAccumulator()
+    merged.merge(shard0)
+    merged.merge(shard1)
+    _assert_same_summary(merged.summary(), _accumulate(IMAGES).summary())
+
+
+def test_state_round_trips_through_json():
+    acc = _accumulate(IMAGES)
+    restored = SummaryAccumulator.from_json(acc.to_json())
+    assert restored.images == acc.images
+    assert restored.summary() == acc.summary()
+    assert SummaryAccumulator.from_json("").summary() is None
+
+
+def test_from_frame_matches_add_image():
+    pd = pytest.importorskip("pandas")
+    df = pd.DataFrame([row for rows in IMAGES.values() for row in rows])
+    _assert_same_summary(SummaryAccumulator.from_frame(df).summary(), _accumulate(IMAGES).summary())
+
+
+# ---------------------------------------------------------------------------
+# finalize_job: merging the shards' summary_partials rows
+# ---------------------------------------------------------------------------
+
+class _Where:
+    def __init__(self, test):
+        self.test = test
+
+    def __and__(self, other):
+        return _Where(lambda row: self.test(row) and other.test(row))
+
+
+class _Column:
+    def __init__(self, name):
+        self.name = name
+
+    def __eq__(self, value):
+        return _Where(lambda row: row[self.name] == value)
+
+    def __lt__(self, value):
+        return _Where(lambda row: row[self.name] < value)
+
+
+class _PartialsTable:
+    job_id = _Column("job_id")
+    shard_index = _Column("shard_index")
+
+    def __init__(self, rows):
+        self.rows = rows
+
+
+@pytest.fixture
+def finalize(monkeypatch):
+    inference_service = pytest.importorskip("inference_service")
+    pd = pytest.importorskip("pandas")
+    monkeypatch.setattr(inference_service, "setup_all_tables", lambda: None)
+    service = inference_service.InferenceService(use_gpu=False)
+
+    table = _PartialsTable([])
+
+    class _Result:
+        def __init__(self, rows):
+            self.rows = rows
+
+        def __len__(self):
+            return len(self.rows)
+
+        def to_pandas(self):
+            return pd.DataFrame(self.rows)
+
+    monkeypatch.setattr(inference_service, "get_summary_partials_table", lambda: table)
+    monkeypatch.setattr(
+        inference_service, "table_query", lambda t, where: _Result([r for r in t.rows if where.test(r)])
+    )
+
+    stored = {}
+    statuses = []
+    monkeypatch.setattr(
+        service, "calculate_and_store_summary",
+        lambda job_id, engine, version, name, summary: stored.update({job_id: summary}),
+    )
+    monkeypatch.setattr(
+        service, "clear_summary_state",
+        lambda job_id: table.rows.__setitem__(slice(None), [r for r in table.rows if r["job_id"] != job_id]),
+    )
+    monkeypatch.setattr(service, "get_job_status", lambda job_id, **k: {"job_id": job_id, "total_images": 4})
+    monkeypatch.setattr(
+        service, "update_job_status", lambda job_id, status, **k: statuses.append((status, k.get("processed_images")))
+    )
+
+    def add_partial(job_id, shard_index, names):
+        table.rows.append({
+            "job_id": job_id, "shard_index": shard_index, "state_json": _accumulate(names).to_json(),
+        })
+
+    return service, add_partial, stored, statuses, table
+
+
+def test_finalize_job_merges_every_shard(finalize):
+    service, add_partial, stored, statuses, table = finalize
+    add_partial("job-1", 0, ["a.jpg", "c.jpg"])
+    add_partial("job-1", 1, ["b.jpg", "d.jpg"])
+    add_partial("job-2", 0, ["a.jpg"])
+
+    service.finalize_job("job-1", "easyocr", "version-1", shard_count=2)
+
+    _assert_same_summary(stored["job-1"].summary(), _accumulate(IMAGES).summary())
+    assert statuses == [("completed", 4)]
+    # The job's partial states are dropped; other jobs' rows stay
+    assert [row["job_id"] for row in table.rows] == ["job-2"]
+
+
+def test_finalize_job_ignores_shards_of_an_earlier_run(finalize):
+    service, add_partial, stored, _, _ = finalize
+    # An earlier run with three shards left shard 2's row behind
+    add_partial("job-1", 0, ["a.jpg", "c.jpg"])
+    add_partial("job-1", 1, ["b.jpg", "d.jpg"])
+    add_partial("job-1", 2, ["a.jpg", "b.jpg", "c.jpg"])
+
+    service.finalize_job("job-1", "easyocr", "version-1", shard_count=2)
+
+    assert stored["job-1"].images == 4
+    _assert_same_summary(stored["job-1"].summary(), _accumulate(IMAGES).summary())
+
+
+def test_finalize_job_without_partials_falls_back_to_a_rescan(finalize):
+    service, _, stored, statuses, _ = finalize
+    service.finalize_job("job-1", "easyocr", "version-1", shard_count=2)
+    # None tells calculate_and_store_summary to scan benchmark_results
+    assert stored["job-1"] is None
+    assert statuses == [("completed", 4)]
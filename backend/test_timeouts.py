@@ -0,0 +1,99 @@
+"""
+Tests for the thread-compatible time limits (timeouts.py).
+
+Run with:
+    cd backend
+    python -m pytest test_timeouts.py
+"""
+import threading
+import time
+from concurrent.futures import Future
+
+import pytest
+
+from timeouts import StageTimeout, check_cancelled, time_limit, wait_future
+
+
+def _in_thread(fn):
+    """Run fn() on a worker thread (no SIGALRM there) and return its result or raise its error."""
+    out = {}
+
+    def run():
+        try:
+            out["result"] = fn()
+        except BaseException as e:
+            out["error"] = e
+
+    t = threading.Thread(target=run)
+    t.start()
+    t.join()
+    if "error" in out:
+        raise out["error"]
+    return out["result"]
+
+
+def test_block_within_limit_has_no_overrun():
+    def work():
+        with time_limit(1.0, "ocr", "fast") as deadline:
+            value = 42
+        return value, deadline.overruns
+
+    assert _in_thread(work) == (42, [])
+
+
+def test_late_finish_off_main_thread_keeps_result_and_records_overrun():
+    def work():
+        with time_limit(0.05, "ocr", "slow") as deadline:
+            time.sleep(0.1)
+            value = "text"
+        return value, deadline.overruns
+
+    assert _in_thread(work) == ("text", ["ocr"])
+
+
+def test_nested_overrun_is_reported_once_to_the_parent():
+    def work():
+        with time_limit(0.05, "detect", "image") as outer:
+            with time_limit(5.0, "roboflow_detect", "request"):
+                time.sleep(0.1)
+        return outer.overruns
+
+    # The inner limit is capped by the outer one, so it is the one that ran late
+    assert _in_thread(work) == ["roboflow_detect"]
+
+
+def test_check_cancelled_raises_after_the_deadline():
+    def work():
+        with time_limit(0.05, "ocr", "crops"):
+            time.sleep(0.1)
+            check_cancelled()
+
+    with pytest.raises(StageTimeout) as info:
+        _in_thread(work)
+    assert info.value.stage == "ocr"
+
+
+def test_main_thread_block_is_interrupted():
+    assert threading.current_thread() is threading.main_thread()
+    start = time.monotonic()
+    with pytest.raises(StageTimeout):
+        with time_limit(0.05, "ocr", "hung"):
+            time.sleep(2)
+    assert time.monotonic() - start < 1
+
+
+def test_wait_future_stops_waiting_and_cancels():
+    future: Future = Future()
+
+    def work():
+        return wait_future(future, 0.05, "roboflow_detect", "request")
+
+    with pytest.raises(StageTimeout) as info:
+        _in_thread(work)
+    assert info.value.stage == "roboflow_detect"
+    assert future.cancelled()
+
+
+def test_no_limit_without_parent_yields_none():
+    with time_limit(None, "ocr", "unbounded") as deadline:
+        assert deadline is None
@@ -0,0 +1,121 @@
+"""
+Tests for the warm worker pool's respawn backoff (worker_pool.py).
+
+Run with:
+    cd backend
+    python -m pytest test_worker_pool.py
+
+No processes are spawned: WorkerPool._spawn is replaced with fake workers.
+"""
+import asyncio
+import signal
+
+import pytest
+
+from worker_pool import PoolWorker, WorkerPool, WorkerPoolError
+
+
+class _FakeProcess:
+    _next_pid = 1000
+
+    def __init__(self):
+        _FakeProcess._next_pid += 1
+        self.pid = _FakeProcess._next_pid
+        self.exitcode = None
+        self.sentinel = -1
+
+    def is_alive(self):
+        return self.exitcode is None
+
+    def join(self, timeout=None):
+        pass
+
+
+class _FakeConn:
+    def poll(self):
+        return False
+
+    def close(self):
+        pass
+
+    def fileno(self):
+        return -1
+
+    def send(self, msg):
+        pass
+
+
+def _pool(monkeypatch, **kwargs):
+    pool = WorkerPool(max_workers=2, standby=1, respawn_backoff_s=0.01, **kwargs)
+    spawned = []
+
+    def fake_spawn():
+        worker = PoolWorker(process=_FakeProcess(), conn=_FakeConn())
+        pool.workers[worker.pid] = worker
+        spawned.append(worker)
+        return worker
+
+    monkeypatch.setattr(pool, "_spawn", fake_spawn)
+    monkeypatch.setattr(pool, "_detach", lambda worker: None)
+    return pool, spawned
+
+
+def _crash(pool, worker, exitcode=1):
+    worker.process.exitcode = exitcode
+    pool._on_exit(worker)
+
+
+def test_warmup_failures_back_off_then_stop(monkeypatch):
+    async def scenario():
+        pool, spawned = _pool(monkeypatch, max_warmup_failures=3)
+        pool.ensure_standby()
+        assert len(spawned) == 1
+
+        _crash(pool, spawned[-1])
+        # No immediate respawn: a retry is scheduled instead
+        assert len(spawned) == 1
+        assert pool._respawn_timer is not None
+        await asyncio.sleep(0.05)
+        assert len(spawned) == 2
+
+        _crash(pool, spawned[-1])
+        assert pool._respawn_delay() == pytest.approx(0.02)
+        await asyncio.sleep(0.1)
+        assert len(spawned) == 3
+
+        _crash(pool, spawned[-1])
+        assert pool.failed_reason is not None
+        await asyncio.sleep(0.1)
+        assert len(spawned) == 3
+        with pytest.raises(WorkerPoolError):
+            pool.submit({"type": "single", "job_id": "job-1"}, "easyocr")
+
+    asyncio.run(scenario())
+
+
+def test_ready_worker_resets_the_failure_count(monkeypatch):
+    async def scenario():
+        pool, spawned = _pool(monkeypatch)
+        pool.ensure_standby()
+        _crash(pool, spawned[-1])
+        await asyncio.sleep(0.05)
+        pool._handle_message(spawned[-1], {"type": "ready"})
+        assert pool.warmup_failures == 0
+
+        # A warm worker dying later is respawned right away
+        _crash(pool, spawned[-1])
+        assert pool.warmup_failures == 0
+        assert len(spawned) == 3
+
+    asyncio.run(scenario())
+
+
+def test_terminated_warming_worker_is_not_a_failure(monkeypatch):
+    async def scenario():
+        pool, spawned = _pool(monkeypatch)
+        pool.ensure_standby()
+        _crash(pool, spawned[-1], exitcode=-signal.SIGTERM)
+        assert pool.warmup_failures == 0
+        assert len(spawned) == 2
+
+    asyncio.run(scenario())
@@ -0,0 +1,131 @@
+"""
+Tests for write-behind persistence (write_behind.py).
+
+Run with:
+    cd backend
+    python -m pytest test_write_behind.py
+
+Pixeltable inserts are replaced with an in-memory log; skipped when
+pixeltable_schema can't be imported.
+"""
+import threading
+
+import pytest
+
+write_behind = pytest.importorskip("write_behind")
+
+_ORDER = ["benchmark_results", "image_results", "stage_timeouts"]
+
+
+@pytest.fixture
+def inserts(monkeypatch):
+    """(table, rows) for every insert, in the order they reached the database."""
+    log = []
+    monkeypatch.setattr(write_behind, "get_table", lambda name: name)
+    monkeypatch.setattr(write_behind, "table_insert", lambda table, rows: log.append((table, list(rows))))
+    return log
+
+
+def _writer(**kwargs):
+    kwargs.setdefault("flush_rows", 1000)
+    kwargs.setdefault("flush_interval_s", 60.0)
+    return write_behind.WriteBehindWriter("test", table_order=_ORDER, **kwargs)
+
+
+def test_benchmark_rows_flush_before_the_image_row(inserts):
+    writer = _writer()
+    # Queued in the "wrong" order: the image row (the checkpoint) first
+    writer.insert("image_results", [{"image": "a.jpg"}])
+    writer.insert("stage_timeouts", [{"stage": "ocr"}])
+    writer.insert("benchmark_results", [{"field": "lot"}, {"field": "expiry"}])
+    writer.close()
+    assert [table for table, _ in inserts] == ["benchmark_results", "image_results", "stage_timeouts"]
+    assert inserts[0][1] == [{"field": "lot"}, {"field": "expiry"}]
+    assert writer.rows_written == 4
+
+
+def test_after_flush_runs_after_the_rows_and_coalesces(inserts):
+    writer = _writer()
+    seen = []
+    writer.insert("image_results", [{"image": "a.jpg"}])
+    writer.after_flush("progress", lambda: seen.append(("progress", 1, len(inserts))))
+    writer.after_flush("progress", lambda: seen.append(("progress", 2, len(inserts))))
+    writer.flush()
+    # Only the latest callback for a key runs, once the rows it covers are stored
+    assert seen == [("progress", 2, 1)]
+    writer.close()
+
+
+def test_flush_rows_triggers_a_background_flush(inserts):
+    writer = _writer(flush_rows=2)
+    flushed = threading.Event()
+    writer.insert("image_results", [{"image": "a.jpg"}, {"image": "b.jpg"}])
+    writer.after_flush("done", flushed.set)
+    writer.insert("image_results", [{"image": "c.jpg"}, {"image": "d.jpg"}])
+    assert flushed.wait(5)
+    writer.close()
+    assert sum(len(rows) for _, rows in inserts) == 4
+
+
+def _failing_insert(monkeypatch, fail_on="image_results"):
+    log = []
+
+    def table_insert(table, rows):
+        if table == fail_on:
+            raise ConnectionError("database went away")
+        log.append((table, list(rows)))
+
+    monkeypatch.setattr(write_behind, "get_table", lambda name: name)
+    monkeypatch.setattr(write_behind, "table_insert", table_insert)
+    return log
+
+
+def test_write_error_is_raised_by_the_next_insert(monkeypatch):
+    _failing_insert(monkeypatch)
+    writer = _writer()
+    writer.insert("image_results", [{"image": "a.jpg"}])
+    with pytest.raises(RuntimeError, match="database went away"):
+        writer.flush()
+    with pytest.raises(RuntimeError, match="database went away") as info:
+        writer.insert("image_results", [{"image": "b.jpg"}])
+    assert isinstance(info.value.__cause__, ConnectionError)
+    with pytest.raises(RuntimeError):
+        writer.after_flush("progress", lambda: None)
+
+
+def test_write_error_is_raised_by_close(monkeypatch):
+    _failing_insert(monkeypatch)
+    writer = _writer()
+    writer.insert("image_results", [{"image": "a.jpg"}])
+    with pytest.raises(RuntimeError, match="Write-behind flush failed"):
+        writer.close()
+    assert not writer._thread.is_alive()
+
+
+def test_blocked_producer_is_released_by_a_write_error(monkeypatch):
+    _failing_insert(monkeypatch)
+    writer = _writer(flush_rows=1, max_pending_rows=1)
+    errors = []
+
+    def produce():
+        try:
+            for n in range(100):
+                writer.insert("image_results", [{"image": f"{n}.jpg"}])
+        except RuntimeError as e:
+            errors.append(e)
+
+    producer = threading.Thread(target=produce)
+    producer.start()
+    producer.join(5)
+    assert not producer.is_alive()
+    assert errors
+
+
+def test_best_effort_writer_drops_the_failed_batch_and_continues(monkeypatch):
+    log = _failing_insert(monkeypatch, fail_on="result_cache")
+    writer = _writer(best_effort=True)
+    writer.insert("result_cache", [{"image_sha256": "x"}])
+    writer.flush()
+    writer.insert("image_results", [{"image": "a.jpg"}])
+    writer.close()
+    assert log == [("image_results", [{"image": "a.jpg"}])]
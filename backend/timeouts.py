@@ -0,0 +1,287 @@
+"""
+Thread-Compatible Timeouts for Box Label OCR
+
+SIGALRM only fires on the main thread, so a signal-based time limit silently
+does nothing inside pipeline stages, crop-OCR threads or asyncio tasks. This
+module replaces it with deadlines that work everywhere:
+
+- time_limit() opens a Deadline for a block of work. The deadline lives in a
+  ContextVar, so it follows the code into nested calls and asyncio tasks, and
+  nested limits never outlive the enclosing one.
+- On the main thread the block is still interrupted preemptively by SIGALRM.
+  Elsewhere it is cancelled cooperatively: check_cancelled() raises once the
+  deadline has passed, but a call that never reaches a check (a hung OCR call)
+  is not interrupted. A block that finishes late keeps its result; the overrun
+  is recorded on the deadline (Deadline.overruns) for the caller to report.
+- call_with_timeout() runs a blocking call (Roboflow, SmolVLM2) on a helper
+  thread and stops waiting for it at the deadline, from any thread.
+- A watchdog thread fires each deadline's cancel callbacks (e.g. cancelling a
+  queued future) when it expires and logs calls that overrun badly.
+
+Every timeout is a StageTimeout (a TimeoutError) carrying the stage name, so
+callers can count timeouts per stage.
+"""
+
+import contextlib
+import contextvars
+import heapq
+import itertools
+import os
+import signal
+import threading
+import time
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+from typing import Any, Callable, Iterator, List, Optional
+
+_current: "contextvars.ContextVar[Optional[Deadline]]" = contextvars.ContextVar("deadline", default=None)
+
+
+class StageTimeout(TimeoutError):
+    """A time limit expired; `stage` names the limit that fired."""
+
+    def __init__(self, stage: str, message: str):
+        super().__init__(message)
+        self.stage = stage
+
+
+class Deadline:
+    """A point in time (monotonic) after which the work it guards should stop."""
+
+    def __init__(self, seconds: float, stage: str, label: str):
+        self.stage = stage
+        self.label = label
+        self.seconds = float(seconds)
+        self.expires_at = time.monotonic() + self.seconds
+        self._cancelled = threading.Event()
+        self._callbacks: List[Callable[[], Any]] = []
+        self._lock = threading.Lock()
+        # Set when the guarded block exits; the watchdog then ignores this deadline
+        self.closed = False
+        # Stages that finished past their limit inside this block (this one or nested ones)
+        self.overruns: List[str] = []
+        self._overrun_check = False
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set() or time.monotonic() >= self.expires_at
+
+    def cancel(self) -> None:
+        """Mark the deadline cancelled and run its callbacks (once)."""
+        with self._lock:
+            if self._cancelled.is_set():
+                return
+            self._cancelled.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"[TIMEOUT] Cancel callback for {self.label} failed: {type(e).__name__}: {e}")
+
+    def on_cancel(self, callback: Callable[[], Any]) -> None:
+        """Run callback when the deadline is cancelled or expires (immediately if it already has)."""
+        with self._lock:
+            if not self._cancelled.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def check(self) -> None:
+        if self.cancelled:
+            raise self.error()
+
+    def error(self) -> StageTimeout:
+        return StageTimeout(self.stage, f"timeout: {self.label} ({self.seconds:.1f}s)")
+
+
+class _Watchdog:
+    """One daemon thread that cancels deadlines as they expire."""
+
+    def __init__(self):
+        self._heap: List[Any] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        # Log a deadline still open this long after it expired (a call that ignores cancellation)
+        self.overrun_log_s = float(os.environ.get("WATCHDOG_OVERRUN_LOG_SECONDS", "30"))
+
+    def watch(self, deadline: Deadline) -> None:
+        with self._cond:
+            heapq.heappush(self._heap, (deadline.expires_at, next(self._seq), deadline))
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="timeout-watchdog", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._heap:
+                    self._cond.wait()
+                expires_at, _, deadline = self._heap[0]
+                wait_s = expires_at - time.monotonic()
+                if wait_s > 0:
+                    self._cond.wait(timeout=wait_s)
+                    continue
+                heapq.heappop(self._heap)
+            if deadline.closed:
+                continue
+            if not deadline._cancelled.is_set():
+                deadline.cancel()
+                # Re-check later so a call that never returns shows up in the logs
+                if self.overrun_log_s > 0:
+                    deadline._overrun_check = True
+                    with self._cond:
+                        heapq.heappush(self._heap, (time.monotonic() + self.overrun_log_s, next(self._seq), deadline))
+            elif deadline._overrun_check:
+                deadline._overrun_check = False
+                print(f"[WATCHDOG] {deadline.label} still running {self.overrun_log_s:.0f}s after its deadline")
+
+
+_WATCHDOG = _Watchdog()
+
+
+def current_deadline() -> Optional[Deadline]:
+    """The innermost active deadline for this thread / asyncio task, if any."""
+    return _current.get()
+
+
+def check_cancelled() -> None:
+    """Cooperative cancellation point: raise StageTimeout if the active deadline has passed."""
+    deadline = _current.get()
+    if deadline is not None:
+        deadline.check()
+
+
+@contextlib.contextmanager
+def _alarm(deadline: Deadline) -> Iterator[None]:
+    """Preemptive SIGALRM interrupt for the main thread (restores any outer timer)."""
+    start = time.monotonic()
+    old_handler = signal.getsignal(signal.SIGALRM)
+    old_timer = signal.getitimer(signal.ITIMER_REAL)
+
+    def _handler(signum, frame):
+        raise deadline.error()
+
+    signal.signal(signal.SIGALRM, _handler)
+    signal.setitimer(signal.ITIMER_REAL, max(0.001, deadline.remaining()))
+    try:
+        yield
+    finally:
+        # Cancel our timer and restore previous handler/timer (supports nesting).
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, old_handler)
+
+        old_remaining, old_interval = old_timer
+        if old_remaining and old_remaining > 0:
+            elapsed = time.monotonic() - start
+            remaining = max(0.0, float(old_remaining) - elapsed)
+            if remaining > 0:
+                signal.setitimer(signal.ITIMER_REAL, remaining, float(old_interval))
+
+
+@contextlib.contextmanager
+def time_limit(seconds: Optional[float], stage: str, label: str) -> Iterator[Optional[Deadline]]:
+    """
+    Time-box a block of work.
+
+    On the main thread the block is interrupted with StageTimeout(stage) at the
+    limit; elsewhere only check_cancelled(), wait_future() and call_with_timeout()
+    raise it (see module docstring). A block that completes after the limit is not
+    failed: its stage is appended to the yielded deadline's overruns (and to the
+    enclosing deadline's). A None or non-positive limit still inherits the
+    enclosing deadline, if there is one.
+    """
+    parent = _current.get()
+    if seconds is None or seconds <= 0:
+        if parent is None:
+            yield None
+            return
+        seconds = parent.remaining()
+    elif parent is not None:
+        seconds = min(float(seconds), parent.remaining())
+
+    deadline = Deadline(seconds, stage, label)
+    if parent is not None:
+        parent.on_cancel(deadline.cancel)
+    token = _current.set(deadline)
+    _WATCHDOG.watch(deadline)
+    use_alarm = hasattr(signal, "SIGALRM") and threading.current_thread() is threading.main_thread()
+    try:
+        if use_alarm:
+            with _alarm(deadline):
+                yield deadline
+        else:
+            yield deadline
+    finally:
+        deadline.closed = True
+        _current.reset(token)
+
+    # Off the main thread nothing interrupts the block. Its result is already paid for, so
+    # a late finish is kept and reported as an overrun (once, by the innermost late block).
+    late_s = time.monotonic() - deadline.expires_at
+    if late_s >= 0 and not deadline.overruns:
+        deadline.overruns.append(stage)
+        print(f"[TIMEOUT] {label} finished {late_s:.1f}s past its {deadline.seconds:.1f}s limit; result kept")
+    if parent is not None and deadline.overruns:
+        parent.overruns.extend(deadline.overruns)
+
+
+_CALL_POOL: Optional[ThreadPoolExecutor] = None
+_CALL_POOL_LOCK = threading.Lock()
+
+
+def _call_pool() -> ThreadPoolExecutor:
+    global _CALL_POOL
+    with _CALL_POOL_LOCK:
+        if _CALL_POOL is None:
+            workers = max(1, int(os.environ.get("TIMEOUT_CALL_WORKERS", "8") or 8))
+            _CALL_POOL = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="timed-call")
+        return _CALL_POOL
+
+
+def wait_future(future: Future, seconds: Optional[float], stage: str, label: str) -> Any:
+    """Wait for a future within the limit (and the enclosing deadline); cancel it on timeout."""
+    with time_limit(seconds, stage, label) as deadline:
+        if deadline is None:
+            return future.result()
+        deadline.on_cancel(future.cancel)
+        try:
+            return future.result(timeout=deadline.remaining())
+        except FuturesTimeoutError:
+            future.cancel()
+            raise deadline.error()
+        except CancelledError:
+            # The watchdog cancels the future at the deadline, possibly before result() times out
+            if not deadline.cancelled:
+                raise
+            raise deadline.error()
+
+
+def call_with_timeout(fn: Callable[..., Any], seconds: Optional[float], stage: str, label: str, *args, **kwargs) -> Any:
+    """
+    Run a blocking fn(*args, **kwargs) with a time limit, from any thread.
+
+    fn runs on a helper thread with the deadline active, so it can call
+    check_cancelled(); on timeout the caller gets StageTimeout right away while
+    fn is left to finish (and its result dropped).
+    """
+    with time_limit(seconds, stage, label) as deadline:
+        if deadline is None:
+            return fn(*args, **kwargs)
+        ctx = contextvars.copy_context()
+        future = _call_pool().submit(ctx.run, fn, *args, **kwargs)
+        deadline.on_cancel(future.cancel)
+        try:
+            return future.result(timeout=deadline.remaining())
+        except FuturesTimeoutError:
+            future.cancel()
+            raise deadline.error()
+        except CancelledError:
+            # The watchdog cancels the future at the deadline, possibly before result() times out
+            if not deadline.cancelled:
+                raise
+            raise deadline.error()
@@ -0,0 +1,586 @@
+"""
+Warm Worker Pool for Box Label OCR Inference
+
+Long-lived spawn workers that keep their OCR engines, Roboflow detector and
+Pixeltable connection loaded between jobs:
+- The parent (FastAPI event loop) hands job descriptors to idle workers over a Pipe
+- Workers report "ready" once warm and "done" after each descriptor
+- A standby worker is kept warm so the next job doesn't pay model load time
+- Worker exits are detected through process sentinels registered with the
+  event loop (no polling), and reported once per process with all its job ids
+- Workers that die before reporting ready are respawned with exponential
+  backoff; after too many failures in a row the pool stops respawning and
+  reports why (failed_reason)
+
+Each worker still runs in its own process with its own Pixeltable connection,
+avoiding SQLAlchemy thread-local connection issues.
+"""
+import os
+import sys
+import asyncio
+import multiprocessing
+import signal
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from progress import LIVE_PROGRESS, set_publisher
+
+
+# ============================================================================
+# Worker side (runs inside the spawned process)
+# ============================================================================
+
+def bootstrap_worker_environment() -> None:
+    """Set up sys.path and env vars in a freshly spawned worker process."""
+    import importlib
+    from dotenv import load_dotenv
+
+    # Add paths for imports
+    backend_dir = Path(__file__).parent
+    project_root = backend_dir.parent
+    sys.path.insert(0, str(project_root))
+    sys.path.insert(0, str(backend_dir))
+
+    # Load environment variables BEFORE importing anything that uses config.py
+    # Try .env.local first (Next.js convention), then OCR_scripts/.env
+    env_file = project_root / ".env.local"
+    if env_file.exists():
+        load_dotenv(env_file, override=True)
+        print(f"Loaded environment from {env_file}")
+
+    ocr_env = project_root / "OCR_scripts" / ".env"
+    if ocr_env.exists():
+        load_dotenv(ocr_env, override=True)
+        print(f"Loaded environment from {ocr_env}")
+
+    roboflow_key = os.environ.get("ROBOFLOW_API_KEY", "")
+    if roboflow_key:
+        print(f"ROBOFLOW_API_KEY loaded: {roboflow_key[:8]}...")
+    else:
+        print("WARNING: ROBOFLOW_API_KEY not found in environment")
+
+    # Force reload of config module to pick up the new env vars
+    # This is necessary because config.py reads env vars at import time
+    if "config" in sys.modules:
+        importlib.reload(sys.modules["config"])
+
+
+def run_single_job(service, descriptor: dict) -> None:
+    """Run one inference job (or one shard of it) with an already-initialized InferenceService."""
+    job_id = descriptor["job_id"]
+    ground_truth_csv = descriptor.get("ground_truth_csv")
+    shard_index = int(descriptor.get("shard_index", 0) or 0)
+    shard_count = int(descriptor.get("shard_count", 1) or 1)
+
+    from inference_service import JobStopped
+
+    try:
+        if shard_count > 1:
+            # A sibling shard may already have failed (or the job was cancelled)
+            status = service.get_job_status(job_id)
+            if not status or status.get("status") in ("completed", "failed", "cancelled"):
+                return
+
+        # Update job to running
+        service.update_job_status(job_id, "running")
+
+        service.run_inference(
+            job_id=job_id,
+            engine=descriptor["engine"],
+            images_dir=Path(descriptor["images_dir"]),
+            ground_truth_csv=Path(ground_truth_csv) if ground_truth_csv else None,
+            preprocessing=descriptor.get("preprocessing", "none") or "none",
+            use_gpu=bool(descriptor.get("use_gpu", True)),
+            shard_index=shard_index,
+            shard_count=shard_count,
+            resume=bool(descriptor.get("resume", False)),
+        )
+
+        if shard_count > 1:
+            print(f"Inference job {job_id} shard {shard_index + 1}/{shard_count} finished")
+        else:
+            print(f"Inference job {job_id} completed successfully")
+
+    except JobStopped:
+        # A sibling shard failed (or the job was cancelled) and already set the job's status
+        pass
+
+    except Exception as e:
+        import traceback
+        tb = traceback.format_exc()
+        error_msg = f"{type(e).__name__}: {str(e)}\n\nTraceback:\n{tb}"
+        print(f"[PROCESS ERROR] Background inference failed:\n{error_msg}")
+
+        try:
+            # Truncate to 2000 chars for DB field limit
+            service.update_job_status(job_id, "failed", error_message=error_msg[:2000])
+        except Exception as update_err:
+            print(f"Failed to update job status: {update_err}")
+
+
+def _is_image_major_batch(job_configs: List[dict]) -> bool:
+    """Image-major execution needs every job to share engine, dataset and ground truth."""
+    if os.environ.get("BATCH_IMAGE_MAJOR", "1").strip().lower() in ("0", "false", "no", "off"):
+        return False
+    keys = {
+        (c["engine"], c["images_dir"], c.get("ground_truth_csv"), bool(c.get("use_gpu", True)))
+        for c in job_configs
+    }
+    return len(job_configs) > 1 and len(keys) == 1
+
+
+def run_image_major_batch(service, job_configs: List[dict]) -> None:
+    """Run all preprocessing variants in one pass over the dataset (see InferenceService.run_batch_inference)."""
+    first = job_configs[0]
+    ground_truth_csv = first.get("ground_truth_csv")
+
+    jobs = []
+    for config in job_configs:
+        try:
+            service.update_job_status(config["job_id"], "running")
+            jobs.append((config["job_id"], config["preprocessing"]))
+        except Exception as update_err:
+            print(f"Failed to mark job {config['job_id']} running: {update_err}")
+
+    print(f"Starting image-major batch of {len(jobs)} jobs: {[p for _, p in jobs]}")
+    try:
+        service.run_batch_inference(
+            engine=first["engine"],
+            images_dir=Path(first["images_dir"]),
+            jobs=jobs,
+            ground_truth_csv=Path(ground_truth_csv) if ground_truth_csv else None,
+            use_gpu=bool(first.get("use_gpu", True)),
+            detection_cache={},
+        )
+        print(f"Completed image-major batch of {len(jobs)} jobs")
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        print(f"Image-major batch failed: {e}")
+        for job_id, _ in jobs:
+            try:
+                service.update_job_status(job_id, "failed", error_message=str(e))
+            except Exception as update_err:
+                print(f"Failed to update job status: {update_err}")
+
+
+def run_batch_jobs(service, job_configs: List[dict]) -> None:
+    """
+    Run multiple inference jobs with one InferenceService.
+
+    Jobs that share engine and dataset run image-major (one pass over the dataset);
+    otherwise (or with BATCH_IMAGE_MAJOR=0) they run sequentially, one job at a time.
+
+    Each job_config contains: job_id, engine, images_dir, ground_truth_csv,
+    dataset_version, total_images, preprocessing, use_gpu
+    """
+    if _is_image_major_batch(job_configs):
+        run_image_major_batch(service, job_configs)
+        return
+
+    # Share detections across preprocessing runs to avoid repeated Roboflow API calls.
+    detection_cache: dict = {}
+
+    for config in job_configs:
+        job_id = config["job_id"]
+        preprocessing = config["preprocessing"]
+        ground_truth_csv = config.get("ground_truth_csv")
+
+        try:
+            use_gpu = bool(config.get("use_gpu", True))
+            service.set_use_gpu(use_gpu)
+
+            # Update job to running
+            service.update_job_status(job_id, "running")
+            print(f"Starting sequential job {job_id} with preprocessing: {preprocessing}")
+
+            service.run_inference(
+                job_id=job_id,
+                engine=config["engine"],
+                images_dir=Path(config["images_dir"]),
+                ground_truth_csv=Path(ground_truth_csv) if ground_truth_csv else None,
+                preprocessing=preprocessing,
+                use_gpu=use_gpu,
+                detection_cache=detection_cache,
+            )
+
+            print(f"Completed job {job_id} with preprocessing: {preprocessing}")
+
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            print(f"Job {job_id} failed: {e}")
+
+            try:
+                service.update_job_status(job_id, "failed", error_message=str(e))
+            except Exception as update_err:
+                print(f"Failed to update job status: {update_err}")
+
+
+def run_finalize_job(service, descriptor: dict) -> None:
+    """Summarize a sharded job once all its shards have finished, then mark it completed."""
+    job_id = descriptor["job_id"]
+    try:
+        status = service.get_job_status(job_id)
+        if not status or status.get("status") in ("completed", "failed", "cancelled"):
+            return
+        service.finalize_job(
+            job_id,
+            engine=descriptor["engine"],
+            dataset_version=descriptor["dataset_version"],
+            dataset_name=descriptor.get("dataset_name", "default"),
+            shard_count=descriptor.get("shard_count"),
+        )
+        print(f"Inference job {job_id} completed successfully (all shards)")
+    except Exception as e:
+        import traceback
+        tb = traceback.format_exc()
+        error_msg = f"{type(e).__name__}: {str(e)}\n\nTraceback:\n{tb}"
+        print(f"[PROCESS ERROR] Finalizing sharded job failed:\n{error_msg}")
+        try:
+            service.update_job_status(job_id, "failed", error_message=error_msg[:2000])
+        except Exception as update_err:
+            print(f"Failed to update job status: {update_err}")
+
+
+def run_job_descriptor(service, descriptor: dict) -> None:
+    """Dispatch a job descriptor ("single", "batch" or "finalize") to the matching runner."""
+    if descriptor.get("type") == "batch":
+        run_batch_jobs(service, descriptor.get("job_configs", []))
+    elif descriptor.get("type") == "finalize":
+        run_finalize_job(service, descriptor)
+    else:
+        run_single_job(service, descriptor)
+
+
+def descriptor_job_ids(descriptor: dict) -> List[str]:
+    """Return every job id a descriptor covers."""
+    if descriptor.get("type") == "batch":
+        return [c["job_id"] for c in descriptor.get("job_configs", [])]
+    return [descriptor["job_id"]]
+
+
+def _pool_worker_main(conn, preload_engines: List[str], use_gpu: bool) -> None:
+    """Entry point of a pooled worker: warm up once, then serve job descriptors until told to stop."""
+    bootstrap_worker_environment()
+
+    # Import after bootstrap so config.py sees the loaded env vars
+    from inference_service import InferenceService
+
+    try:
+        current_method = multiprocessing.get_start_method(allow_none=True)
+    except TypeError:
+        current_method = multiprocessing.get_start_method()
+    print(f"[WORKER {os.getpid()}] multiprocessing start method: {current_method}")
+
+    # Cancellation terminates the worker: unwind through finally blocks so queued
+    # write-behind rows are flushed (the job resumes from them) before exiting.
+    # The exit code stays nonzero, so the dispatcher never mistakes it for a clean finish.
+    def _on_sigterm(signum, frame):
+        raise SystemExit(128 + signum)
+
+    signal.signal(signal.SIGTERM, _on_sigterm)
+
+    # Live progress goes to the API process over this pipe (the database is written throttled)
+    set_publisher(conn.send)
+
+    # InferenceService.__init__ runs setup_all_tables() once for this process
+    service = InferenceService(use_gpu=use_gpu)
+    service.warm_up(preload_engines)
+    conn.send({"type": "ready"})
+    print(f"[WORKER {os.getpid()}] warm (preloaded: {', '.join(preload_engines) or 'none'})")
+
+    while True:
+        try:
+            descriptor = conn.recv()
+        except (EOFError, OSError):
+            break
+        if descriptor is None:
+            break
+
+        run_job_descriptor(service, descriptor)
+        conn.send({"type": "done", "job_ids": descriptor_job_ids(descriptor)})
+
+    print(f"[WORKER {os.getpid()}] shutting down")
+
+
+# ============================================================================
+# Parent side (runs in the FastAPI event loop)
+# ============================================================================
+
+# Upper bound on the delay between warm-up retries
+RESPAWN_BACKOFF_MAX_S = 60.0
+
+# Exit codes of workers stopped by the dispatcher (terminate/kill, or SIGTERM raised as SystemExit)
+_TERMINATED_EXITCODES = (-signal.SIGTERM, -signal.SIGKILL, 128 + signal.SIGTERM)
+
+
+class WorkerPoolError(RuntimeError):
+    """The pool has stopped respawning workers (see WorkerPool.failed_reason)."""
+
+
+@dataclass
+class PoolWorker:
+    """A pooled worker process and the job ids it currently owns."""
+    process: multiprocessing.Process
+    conn: object
+    ready: bool = False
+    engine: Optional[str] = None
+    job_ids: List[str] = field(default_factory=list)
+
+    @property
+    def pid(self) -> int:
+        return int(self.process.pid)
+
+    @property
+    def busy(self) -> bool:
+        return bool(self.job_ids)
+
+
+class WorkerPool:
+    """Pool of warm spawn workers that execute job descriptors one at a time."""
+
+    def __init__(
+        self,
+        max_workers: int,
+        standby: int = 1,
+        preload_engines: Optional[List[str]] = None,
+        use_gpu: bool = True,
+        on_done: Optional[Callable[[PoolWorker, List[str]], None]] = None,
+        on_exit: Optional[Callable[[PoolWorker, List[str]], None]] = None,
+        max_warmup_failures: int = 5,
+        respawn_backoff_s: float = 1.0,
+    ):
+        """
+        Args:
+            max_workers: Maximum number of busy workers (execution slots)
+            standby: Idle warm workers to keep ready on top of the busy ones
+            preload_engines: Engines each worker loads before reporting ready
+            use_gpu: Default GPU setting for worker warm-up
+            on_done: Callback(worker, job_ids) when a worker finishes a descriptor
+            on_exit: Callback(worker, job_ids) when a worker process exits, with the
+                     job ids it still owned (empty for idle workers)
+            max_warmup_failures: Consecutive warm-up failures before the pool stops respawning
+            respawn_backoff_s: Delay before respawning after the first warm-up failure
+                               (doubled per further failure, capped at RESPAWN_BACKOFF_MAX_S)
+        """
+        self.max_workers = max(1, max_workers)
+        self.standby = max(0, standby)
+        self.preload_engines = list(preload_engines or [])
+        self.use_gpu = use_gpu
+        self.on_done = on_done
+        self.on_exit = on_exit
+        self.workers: Dict[int, PoolWorker] = {}
+        self._ctx = multiprocessing.get_context("spawn")
+        self._closing = False
+        self.max_warmup_failures = max(1, max_warmup_failures)
+        self.respawn_backoff_s = max(0.0, respawn_backoff_s)
+        # Workers that exited before reporting ready, since the last one that did
+        self.warmup_failures = 0
+        # Set once the pool gives up respawning; submit() raises WorkerPoolError with it
+        self.failed_reason: Optional[str] = None
+        self._respawn_timer: Optional[asyncio.TimerHandle] = None
+
+    def _spawn(self) -> PoolWorker:
+        parent_conn, child_conn = self._ctx.Pipe(duplex=True)
+        process = self._ctx.Process(
+            target=_pool_worker_main,
+            args=(child_conn, self.preload_engines, self.use_gpu),
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+
+        worker = PoolWorker(process=process, conn=parent_conn)
+        self.workers[worker.pid] = worker
+        loop = asyncio.get_running_loop()
+        loop.add_reader(parent_conn.fileno(), self._on_readable, worker)
+        # The sentinel becomes readable when the process exits (one watch per process).
+        loop.add_reader(process.sentinel, self._on_exit, worker)
+        print(f"[POOL] Spawned worker pid={worker.pid}")
+        return worker
+
+    def _on_readable(self, worker: PoolWorker) -> None:
+        try:
+            msg = worker.conn.recv()
+        except (EOFError, OSError):
+            # Worker went away; the sentinel callback handles the exit.
+            try:
+                asyncio.get_running_loop().remove_reader(worker.conn.fileno())
+            except Exception:
+                pass
+            return
+        self._handle_message(worker, msg)
+
+    def _handle_message(self, worker: PoolWorker, msg: dict) -> None:
+        if msg.get("type") == "ready":
+            worker.ready = True
+            if self.warmup_failures:
+                print(f"[POOL] Worker pid={worker.pid} warmed up after {self.warmup_failures} failed attempt(s)")
+            self.warmup_failures = 0
+        elif msg.get("type") == "progress":
+            LIVE_PROGRESS.update(msg, source=worker.pid)
+        elif msg.get("type") == "done":
+            job_ids = list(worker.job_ids)
+            worker.job_ids = []
+            self._clear_live_progress(worker, job_ids)
+            worker.engine = None
+            if self.on_done is not None:
+                self.on_done(worker, job_ids)
+            if not self._closing:
+                self.ensure_standby()
+
+    def _on_exit(self, worker: PoolWorker) -> None:
+        self._remove(worker)
+        if not self._closing:
+            self.ensure_standby()
+
+    def _record_warmup_failure(self, worker: PoolWorker) -> None:
+        """Count a worker that exited before reporting ready (cancellation kills excepted)."""
+        exitcode = worker.process.exitcode
+        if self._closing or worker.ready or exitcode in _TERMINATED_EXITCODES:
+            return
+        self.warmup_failures += 1
+        print(
+            f"[POOL] Worker pid={worker.pid} exited during warm-up (exitcode={exitcode}); "
+            f"{self.warmup_failures}/{self.max_warmup_failures} consecutive failure(s)"
+        )
+        if self.warmup_failures >= self.max_warmup_failures and self.failed_reason is None:
+            self.failed_reason = (
+                f"{self.warmup_failures} workers in a row exited during warm-up "
+                f"(last exitcode={exitcode}); see the worker logs"
+            )
+            print(f"[POOL ERROR] Not respawning workers: {self.failed_reason}")
+
+    def _respawn_delay(self) -> float:
+        return min(self.respawn_backoff_s * 2 ** (self.warmup_failures - 1), RESPAWN_BACKOFF_MAX_S)
+
+    def _on_respawn_timer(self) -> None:
+        """Backoff elapsed: try one more standby worker."""
+        self._respawn_timer = None
+        self.reap()
+        if not self._closing and self.failed_reason is None and self._needs_standby():
+            self._spawn()
+
+    def _detach(self, worker: PoolWorker) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            loop.remove_reader(worker.process.sentinel)
+        except Exception:
+            pass
+        try:
+            loop.remove_reader(worker.conn.fileno())
+        except Exception:
+            pass
+        try:
+            worker.conn.close()
+        except Exception:
+            pass
+
+    def _remove(self, worker: PoolWorker) -> None:
+        """Drop an exited worker and report the job ids it still owned."""
+        if self.workers.pop(worker.pid, None) is None:
+            return  # already handled
+
+        # A "done" sent right before exiting may still be sitting in the pipe.
+        try:
+            while worker.conn.poll():
+                self._handle_message(worker, worker.conn.recv())
+        except (EOFError, OSError):
+            pass
+        self._detach(worker)
+        worker.process.join(0)  # collect the exit code
+
+        self._record_warmup_failure(worker)
+
+        job_ids = list(worker.job_ids)
+        worker.job_ids = []
+        self._clear_live_progress(worker, job_ids)
+        if self.on_exit is not None:
+            self.on_exit(worker, job_ids)
+
+    @staticmethod
+    def _clear_live_progress(worker: PoolWorker, job_ids: List[str]) -> None:
+        """The worker no longer runs these jobs; the database has their final count."""
+        for job_id in job_ids:
+            LIVE_PROGRESS.clear(job_id, source=worker.pid)
+
+    def reap(self) -> None:
+        """Remove exited workers whose sentinel callback hasn't run yet (fallback)."""
+        for worker in list(self.workers.values()):
+            if not worker.process.is_alive():
+                self._remove(worker)
+
+    def busy_workers(self) -> Dict[int, PoolWorker]:
+        return {pid: w for pid, w in self.workers.items() if w.busy and w.process.is_alive()}
+
+    def _spare_workers(self) -> List[PoolWorker]:
+        """Idle (or still warming up) workers, ready ones first."""
+        spare = [w for w in self.workers.values() if not w.busy and w.process.is_alive()]
+        return sorted(spare, key=lambda w: not w.ready)
+
+    def _needs_standby(self) -> bool:
+        return (
+            len(self._spare_workers()) < self.standby
+            and len(self.workers) < self.max_workers + self.standby
+        )
+
+    def ensure_standby(self) -> None:
+        """
+        Spawn workers until `standby` spare workers exist (bounded by slots + standby).
+
+        After warm-up failures, one worker at a time is respawned once the backoff
+        delay has passed; after max_warmup_failures nothing is respawned.
+        """
+        self.reap()
+        if self.failed_reason is not None or self._respawn_timer is not None:
+            return
+        if self.warmup_failures:
+            if any(not w.ready for w in self._spare_workers()) or not self._needs_standby():
+                return  # a retry is still warming up, or nothing is missing
+            delay = self._respawn_delay()
+            print(f"[POOL] Respawning a standby worker in {delay:.1f}s")
+            self._respawn_timer = asyncio.get_running_loop().call_later(delay, self._on_respawn_timer)
+            return
+        while self._needs_standby():
+            self._spawn()
+
+    def submit(self, descriptor: dict, engine: str) -> PoolWorker:
+        """
+        Hand a descriptor to a spare worker (spawning one if needed).
+
+        Raises WorkerPoolError once the pool has stopped respawning and no worker is spare.
+        """
+        self.reap()
+        spare = self._spare_workers()
+        if not spare and self.failed_reason is not None:
+            raise WorkerPoolError(f"Worker pool stopped: {self.failed_reason}")
+        worker = spare[0] if spare else self._spawn()
+
+        worker.engine = engine
+        worker.job_ids = descriptor_job_ids(descriptor)
+        # A worker that is still warming up picks this up from the pipe once it's ready.
+        worker.conn.send(descriptor)
+
+        # Prepare the next warm worker while this job runs.
+        self.ensure_standby()
+        return worker
+
+    async def shutdown(self, timeout_s: float = 5.0) -> None:
+        """Ask workers to exit, then terminate any that don't."""
+        self._closing = True
+        if self._respawn_timer is not None:
+            self._respawn_timer.cancel()
+            self._respawn_timer = None
+        for worker in list(self.workers.values()):
+            try:
+                worker.conn.send(None)
+            except Exception:
+                pass
+        for worker in list(self.workers.values()):
+            await asyncio.to_thread(worker.process.join, timeout_s)
+            if worker.process.is_alive():
+                worker.process.terminate()
+            self._detach(worker)
+        self.workers.clear()
@@ -0,0 +1,163 @@
+"""
+Write-Behind Persistence for Box Label OCR
+
+Storing one image used to cost ~18 serialized Pixeltable round trips (one
+insert per benchmark field, one for the image row, one progress update), all
+on the thread running OCR. WriteBehindWriter takes those rows instead and a
+background thread writes them as multi-row inserts, flushing when
+WRITE_BEHIND_FLUSH_ROWS rows are waiting or every WRITE_BEHIND_FLUSH_SECONDS.
+
+Ordering: each flush inserts tables in table_order (so benchmark rows land
+before the image_results row that checkpoints the image), then runs the
+coalesced after_flush callbacks (progress updates). A write error is kept and re-raised to the producer on its next call, so a job still
+fails when Pixeltable does; a best_effort writer (e.g. for the result cache)
+only logs it and drops that batch.
+"""
+
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+from pixeltable_schema import get_table, table_insert
+
+
+def write_behind_enabled() -> bool:
+    return os.environ.get("WRITE_BEHIND", "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+class WriteBehindWriter:
+    """Buffers Pixeltable inserts and writes them in batches on a background thread."""
+
+    def __init__(
+        self,
+        name: str = "writer",
+        flush_rows: Optional[int] = None,
+        flush_interval_s: Optional[float] = None,
+        max_pending_rows: Optional[int] = None,
+        best_effort: bool = False,
+        table_order: Optional[List[str]] = None,
+    ):
+        self.name = name
+        self.best_effort = best_effort
+        # Tables are inserted in this order within a flush; unlisted tables go last
+        self.table_order = list(table_order or [])
+        self.flush_rows = max(1, flush_rows or int(os.environ.get("WRITE_BEHIND_FLUSH_ROWS", "") or 200))
+        self.flush_interval_s = flush_interval_s or float(os.environ.get("WRITE_BEHIND_FLUSH_SECONDS", "") or 1.0)
+        # Producers block beyond this, so a slow database can't grow the buffer without bound
+        self.max_pending_rows = max(self.flush_rows, max_pending_rows or 10 * self.flush_rows)
+
+        # table name -> rows waiting for the next flush
+        self._rows: Dict[str, List[dict]] = {}
+        self._pending = 0
+        self._callbacks: Dict[Hashable, Callable[[], Any]] = {}
+        self._flush_requested = False
+        self._writing = False
+        self._closed = False
+        self._error: Optional[BaseException] = None
+        self._cond = threading.Condition()
+        self.rows_written = 0
+        self.flushes = 0
+
+        self._thread = threading.Thread(target=self._run, name=f"write-behind-{name}", daemon=True)
+        self._thread.start()
+
+    def insert(self, table_name: str, rows: List[dict]) -> None:
+        """Queue rows for a table; blocks only while max_pending_rows are already waiting."""
+        if not rows:
+            return
+        with self._cond:
+            self._raise_error()
+            while self._pending >= self.max_pending_rows and self._error is None:
+                self._flush_requested = True
+                self._cond.notify_all()
+                self._cond.wait()
+            self._raise_error()
+            self._rows.setdefault(table_name, []).extend(rows)
+            self._pending += len(rows)
+            if self._pending >= self.flush_rows:
+                self._cond.notify_all()
+
+    def after_flush(self, key: Hashable, fn: Callable[[], Any]) -> None:
+        """Run fn after the next flush's inserts; a later callback with the same key replaces it."""
+        with self._cond:
+            self._raise_error()
+            self._callbacks.pop(key, None)
+            self._callbacks[key] = fn
+
+    def flush(self) -> None:
+        """Write everything queued so far and wait for it; re-raises a write error."""
+        with self._cond:
+            self._flush_requested = True
+            self._cond.notify_all()
+            while (self._pending or self._callbacks or self._writing) and self._error is None:
+                self._cond.wait()
+            self._raise_error()
+
+    def close(self) -> None:
+        """Flush and stop the background thread (a no-op once closed)."""
+        if self._closed and not self._thread.is_alive():
+            return
+        try:
+            self.flush()
+        finally:
+            with self._cond:
+                self._closed = True
+                self._cond.notify_all()
+            self._thread.join(timeout=30.0)
+            if self.flushes:
+                print(f"[WRITE BEHIND] {self.name}: {self.rows_written} row(s) in {self.flushes} flush(es)")
+
+    def _table_rank(self, table_name: str) -> int:
+        try:
+            return self.table_order.index(table_name)
+        except ValueError:
+            return len(self.table_order)
+
+    def _raise_error(self) -> None:
+        if self._error is not None:
+            raise RuntimeError(f"Write-behind flush failed: {type(self._error).__name__}: {self._error}") from self._error
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                deadline = time.monotonic() + self.flush_interval_s
+                while not self._closed and not self._flush_requested and self._pending < self.flush_rows:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(timeout=remaining)
+                if self._closed and not self._pending and not self._callbacks:
+                    return
+                rows, self._rows = self._rows, {}
+                callbacks, self._callbacks = self._callbacks, {}
+                count, self._pending = self._pending, 0
+                self._flush_requested = False
+                self._writing = bool(rows or callbacks)
+                # Room in the buffer again
+                self._cond.notify_all()
+
+            if not rows and not callbacks:
+                continue
+            try:
+                for table_name in sorted(rows, key=self._table_rank):
+                    table_insert(get_table(table_name), rows[table_name])
+                for fn in callbacks.values():
+                    fn()
+            except BaseException as e:
+                print(f"[WRITE BEHIND] {self.name}: flush of {count} row(s) failed: {type(e).__name__}: {e}")
+                if self.best_effort and isinstance(e, Exception):
+                    with self._cond:
+                        self._writing = False
+                        self._cond.notify_all()
+                    continue
+                with self._cond:
+                    self._error = e
+                    self._writing = False
+                    self._cond.notify_all()
+                return
+            with self._cond:
+                self.rows_written += count
+                self.flushes += 1
+                self._writing = False
+                self._cond.notify_all()
@@ -532,11 +532,15 @@ export function JobsTable({
                           <span className="text-white/80 text-xs font-medium">
                             {job.engine === "easyocr"
                               ? "⚡ Easy"
-                              : job.engine === "paddleocr"
-                                ? "🎯 Paddle"
-                                : job.engine === "smolvlm2"
-                                  ? "🧠 SmolVLM2"
-                                  : job.engine}
+                              : job.engine === "easyocr_rec"
+                                ? "🏎️ Easy Rec"
+                                : job.engine === "paddleocr"
+                                  ? "🎯 Paddle"
+                                  : job.engine === "paddleocr_rec"
+                                    ? "🏹 Paddle Rec"
+                                    : job.engine === "smolvlm2"
+                                      ? "🧠 SmolVLM2"
+                                      : job.engine}
                           </span>
                         </td>
 
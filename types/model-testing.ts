@@ -1,5 +1,5 @@
 // OCR Engine Types
-export type OCREngine = "easyocr" | "paddleocr" | "smolvlm2"
+export type OCREngine = "easyocr" | "easyocr_rec" | "paddleocr" | "paddleocr_rec" | "smolvlm2"
 
 export interface OCREngineOption {
   id: OCREngine
@@ -62,6 +62,7 @@ export interface InferenceJob {
   started_at?: string | null
   completed_at?: string | null
   error_message?: string | null
+  stage_timeouts?: Record<string, number>
 }
 
 // Results Types
@@ -78,6 +79,8 @@ export interface JobSummary {
   overall_normalized_match_rate: number
   overall_cer: number
   per_field_stats: Record<string, FieldStats>
+  // Running summary of a job still in progress
+  partial?: boolean
 }
 
 export interface JobSummaryRow {
@@ -132,12 +135,24 @@ export const OCR_ENGINES: OCREngineOption[] = [
     description: "Lightweight, good for printed text",
     icon: "⚡",
   },
+  {
+    id: "easyocr_rec",
+    name: "EasyOCR (Rec Only)",
+    description: "Recognizer only on detected fields, no CRAFT",
+    icon: "🏎️",
+  },
   {
     id: "paddleocr",
     name: "PaddleOCR",
     description: "High-performance with angle detection",
     icon: "🎯",
   },
+  {
+    id: "paddleocr_rec",
+    name: "PaddleOCR (Rec Only)",
+    description: "Text-recognition model only, no doc/detection stages",
+    icon: "🏹",
+  },
   {
     id: "smolvlm2",
     name: "SmolVLM2 (VLM)",